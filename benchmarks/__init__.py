@@ -0,0 +1,4 @@
+"""
+Benchmarks y pruebas de carga del bot con la WCA, Postgres y Discord simulados.
+Ver benchmarks/ejecutar.py.
+"""
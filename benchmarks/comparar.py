@@ -0,0 +1,55 @@
+"""
+Compara dos archivos de resultados de benchmarks/ejecutar.py.
+
+Muestra cada valor numérico presente en ambos archivos junto con la razón nueva / base.
+Para tiempos y latencias una razón menor a 1 es una mejora; para valores por segundo, mayor a 1.
+
+Uso:
+    python -m benchmarks.comparar base.json nuevo.json [--filtro torneos]
+"""
+
+
+import argparse
+import json
+
+
+def aplanar(datos, prefijo=''):
+    '''
+    Retorna los valores numéricos de un diccionario anidado indexados por su ruta ('a.b.c').
+    '''
+    valores = {}
+    for clave, valor in datos.items():
+        ruta = f'{prefijo}.{clave}' if prefijo else str(clave)
+        if isinstance(valor, dict):
+            valores.update(aplanar(valor, ruta))
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            valores[ruta] = valor
+    return valores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara dos resultados de benchmarks.')
+    parser.add_argument('base')
+    parser.add_argument('nuevo')
+    parser.add_argument('--filtro', default='', help='Mostrar solo las rutas que contienen este texto.')
+    argumentos = parser.parse_args()
+
+    with open(argumentos.base, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    with open(argumentos.nuevo, encoding='utf-8') as archivo:
+        nuevo = json.load(archivo)
+    print(f'base:  {base.get("commit")} {base.get("fecha")}')
+    print(f'nuevo: {nuevo.get("commit")} {nuevo.get("fecha")}')
+
+    valores_base = aplanar(base.get('etapas', {}))
+    valores_nuevos = aplanar(nuevo.get('etapas', {}))
+    rutas = [ruta for ruta in valores_base if ruta in valores_nuevos and argumentos.filtro in ruta]
+    ancho = max((len(ruta) for ruta in rutas), default=0)
+    for ruta in rutas:
+        antes, despues = valores_base[ruta], valores_nuevos[ruta]
+        razon = f'{despues / antes:8.3f}x' if antes else '        -'
+        print(f'{ruta:<{ancho}}  {antes:>14.6g}  {despues:>14.6g}  {razon}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Benchmarks del bot sin conexión a la WCA, a Postgres ni a Discord.
+
+Levanta el servidor local de benchmarks/stub_wca.py, reemplaza la base de datos por PoolFalso
+(o usa Postgres si se pasa --postgres) y ejecuta el código real de utils y wca_bot por etapas:
+
+    micro:        parseo de fechas (contra el parser original), parseo de páginas con cada backend y construcción de embeds.
+    scrape:       obtención de los torneos de todos los países (en frío, sin cambios y con cambios).
+    torneos:      N invocaciones concurrentes de !torneos con el espejo vacío, en la base de datos y en memoria.
+    verificador:  ciclos del verificador de torneos nuevos hasta vaciar la cola de envíos.
+    consultas:    consultas con filtros de !torneos sobre el índice del espejo ya cargado.
+
+Cada etapa registra sus tiempos y las métricas de metricas.registro. El resultado se guarda como
+JSON en benchmarks/resultados (o en --salida) para compararlo con benchmarks/comparar.py.
+
+Uso:
+    python -m benchmarks.ejecutar
+    python -m benchmarks.ejecutar --etapas torneos --concurrencia 200 --latencia-wca 0.05
+"""
+
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks import stub_wca
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTADOS = os.path.join(RAIZ, 'benchmarks', 'resultados')
+ETAPAS = ('micro', 'scrape', 'torneos', 'verificador', 'consultas')
+
+
+def resumir_latencias(duraciones):
+    '''
+    Resume una lista de duraciones en segundos: cantidad, promedio, percentiles y máximo.
+    '''
+    if not duraciones:
+        return {'cantidad': 0}
+    ordenadas = sorted(duraciones)
+
+    def percentil(q):
+        return ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))]
+
+    return {
+        'cantidad': len(ordenadas),
+        'promedio': statistics.fmean(ordenadas),
+        'p50': percentil(0.50),
+        'p95': percentil(0.95),
+        'p99': percentil(0.99),
+        'maximo': ordenadas[-1],
+    }
+
+
+def _cronometrar(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return time.perf_counter() - inicio
+
+
+def _fechas_linea_base(texto):
+    # Parseo de fechas de obtener_torneos antes de utils.parsear_fechas (commit bb135d7), copiado
+    # tal cual para compararlo con las mismas fechas; falla con los rangos que cambian de mes o de año
+    _fecha = texto.strip().replace(',', '')
+    mes = _fecha.split(' ')[0].strip()
+    if '-' in _fecha:
+        anio = _fecha.split(' ')[4]
+        fecha_inicio = datetime.strptime(mes + ' ' + _fecha.split(' ')[1] + ' ' + anio, '%b %d %Y').date()
+        fecha_fin = datetime.strptime(mes + ' ' + _fecha.split(' ')[3] + ' ' + anio, '%b %d %Y').date()
+    else:
+        fecha_inicio = datetime.strptime(_fecha, '%b %d %Y').date()
+        fecha_fin = fecha_inicio
+    return fecha_inicio, fecha_fin
+
+
+def _parsear_todas(parsear, fechas):
+    # Retorna el resultado de cada fecha, o None si el parser la rechaza
+    resultados = []
+    for fecha in fechas:
+        try:
+            resultados.append(parsear(fecha))
+        except (ValueError, IndexError):
+            resultados.append(None)
+    return resultados
+
+
+def etapa_micro(utils, wca_bot, argumentos):
+    fechas = [fecha for _, _, fecha, _ in stub_wca.generar_torneos('Chile', 3000)]
+    utils.parsear_fechas.cache_clear()
+    frio = _cronometrar(lambda: _parsear_todas(utils.parsear_fechas, fechas), 1)
+    caliente = _cronometrar(lambda: _parsear_todas(utils.parsear_fechas, fechas), 1)
+    # Sin lru_cache, para comparar con la línea base por fecha y no por fechas repetidas
+    sin_memorizar = _cronometrar(lambda: _parsear_todas(utils.parsear_fechas.__wrapped__, fechas), 1)
+    linea_base = _cronometrar(lambda: _parsear_todas(_fechas_linea_base, fechas), 1)
+    # Las fechas que la línea base rechaza o interpreta distinto que parsear_fechas
+    esperadas = _parsear_todas(utils.parsear_fechas, fechas)
+    obtenidas = _parsear_todas(_fechas_linea_base, fechas)
+    resultado = {'fechas': {
+        'cantidad': len(fechas),
+        'segundos_sin_cache': frio,
+        'segundos_con_cache': caliente,
+        'segundos_sin_memorizar': sin_memorizar,
+        'errores': esperadas.count(None),
+        'linea_base': {
+            'segundos': linea_base,
+            'errores': obtenidas.count(None),
+            'distintas': sum(1 for a, b in zip(esperadas, obtenidas) if b is not None and a != b),
+        },
+    }}
+
+    html = stub_wca._renderizar_pagina('Chile', stub_wca.generar_torneos('Chile', argumentos.por_pagina), None)
+    resultado['parseo'] = {}
+    for backend in utils.PARSERS_WCA:
+        repeticiones = 50
+        segundos = _cronometrar(lambda: utils.parsear_torneos(html, 'chile', backend), repeticiones)
+        resultado['parseo'][backend] = {
+            'paginas_por_segundo': repeticiones / segundos,
+            'torneos_por_segundo': repeticiones * argumentos.por_pagina / segundos,
+        }
+
+    torneos = utils.parsear_torneos(stub_wca._renderizar_pagina(
+        'Chile', stub_wca.generar_torneos('Chile', argumentos.torneos_por_pais), None), 'chile')
+    renderizador = wca_bot.RenderizadorEmbeds()
+    resultado['render'] = {
+        'torneos': len(torneos),
+        'paginas_sin_cache': _cronometrar(lambda: renderizador.paginas(torneos, 'Chile', 'es'), 10) / 10,
+        'paginas_con_cache': _cronometrar(lambda: renderizador.paginas(torneos, 'Chile', 'es', 'v1'), 1000) / 1000,
+        'notificaciones': _cronometrar(lambda: renderizador.notificaciones(torneos, 'en'), 1),
+    }
+    return resultado
+
+
+async def etapa_scrape(utils, aplicacion, paises):
+    resultado = {}
+    for fase in ('frio', 'sin_cambios', 'con_cambios'):
+        if fase == 'con_cambios':
+            aplicacion['estado']['cambiar'](1)
+        inicio = time.perf_counter()
+        listas = await asyncio.gather(*(utils.consultar_torneos(utils.URL, pais) for pais in paises))
+        resultado[fase] = {
+            'segundos': time.perf_counter() - inicio,
+            'torneos': sum(len(torneos) for torneos, _ in listas),
+        }
+    return resultado
+
+
+async def etapa_torneos(utils, wca_bot, falsos, paises, argumentos):
+    canal = falsos.CanalFalso(1, latencia=argumentos.latencia_discord)
+    resultado = {}
+    for fase in ('primera_vez', 'desde_base_de_datos', 'en_memoria'):
+        if fase != 'en_memoria':
+            utils.espejo_torneos.invalidar()
+            wca_bot.renderizador = wca_bot.RenderizadorEmbeds()
+        if fase == 'primera_vez' and isinstance(utils.pool_db, falsos.PoolFalso):
+            utils.pool_db.datos.espejo.clear()
+
+        async def invocar(i):
+            inicio = time.perf_counter()
+            await wca_bot.torneos.callback(falsos.ContextoFalso(canal), paises[i % len(paises)])
+            return time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        duraciones = await asyncio.gather(*(invocar(i) for i in range(argumentos.concurrencia)))
+        total = time.perf_counter() - inicio
+        # Las copias del espejo se escriben en la base de datos en segundo plano
+        await asyncio.gather(*utils.espejo_torneos._escrituras)
+        resultado[fase] = {
+            'segundos': total,
+            'comandos_por_segundo': len(duraciones) / total,
+            'latencia': resumir_latencias(duraciones),
+        }
+    return resultado
+
+
+async def etapa_verificador(utils, wca_bot, falsos, aplicacion, paises, argumentos):
+    canales = {}
+    for i, pais in enumerate(paises):
+        nombre = await utils.obtener_pais(pais)
+        for j in range(argumentos.canales_por_pais):
+            canal_id = 1000 + i * argumentos.canales_por_pais + j
+            canales[canal_id] = falsos.CanalFalso(canal_id, latencia=argumentos.latencia_discord)
+            await utils.registro_suscripciones.agregar(canal_id, nombre)
+    wca_bot.bot.get_channel = canales.get
+    wca_bot.CHANNEL_ID = None
+    wca_bot.bot.cola_envios.INTERVALO_CANAL = argumentos.intervalo_canal
+
+    resultado = {}
+    for fase in ('primer_ciclo', 'sin_cambios', 'con_cambios'):
+        if fase == 'con_cambios':
+            aplicacion['estado']['cambiar'](2)
+        enviados = sum(len(canal.envios) for canal in canales.values())
+        inicio = time.perf_counter()
+        await wca_bot.verificar_torneos_nuevos.coro()
+        verificacion = time.perf_counter() - inicio
+        await wca_bot.bot.cola_envios.vaciar()
+        resultado[fase] = {
+            'segundos_verificacion': verificacion,
+            'segundos_hasta_vaciar_cola': time.perf_counter() - inicio,
+            'mensajes': sum(len(canal.envios) for canal in canales.values()) - enviados,
+        }
+    return resultado
+
+
+async def etapa_consultas(utils, paises, argumentos):
+    # Se cargan todos los países en el espejo para medir solo el índice
+    await asyncio.gather(*(utils.espejo_torneos.obtener(pais) for pais in paises))
+    textos = {
+        'un_pais': paises[0],
+        'lugar': f'{paises[0]} lugar:san jose',
+        'varios_paises_limite': ', '.join(paises[:3]) + ' limite:5',
+        'continente_limite': 'south america limite:5',
+        'mes_todos': ', '.join(paises) + ' mes:actual',
+        'rango_lugar_todos': ', '.join(paises) + ' lugar:puerto desde:actual hasta:' + (date.today() + timedelta(days=90)).isoformat(),
+    }
+    resultado = {}
+    for nombre, texto in textos.items():
+        filtro = await utils.FiltroTorneos.desde_texto(texto, 'Chile')
+        duraciones = []
+        for _ in range(argumentos.repeticiones):
+            inicio = time.perf_counter()
+            torneos, _, _, _ = await utils.espejo_torneos.consultar(filtro)
+            duraciones.append(time.perf_counter() - inicio)
+        resultado[nombre] = {'consulta': texto, 'torneos': len(torneos), 'latencia': resumir_latencias(duraciones)}
+    return resultado
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+async def ejecutar(argumentos):
+    runner, aplicacion, base = await stub_wca.iniciar(
+        torneos_por_pais=argumentos.torneos_por_pais,
+        por_pagina=argumentos.por_pagina,
+        latencia=argumentos.latencia_wca,
+        paises=argumentos.paises,
+    )
+
+    # Las variables de entorno deben definirse antes de importar utils y wca_bot
+    os.environ['WCA_URL'] = base
+    os.environ['WCA_API_PAISES'] = base + '/countries.json'
+    os.environ['HTTP_PETICIONES_POR_SEGUNDO'] = str(argumentos.peticiones_por_segundo)
+    os.chdir(RAIZ)
+    sys.path.insert(0, RAIZ)
+    import metricas
+    import utils
+    import wca_bot
+    from benchmarks import falsos
+
+    # No se sobrescribe la copia local real de countries.json con los países sintéticos
+    utils.registro_paises.ruta_snapshot = os.path.join(tempfile.mkdtemp(), 'paises.json')
+    if not argumentos.postgres:
+        utils.pool_db = falsos.PoolFalso(latencia=argumentos.latencia_db)
+    await utils.iniciar_sesion_http()
+    await utils.pool_db.iniciar()
+    await utils.migrar_base_de_datos()
+
+    paises = [nombre.lower().replace(' ', '+') for nombre, _, _ in stub_wca.PAISES[:argumentos.paises]]
+    resultados = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': vars(argumentos),
+        'etapas': {},
+    }
+
+    try:
+        for etapa in argumentos.etapas:
+            metricas.registro.reiniciar()
+            inicio = time.perf_counter()
+            if etapa == 'micro':
+                datos = etapa_micro(utils, wca_bot, argumentos)
+            elif etapa == 'scrape':
+                datos = await etapa_scrape(utils, aplicacion, paises)
+            elif etapa == 'torneos':
+                datos = await etapa_torneos(utils, wca_bot, falsos, paises, argumentos)
+            elif etapa == 'consultas':
+                datos = await etapa_consultas(utils, paises, argumentos)
+            else:
+                datos = await etapa_verificador(utils, wca_bot, falsos, aplicacion, paises, argumentos)
+            datos['segundos_totales'] = time.perf_counter() - inicio
+            datos['metricas'] = metricas.registro.instantanea()
+            resultados['etapas'][etapa] = datos
+            print(f'{etapa}: {datos["segundos_totales"]:.3f} s')
+    finally:
+        await wca_bot.bot.cola_envios.cerrar()
+        await utils.cerrar_sesion_http()
+        await utils.pool_db.cerrar()
+        await runner.cleanup()
+
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks del bot con la WCA, Postgres y Discord simulados.')
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=list(ETAPAS))
+    parser.add_argument('--paises', type=int, default=8, help='Cantidad de países a consultar.')
+    parser.add_argument('--torneos-por-pais', type=int, default=60)
+    parser.add_argument('--por-pagina', type=int, default=25, help='Torneos por página del listado.')
+    parser.add_argument('--concurrencia', type=int, default=50, help='Invocaciones concurrentes de !torneos.')
+    parser.add_argument('--repeticiones', type=int, default=200, help='Repeticiones de cada consulta con filtros.')
+    parser.add_argument('--canales-por-pais', type=int, default=3, help='Canales suscritos a cada país.')
+    parser.add_argument('--latencia-wca', type=float, default=0.0, help='Segundos por respuesta del servidor local.')
+    parser.add_argument('--latencia-db', type=float, default=0.0, help='Segundos por operación de la base de datos falsa.')
+    parser.add_argument('--latencia-discord', type=float, default=0.0, help='Segundos por envío a Discord.')
+    parser.add_argument('--intervalo-canal', type=float, default=0.01, help='Segundos entre mensajes de un canal.')
+    parser.add_argument('--peticiones-por-segundo', type=float, default=0, help='Límite de peticiones HTTP (0 sin límite).')
+    parser.add_argument('--postgres', action='store_true', help='Usar la base de datos de las variables PG* en vez de la falsa.')
+    parser.add_argument('--salida', help='Archivo JSON de resultados.')
+    argumentos = parser.parse_args()
+
+    resultados = asyncio.run(ejecutar(argumentos))
+
+    salida = argumentos.salida or os.path.join(RESULTADOS, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2, default=str)
+    print(f'Resultados guardados en {salida}')
+
+
+if __name__ == '__main__':
+    main()
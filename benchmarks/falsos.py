@@ -0,0 +1,222 @@
+"""
+Reemplazos en proceso de la base de datos y de Discord para los benchmarks.
+
+PoolFalso hereda de utils.PoolBaseDeDatos y solo reemplaza la conexión: las consultas preparadas,
+la inserción masiva de torneos y la creación de tablas se resuelven sobre tablas en memoria, en un
+hilo aparte y con una latencia configurable, de modo que el código de utils (incluidas sus
+métricas) se ejecuta igual que con Postgres.
+
+ContextoFalso, CanalFalso y MensajeFalso imitan lo que los comandos y la cola de envíos usan de
+discord.py y registran cada envío con su latencia simulada.
+
+Clases:
+    DatosFalsos: Tablas en memoria con las consultas de CONSULTAS_PREPARADAS.
+    CursorFalso: Cursor que ejecuta las consultas sobre DatosFalsos.
+    PoolFalso: Pool de base de datos en memoria.
+    MensajeFalso: Mensaje enviado a Discord.
+    CanalFalso: Canal de Discord que registra los envíos.
+    ContextoFalso: Contexto de un comando de Discord.
+"""
+
+
+import asyncio
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import utils
+
+
+class DatosFalsos:
+    '''
+    Tablas en memoria con un método por cada consulta de utils.CONSULTAS_PREPARADAS. Cada método
+    retorna (filas, cantidad de filas afectadas).
+    '''
+    def __init__(self):
+        self.torneos = {}
+        self.suscripciones = set()
+        self.configuracion = {}
+        self.espejo = {}
+        self.lock = threading.Lock()
+
+    def cargar_torneos(self, pais, fecha):
+        filas = [fila for fila in self.torneos.values() if fila[5] == pais and fila[2] >= fecha]
+        return filas, len(filas)
+
+    def eliminar_torneos(self, urls):
+        return [], sum(self.torneos.pop(url, None) is not None for url in urls)
+
+    def limpiar_torneos(self, fecha):
+        antiguos = [url for url, fila in self.torneos.items() if fila[3] < fecha]
+        for url in antiguos:
+            del self.torneos[url]
+        return [], len(antiguos)
+
+    def cargar_suscripciones(self):
+        return sorted(self.suscripciones), len(self.suscripciones)
+
+    def agregar_suscripcion(self, canal_id, pais):
+        self.suscripciones.add((canal_id, pais))
+        return [], 1
+
+    def eliminar_suscripcion(self, canal_id, pais):
+        self.suscripciones.discard((canal_id, pais))
+        return [], 1
+
+    def cargar_configuracion(self):
+        filas = [(guild_id, pais, idioma) for guild_id, (pais, idioma) in self.configuracion.items()]
+        return filas, len(filas)
+
+    def guardar_configuracion(self, guild_id, pais, idioma):
+        self.configuracion[guild_id] = (pais, idioma)
+        return [], 1
+
+    def cargar_espejo(self, pais):
+        # Postgres entrega la columna JSONB ya decodificada
+        if pais not in self.espejo:
+            return [], 0
+        actualizado, hash_contenido, torneos = self.espejo[pais]
+        return [(actualizado, hash_contenido, json.loads(torneos))], 1
+
+    def guardar_espejo(self, pais, actualizado, hash_contenido, torneos):
+        self.espejo[pais] = (actualizado, hash_contenido, torneos)
+        return [], 1
+
+    def tocar_espejo(self, pais, actualizado, hash_contenido):
+        if self.espejo.get(pais, (None, None))[1] != hash_contenido:
+            return [], 0
+        self.espejo[pais] = (actualizado, hash_contenido, self.espejo[pais][2])
+        return [], 1
+
+    def guardar_torneos(self, filas):
+        # Mismo resultado que SQL_GUARDAR_TORNEOS: solo retorna las filas insertadas o modificadas
+        resultado = []
+        for fila in filas:
+            anterior = self.torneos.get(fila[1])
+            if anterior != fila:
+                self.torneos[fila[1]] = fila
+                resultado.append((fila[1], anterior is None))
+        return resultado, len(resultado)
+
+
+class CursorFalso:
+    '''
+    Cursor que interpreta las sentencias EXECUTE, el INSERT masivo y el DELETE por URL de torneos de utils.
+    El resto de las sentencias (creación de tablas, SELECT 1) no tienen efecto.
+    '''
+    PATRON_EXECUTE = re.compile(r'\s*EXECUTE\s+(\w+)')
+
+    def __init__(self, datos):
+        self.datos = datos
+        self.connection = SimpleNamespace(encoding='UTF8')
+        self.rowcount = -1
+        self._filas = []
+        self._pendientes = []
+
+    def mogrify(self, plantilla, argumentos):
+        # psycopg2.extras.execute_values arma el INSERT con mogrify; se guardan las filas en su lugar
+        self._pendientes.append(tuple(argumentos))
+        return b'(?)'
+
+    def execute(self, sql, parametros=()):
+        if isinstance(sql, bytes):
+            sql = sql.decode('utf-8')
+        ejecutar = self.PATRON_EXECUTE.match(sql)
+        with self.datos.lock:
+            if ejecutar:
+                self._filas, self.rowcount = getattr(self.datos, ejecutar.group(1))(*parametros)
+            elif sql == utils.SQL_ELIMINAR_TORNEOS:
+                self._filas, self.rowcount = self.datos.eliminar_torneos(*parametros)
+            elif 'INSERT INTO torneos' in sql:
+                self._filas, self.rowcount = self.datos.guardar_torneos(self._pendientes)
+            else:
+                self._filas, self.rowcount = [], -1
+        self._pendientes = []
+
+    def fetchall(self):
+        return list(self._filas)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+class PoolFalso(utils.PoolBaseDeDatos):
+    '''
+    Pool de base de datos en memoria. Cada operación espera 'latencia' segundos en el hilo de la
+    base de datos para simular el viaje de ida y vuelta a Postgres.
+    '''
+    def __init__(self, latencia=0.0, maximo=utils.DB_POOL_MAX):
+        super().__init__(maximo=maximo)
+        self.latencia = latencia
+        self.datos = DatosFalsos()
+
+    def _crear_pool(self):
+        return None
+
+    def _ejecutar(self, funcion, preparar=True):
+        with self._disponibles:
+            with self._lock:
+                self.en_uso += 1
+            try:
+                if self.latencia:
+                    time.sleep(self.latencia)
+                return funcion(CursorFalso(self.datos))
+            finally:
+                with self._lock:
+                    self.en_uso -= 1
+
+    async def cerrar(self):
+        pass
+
+
+class MensajeFalso:
+    '''
+    Mensaje enviado a un canal falso. Editarlo se registra como un envío más.
+    '''
+    def __init__(self, canal, contenido, embeds):
+        self.canal = canal
+        self.contenido = contenido
+        self.embeds = embeds
+
+    async def edit(self, content=None, embed=None, embeds=None, view=None):
+        await self.canal._registrar('editar', content, [embed] if embed else embeds or [])
+        return self
+
+
+class CanalFalso:
+    '''
+    Canal de Discord que registra los mensajes enviados con una latencia simulada.
+    '''
+    def __init__(self, canal_id, latencia=0.0, guild=None):
+        self.id = canal_id
+        self.latencia = latencia
+        self.guild = guild
+        self.envios = []
+
+    async def _registrar(self, operacion, contenido, embeds):
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        self.envios.append((operacion, contenido, len(embeds), time.perf_counter()))
+
+    async def send(self, content=None, embed=None, embeds=None, view=None):
+        embeds = [embed] if embed else list(embeds or [])
+        await self._registrar('enviar', content, embeds)
+        return MensajeFalso(self, content, embeds)
+
+
+class ContextoFalso:
+    '''
+    Contexto de un comando de Discord con lo que usan los comandos del bot.
+    '''
+    def __init__(self, canal, autor='@benchmark'):
+        self.channel = canal
+        self.guild = canal.guild
+        self.author = SimpleNamespace(mention=autor)
+
+    async def send(self, content=None, embed=None, embeds=None, view=None):
+        return await self.channel.send(content, embed=embed, embeds=embeds, view=view)
@@ -0,0 +1,297 @@
+"""
+Servidor HTTP local que reemplaza a la WCA y a la API de países en los benchmarks.
+
+Sirve el listado de competencias de cada país (con paginación y ETag) y countries.json. Si existen
+páginas grabadas en benchmarks/grabaciones se sirven esas; si no, se generan páginas sintéticas
+con el mismo HTML que usa la WCA, de forma determinista.
+
+Uso independiente (para apuntar el bot real al servidor local):
+    python -m benchmarks.stub_wca --puerto 8765
+    WCA_URL=http://127.0.0.1:8765 WCA_API_PAISES=http://127.0.0.1:8765/countries.json python wca_bot.py
+
+Grabar páginas reales de la WCA para usarlas en los benchmarks:
+    python -m benchmarks.stub_wca --grabar chile argentina
+
+Funciones:
+    generar_paises(cantidad: int) -> dict
+    generar_torneos(pais: str, cantidad: int, semilla: int = 0) -> list
+    crear_aplicacion(...) -> aiohttp.web.Application
+    iniciar(puerto: int = 0, **opciones) -> tuple (async)
+    grabar(paises: list, carpeta: str = GRABACIONES) -> None (async)
+
+Variables:
+    PAISES (list): Países de los datos sintéticos como (nombre, código ISO2, continente).
+    GRABACIONES (str): Carpeta con las páginas grabadas de la WCA.
+"""
+
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+from datetime import date, timedelta
+from html import escape
+from urllib.parse import urlencode, urljoin
+
+from aiohttp import web
+
+
+PAISES = [
+    ('Chile', 'CL', '_South America'),
+    ('Argentina', 'AR', '_South America'),
+    ('Brazil', 'BR', '_South America'),
+    ('Peru', 'PE', '_South America'),
+    ('United States', 'US', '_North America'),
+    ('Mexico', 'MX', '_North America'),
+    ('Canada', 'CA', '_North America'),
+    ('Spain', 'ES', '_Europe'),
+    ('United Kingdom', 'GB', '_Europe'),
+    ('Germany', 'DE', '_Europe'),
+    ('Poland', 'PL', '_Europe'),
+    ('China', 'CN', '_Asia'),
+    ('India', 'IN', '_Asia'),
+    ('Japan', 'JP', '_Asia'),
+    ('Australia', 'AU', '_Oceania'),
+    ('South Africa', 'ZA', '_Africa'),
+]
+
+GRABACIONES = os.path.join(os.path.dirname(__file__), 'grabaciones')
+
+CIUDADES = ('Capital', 'Norte', 'Sur', 'Puerto', 'San José', 'Villa Alegre', 'Río Claro', 'Monte Alto')
+MESES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _region(pais):
+    # Nombre del país tal como llega en el parámetro region de la URL
+    nombre = pais.lower().replace('+', ' ')
+    return 'usa' if nombre in ('united states', 'usa') else nombre
+
+
+def _formatear_fechas(inicio, fin):
+    # Todos los formatos de fecha que muestra la WCA
+    if inicio == fin:
+        return f'{MESES[inicio.month - 1]} {inicio.day}, {inicio.year}'
+    if inicio.year != fin.year:
+        return f'{MESES[inicio.month - 1]} {inicio.day}, {inicio.year} - {MESES[fin.month - 1]} {fin.day}, {fin.year}'
+    if inicio.month != fin.month:
+        return f'{MESES[inicio.month - 1]} {inicio.day} - {MESES[fin.month - 1]} {fin.day}, {fin.year}'
+    return f'{MESES[inicio.month - 1]} {inicio.day} - {fin.day}, {fin.year}'
+
+
+def generar_paises(cantidad=len(PAISES)):
+    '''
+    Genera un countries.json con el formato de la API de países.
+
+    Parámetros:
+    cantidad (int): Cantidad de países.
+
+    Retorna:
+    dict: Países en el formato de countries.json.
+    '''
+    return {'items': [
+        {'id': nombre, 'name': nombre, 'continentId': continente, 'iso2Code': iso2}
+        for nombre, iso2, continente in PAISES[:cantidad]
+    ]}
+
+
+def generar_torneos(pais, cantidad, semilla=0):
+    '''
+    Genera de forma determinista las filas del listado de competencias de un país.
+
+    Parámetros:
+    pais (str): Nombre del país.
+    cantidad (int): Cantidad de torneos.
+    semilla (int): Semilla del generador. Cambiarla simula cambios en la WCA.
+
+    Retorna:
+    list: Filas como (nombre, ruta, texto de la fecha, lugar).
+    '''
+    azar = random.Random(f'{pais}-{semilla}')
+    hoy = date.today()
+    filas = []
+    for i in range(cantidad):
+        inicio = hoy + timedelta(days=azar.randint(0, 365))
+        fin = inicio + timedelta(days=azar.choice((0, 0, 1, 1, 2, 3)))
+        nombre = f'{pais} {azar.choice(CIUDADES)} Open {i + 1} {inicio.year}'
+        ruta = '/competitions/' + ''.join(nombre.split())
+        filas.append((nombre, ruta, _formatear_fechas(inicio, fin), azar.choice(CIUDADES)))
+    filas.sort(key=lambda fila: fila[2])
+    return filas
+
+
+def _renderizar_pagina(pais, filas, siguiente):
+    items = []
+    for nombre, ruta, fecha, lugar in filas:
+        items.append(
+            '<li class="list-group-item not-past">\n'
+            f'  <span class="date"> <i class="icon calendar"></i> {escape(fecha)} </span>\n'
+            '  <span class="competition-info">\n'
+            f'    <div class="competition-link"><i class="flag-icon"></i> <a href="{escape(ruta)}">{escape(nombre)}</a></div>\n'
+            f'    <div class="location"><strong>{escape(pais)}</strong>, {escape(lugar)}</div>\n'
+            '    <div class="venue-link"><p>Venue</p></div>\n'
+            '  </span>\n'
+            '</li>'
+        )
+    paginacion = f'<ul class="pagination"><li class="next"><a rel="next" href="{escape(siguiente)}">Next</a></li></ul>' if siguiente else ''
+    return (
+        '<html><head><title>Competitions | World Cube Association</title></head><body>'
+        '<div id="competitions-list"><ul class="list-group">\n' + '\n'.join(items) + '\n</ul></div>'
+        + paginacion + '</body></html>'
+    )
+
+
+def crear_aplicacion(torneos_por_pais=60, por_pagina=25, latencia=0.0, paises=len(PAISES), carpeta=GRABACIONES):
+    '''
+    Crea la aplicación aiohttp que responde como la WCA y la API de países.
+
+    Parámetros:
+    torneos_por_pais (int): Torneos sintéticos de cada país.
+    por_pagina (int): Torneos por página del listado.
+    latencia (float): Segundos de espera antes de cada respuesta.
+    paises (int): Cantidad de países sintéticos.
+    carpeta (str): Carpeta con páginas grabadas (region_pagina.html).
+
+    Retorna:
+    aiohttp.web.Application: Aplicación del servidor.
+    '''
+    aplicacion = web.Application()
+    # La aplicación no admite cambios una vez iniciada, por lo que el estado va en un dict propio
+    # Con 'caido' en True todas las respuestas son 503, para simular una caída de la WCA
+    estado = aplicacion['estado'] = {'semilla': 0, 'peticiones': 0, 'caido': False}
+    nombres = {_region(nombre): nombre for nombre, _, _ in PAISES[:paises]}
+    listados = {}
+
+    def listado(region):
+        if region not in listados:
+            listados[region] = generar_torneos(nombres[region], torneos_por_pais, estado['semilla'])
+        return listados[region]
+
+    async def responder(peticion, cuerpo, tipo):
+        estado['peticiones'] += 1
+        if latencia:
+            await asyncio.sleep(latencia)
+        if estado['caido']:
+            return web.Response(status=503, text='Service Unavailable')
+        etag = '"' + hashlib.blake2b(cuerpo.encode('utf-8'), digest_size=8).hexdigest() + '"'
+        if peticion.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(text=cuerpo, content_type=tipo, charset='utf-8', headers={'ETag': etag})
+
+    async def competencias(peticion):
+        region = _region(peticion.query.get('region', 'Chile'))
+        pagina = int(peticion.query.get('page', 1))
+
+        grabada = os.path.join(carpeta, f'{region.replace(" ", "+")}_{pagina}.html')
+        if os.path.exists(grabada):
+            with open(grabada, 'r', encoding='utf-8') as archivo:
+                return await responder(peticion, archivo.read(), 'text/html')
+
+        if region not in nombres:
+            return await responder(peticion, _renderizar_pagina(region, [], None), 'text/html')
+
+        filas = listado(region)
+        desde = (pagina - 1) * por_pagina
+        siguiente = None
+        if desde + por_pagina < len(filas):
+            siguiente = '/competitions?' + urlencode({**peticion.query, 'page': pagina + 1})
+        return await responder(peticion, _renderizar_pagina(nombres[region], filas[desde:desde + por_pagina], siguiente), 'text/html')
+
+    async def countries(peticion):
+        # raw.githubusercontent.com sirve el JSON como text/plain
+        return await responder(peticion, json.dumps(generar_paises(paises)), 'text/plain')
+
+    def cambiar(semilla):
+        # Simula que la WCA publicó cambios en todos los países
+        estado['semilla'] = semilla
+        listados.clear()
+
+    estado['cambiar'] = cambiar
+    aplicacion.router.add_get('/competitions', competencias)
+    aplicacion.router.add_get('/countries.json', countries)
+    return aplicacion
+
+
+async def iniciar(puerto=0, host='127.0.0.1', **opciones):
+    '''
+    Inicia el servidor local en un puerto libre (o el indicado).
+
+    Parámetros:
+    puerto (int): Puerto del servidor. Con 0 se elige uno libre.
+    host (str): Dirección en la que escucha.
+    opciones (dict): Opciones de crear_aplicacion.
+
+    Retorna:
+    tuple: (aiohttp.web.AppRunner, aplicación, URL base del servidor).
+    '''
+    aplicacion = crear_aplicacion(**opciones)
+    runner = web.AppRunner(aplicacion, access_log=None)
+    await runner.setup()
+    sitio = web.TCPSite(runner, host, puerto)
+    await sitio.start()
+    puerto = runner.addresses[0][1]
+    return runner, aplicacion, f'http://{host}:{puerto}'
+
+
+async def grabar(paises, carpeta=GRABACIONES):
+    '''
+    Descarga el listado de competencias real de los países indicados y lo guarda en la carpeta.
+
+    Parámetros:
+    paises (list): Países con formato de URL (por ejemplo 'chile' o 'united+kingdom').
+    carpeta (str): Carpeta de destino.
+
+    Retorna:
+    None
+    '''
+    import utils
+
+    os.makedirs(carpeta, exist_ok=True)
+    await utils.iniciar_sesion_http()
+    try:
+        for pais in paises:
+            url = utils.URL.replace('Chile', pais)
+            for pagina in range(1, utils.WCA_MAX_PAGINAS + 1):
+                html = await utils.obtener_texto(url)
+                ruta = os.path.join(carpeta, f'{_region(pais).replace(" ", "+")}_{pagina}.html')
+                with open(ruta, 'w', encoding='utf-8') as archivo:
+                    archivo.write(html)
+                print(f'Guardada {ruta}')
+                _, siguiente = utils.parsear_pagina(html, pais)
+                if not siguiente:
+                    break
+                url = urljoin(url, siguiente)
+    finally:
+        await utils.cerrar_sesion_http()
+
+
+async def _servir(argumentos):
+    runner, _, base = await iniciar(
+        argumentos.puerto,
+        torneos_por_pais=argumentos.torneos,
+        por_pagina=argumentos.por_pagina,
+        latencia=argumentos.latencia,
+    )
+    print(f'WCA local en {base}/competitions y países en {base}/countries.json')
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor local que reemplaza a la WCA en los benchmarks.')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--torneos', type=int, default=60, help='Torneos sintéticos por país.')
+    parser.add_argument('--por-pagina', type=int, default=25, help='Torneos por página del listado.')
+    parser.add_argument('--latencia', type=float, default=0.0, help='Segundos de espera por respuesta.')
+    parser.add_argument('--grabar', nargs='+', metavar='PAIS', help='Graba el listado real de estos países.')
+    argumentos = parser.parse_args()
+    if argumentos.grabar:
+        asyncio.run(grabar(argumentos.grabar))
+    else:
+        try:
+            asyncio.run(_servir(argumentos))
+        except KeyboardInterrupt:
+            pass
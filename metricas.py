@@ -0,0 +1,482 @@
+"""
+Módulo con las métricas del bot (latencias, contadores e indicadores).
+
+Las métricas se guardan en memoria y se exponen en formato de texto de Prometheus en un
+servidor HTTP local (si se define METRICS_PORT) y resumidas en el comando !estadisticas. El mismo
+servidor responde en /listo con 200 cuando el bot terminó de iniciar y 503 mientras inicia.
+
+Funciones:
+    medir_lag_loop(intervalo: float = 0.5, al_medir: callable = None) -> None (async)
+    iniciar_servidor(puerto: int = METRICAS_PUERTO, host: str = METRICAS_HOST) -> None (async)
+    cerrar_servidor() -> None (async)
+
+Clases:
+    Contador: Valor que solo aumenta, separado por etiquetas.
+    Indicador: Valor que sube y baja, o que se calcula al momento de exponerlo.
+    Histograma: Distribución de duraciones en intervalos fijos, separada por etiquetas.
+    Cronometro: Mide la duración de un bloque y la registra en un histograma.
+    RegistroMetricas: Conjunto de métricas del bot.
+
+Variables:
+    PREFIJO (str): Prefijo de los nombres de las métricas expuestas.
+    LIMITES_LATENCIA (tuple): Límites superiores (en segundos) de los intervalos de los histogramas.
+    METRICAS_HOST (str): Dirección en la que escucha el servidor de métricas.
+    METRICAS_PUERTO (int): Puerto del servidor de métricas (None si está desactivado).
+    registro (RegistroMetricas): Registro de métricas compartido.
+    errores (Contador): Errores registrados por los cronómetros.
+    lag_loop (Indicador): Último retraso medido del event loop.
+    listo (Indicador): 1 cuando el bot terminó de iniciar, 0 mientras inicia.
+"""
+
+
+import asyncio
+import bisect
+import math
+import os
+import time
+from aiohttp import web
+from dotenv import load_dotenv
+
+
+load_dotenv()  # Cargar variables de entorno desde el archivo .env
+
+PREFIJO = 'wcabot_'
+
+# Intervalos de los histogramas de latencia, desde 1 ms hasta 30 s
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Servidor de métricas: solo escucha en la máquina local y solo se inicia si se define el puerto
+METRICAS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICAS_PUERTO = int(os.getenv('METRICS_PORT')) if os.getenv('METRICS_PORT') else None
+
+
+def _clave(etiquetas):
+    return tuple(sorted((nombre, str(valor)) for nombre, valor in etiquetas.items()))
+
+
+def _formatear_etiquetas(clave, extra=()):
+    pares = clave + tuple(extra)
+    if not pares:
+        return ''
+    escapar = lambda valor: valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{nombre}="{escapar(valor)}"' for nombre, valor in pares) + '}'
+
+
+def _formatear_numero(valor):
+    if valor == math.inf:
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    '''
+    Valor que solo aumenta (peticiones, aciertos de caché, errores), separado por etiquetas.
+    '''
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self._valores = {}
+
+    def inc(self, valor=1, **etiquetas):
+        '''
+        Aumenta el contador.
+
+        Parámetros:
+        valor (float): Cantidad a sumar.
+        etiquetas (dict): Etiquetas de la serie.
+
+        Retorna:
+        None
+        '''
+        clave = _clave(etiquetas)
+        self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def valor(self, **etiquetas):
+        '''
+        Retorna el valor de una serie (0 si no existe).
+        '''
+        return self._valores.get(_clave(etiquetas), 0)
+
+    def series(self):
+        '''
+        Retorna las series del contador como pares (etiquetas, valor).
+        '''
+        return list(self._valores.items())
+
+    def reiniciar(self):
+        '''
+        Elimina todas las series.
+        '''
+        self._valores.clear()
+
+    def exponer(self):
+        return [f'{PREFIJO}{self.nombre}{_formatear_etiquetas(clave)} {_formatear_numero(valor)}'
+                for clave, valor in sorted(self._valores.items())]
+
+
+class Indicador(Contador):
+    '''
+    Valor que sube y baja (retraso del event loop, conexiones en uso). Si se entrega una función,
+    el valor se calcula al momento de exponerlo.
+    '''
+    tipo = 'gauge'
+
+    def __init__(self, nombre, ayuda, funcion=None):
+        super().__init__(nombre, ayuda)
+        self.funcion = funcion
+
+    def fijar(self, valor, **etiquetas):
+        '''
+        Cambia el valor del indicador.
+
+        Parámetros:
+        valor (float): Nuevo valor.
+        etiquetas (dict): Etiquetas de la serie.
+
+        Retorna:
+        None
+        '''
+        self._valores[_clave(etiquetas)] = valor
+
+    def series(self):
+        if self.funcion is not None:
+            try:
+                return [((), self.funcion())]
+            except Exception as error:
+                print(f'No se pudo calcular la métrica {self.nombre}:', error)
+                return []
+        return super().series()
+
+    def exponer(self):
+        return [f'{PREFIJO}{self.nombre}{_formatear_etiquetas(clave)} {_formatear_numero(valor)}'
+                for clave, valor in sorted(self.series())]
+
+
+class Histograma:
+    '''
+    Distribución de duraciones en intervalos fijos, separada por etiquetas.
+
+    Cada observación solo incrementa un intervalo, por lo que registrar es O(log n) en la cantidad
+    de intervalos y la memoria no crece con la cantidad de observaciones.
+    '''
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, limites=LIMITES_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.limites = tuple(limites) + (math.inf,)
+        self._series = {}
+
+    def observar(self, valor, **etiquetas):
+        '''
+        Registra una observación.
+
+        Parámetros:
+        valor (float): Valor observado (en segundos para las latencias).
+        etiquetas (dict): Etiquetas de la serie.
+
+        Retorna:
+        None
+        '''
+        clave = _clave(etiquetas)
+        serie = self._series.get(clave)
+        if serie is None:
+            serie = self._series[clave] = {'intervalos': [0] * len(self.limites), 'suma': 0.0, 'cantidad': 0}
+        serie['intervalos'][bisect.bisect_left(self.limites, valor)] += 1
+        serie['suma'] += valor
+        serie['cantidad'] += 1
+
+    def medir(self, **etiquetas):
+        '''
+        Retorna un cronómetro que registra la duración de un bloque 'with' en este histograma.
+
+        Parámetros:
+        etiquetas (dict): Etiquetas de la serie.
+
+        Retorna:
+        Cronometro: Cronómetro del bloque.
+        '''
+        return Cronometro(self, etiquetas)
+
+    def cuantil(self, q, clave):
+        '''
+        Estima un cuantil de una serie interpolando dentro de su intervalo, como histogram_quantile de Prometheus.
+
+        Parámetros:
+        q (float): Cuantil entre 0 y 1.
+        clave (tuple): Etiquetas de la serie, como las retorna series().
+
+        Retorna:
+        float: Valor estimado, o None si la serie no tiene observaciones.
+        '''
+        serie = self._series.get(clave)
+        if not serie or not serie['cantidad']:
+            return None
+        objetivo = q * serie['cantidad']
+        acumulado = 0
+        for i, cantidad in enumerate(serie['intervalos']):
+            if acumulado + cantidad >= objetivo and cantidad:
+                inferior = self.limites[i - 1] if i > 0 else 0
+                superior = self.limites[i]
+                if superior == math.inf:
+                    return inferior
+                return inferior + (superior - inferior) * (objetivo - acumulado) / cantidad
+            acumulado += cantidad
+        return self.limites[-2]
+
+    def series(self):
+        '''
+        Retorna las series del histograma como pares (etiquetas, {'intervalos', 'suma', 'cantidad'}).
+        '''
+        return list(self._series.items())
+
+    def reiniciar(self):
+        '''
+        Elimina todas las series.
+        '''
+        self._series.clear()
+
+    def exponer(self):
+        lineas = []
+        for clave, serie in sorted(self._series.items()):
+            acumulado = 0
+            for limite, cantidad in zip(self.limites, serie['intervalos']):
+                acumulado += cantidad
+                lineas.append(f'{PREFIJO}{self.nombre}_bucket{_formatear_etiquetas(clave, [("le", _formatear_numero(limite))])} {acumulado}')
+            lineas.append(f'{PREFIJO}{self.nombre}_sum{_formatear_etiquetas(clave)} {_formatear_numero(serie["suma"])}')
+            lineas.append(f'{PREFIJO}{self.nombre}_count{_formatear_etiquetas(clave)} {serie["cantidad"]}')
+        return lineas
+
+
+class Cronometro:
+    '''
+    Mide la duración de un bloque 'with' y la registra en un histograma. Si el bloque termina con
+    una excepción (que no sea una cancelación), también se cuenta en el contador de errores.
+    '''
+    __slots__ = ('histograma', 'etiquetas', 'duracion', '_inicio')
+
+    def __init__(self, histograma, etiquetas):
+        self.histograma = histograma
+        self.etiquetas = etiquetas
+        self.duracion = None
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, error, traza):
+        self.duracion = time.perf_counter() - self._inicio
+        self.histograma.observar(self.duracion, **self.etiquetas)
+        if tipo is not None and not issubclass(tipo, asyncio.CancelledError):
+            errores.inc(origen=self.histograma.nombre, tipo=tipo.__name__)
+        return False
+
+
+class RegistroMetricas:
+    '''
+    Conjunto de métricas del bot. Pedir dos veces una métrica con el mismo nombre retorna la misma
+    instancia, por lo que cada módulo puede declarar las métricas que usa.
+    '''
+    def __init__(self):
+        self._metricas = {}
+
+    def _registrar(self, clase, nombre, *args, **kwargs):
+        metrica = self._metricas.get(nombre)
+        if metrica is None:
+            metrica = self._metricas[nombre] = clase(nombre, *args, **kwargs)
+        elif not isinstance(metrica, clase):
+            raise ValueError(f'La métrica {nombre} ya existe con otro tipo.')
+        return metrica
+
+    def contador(self, nombre, ayuda):
+        '''
+        Retorna el contador con el nombre dado, creándolo si no existe.
+        '''
+        return self._registrar(Contador, nombre, ayuda)
+
+    def indicador(self, nombre, ayuda, funcion=None):
+        '''
+        Retorna el indicador con el nombre dado, creándolo si no existe.
+        '''
+        return self._registrar(Indicador, nombre, ayuda, funcion)
+
+    def histograma(self, nombre, ayuda, limites=LIMITES_LATENCIA):
+        '''
+        Retorna el histograma con el nombre dado, creándolo si no existe.
+        '''
+        return self._registrar(Histograma, nombre, ayuda, limites)
+
+    def exponer(self):
+        '''
+        Retorna todas las métricas en el formato de texto de Prometheus.
+
+        Parámetros:
+        None
+
+        Retorna:
+        str: Métricas en formato de texto.
+        '''
+        lineas = []
+        for nombre, metrica in sorted(self._metricas.items()):
+            lineas.append(f'# HELP {PREFIJO}{nombre} {metrica.ayuda}')
+            lineas.append(f'# TYPE {PREFIJO}{nombre} {metrica.tipo}')
+            lineas.extend(metrica.exponer())
+        return '\n'.join(lineas) + '\n'
+
+    def instantanea(self):
+        '''
+        Retorna el estado actual de las métricas en un diccionario serializable como JSON. Las series
+        se identifican por sus etiquetas ('nombre=valor' separados por comas, o '' si no tienen).
+
+        Parámetros:
+        None
+
+        Retorna:
+        dict: Nombre de la métrica -> serie -> valor (o cantidad, promedio y percentiles en segundos).
+        '''
+        resultado = {}
+        for nombre, metrica in sorted(self._metricas.items()):
+            series = {}
+            for clave, valor in metrica.series():
+                serie = ','.join(f'{etiqueta}={valor_etiqueta}' for etiqueta, valor_etiqueta in clave)
+                if isinstance(metrica, Histograma):
+                    if not valor['cantidad']:
+                        continue
+                    series[serie] = {
+                        'cantidad': valor['cantidad'],
+                        'promedio': valor['suma'] / valor['cantidad'],
+                        **{f'p{round(q * 100)}': metrica.cuantil(q, clave) for q in (0.5, 0.95, 0.99)},
+                    }
+                else:
+                    series[serie] = valor
+            if series:
+                resultado[nombre] = series
+        return resultado
+
+    def reiniciar(self):
+        '''
+        Elimina las series de todas las métricas (los indicadores calculados no se ven afectados).
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        for metrica in self._metricas.values():
+            metrica.reiniciar()
+
+    def resumen(self):
+        '''
+        Retorna un resumen legible de las métricas: cantidad, promedio y percentiles 50, 95 y 99
+        de cada histograma, y el valor de cada contador e indicador.
+
+        Parámetros:
+        None
+
+        Retorna:
+        list: Líneas del resumen.
+        '''
+        lineas = []
+        for nombre, metrica in sorted(self._metricas.items()):
+            for clave, valor in sorted(metrica.series()):
+                serie = nombre + ''.join(f' {valor_etiqueta}' for _, valor_etiqueta in clave)
+                if isinstance(metrica, Histograma):
+                    if not valor['cantidad']:
+                        continue
+                    p50, p95, p99 = (metrica.cuantil(q, clave) for q in (0.5, 0.95, 0.99))
+                    lineas.append(
+                        f'{serie}: n={valor["cantidad"]} prom={valor["suma"] / valor["cantidad"] * 1000:.1f}ms '
+                        f'p50={p50 * 1000:.1f}ms p95={p95 * 1000:.1f}ms p99={p99 * 1000:.1f}ms'
+                    )
+                else:
+                    lineas.append(f'{serie}: {valor:g}')
+        return lineas
+
+
+# Registro de métricas compartido por el bot
+registro = RegistroMetricas()
+
+errores = registro.contador('errores_total', 'Errores registrados por origen y tipo de excepción.')
+lag_loop = registro.indicador('loop_lag_actual_segundos', 'Último retraso medido del event loop.')
+listo = registro.indicador('listo', 'Vale 1 cuando el bot terminó de iniciar y 0 mientras inicia.')
+_lag_loop_histograma = registro.histograma('loop_lag_segundos', 'Retraso del event loop.')
+
+
+async def medir_lag_loop(intervalo=0.5, al_medir=None):
+    '''
+    Mide continuamente cuánto se atrasa el event loop en despertar de un sleep. Un retraso alto
+    indica que algún callback está bloqueando el loop (parseo, E/S síncrona, etc.).
+
+    Parámetros:
+    intervalo (float): Segundos entre mediciones.
+    al_medir (callable): Función que recibe cada retraso medido, llamada desde el event loop.
+
+    Retorna:
+    None
+    '''
+    loop = asyncio.get_running_loop()
+    while True:
+        inicio = loop.time()
+        await asyncio.sleep(intervalo)
+        retraso = max(0.0, loop.time() - inicio - intervalo)
+        lag_loop.fijar(retraso)
+        _lag_loop_histograma.observar(retraso)
+        if al_medir is not None:
+            al_medir(retraso)
+
+
+_runner = None
+
+
+async def _responder_metricas(peticion):
+    return web.Response(text=registro.exponer(), content_type='text/plain', charset='utf-8',
+                        headers={'X-Content-Type-Options': 'nosniff'})
+
+
+async def _responder_listo(peticion):
+    if listo.valor() >= 1:
+        return web.Response(text='listo\n')
+    return web.Response(status=503, text='iniciando\n')
+
+
+async def iniciar_servidor(puerto=METRICAS_PUERTO, host=METRICAS_HOST):
+    '''
+    Inicia el servidor HTTP que expone las métricas en /metrics y el estado de inicio en /listo.
+    No hace nada si no hay puerto.
+
+    Parámetros:
+    puerto (int): Puerto del servidor.
+    host (str): Dirección en la que escucha.
+
+    Retorna:
+    None
+    '''
+    global _runner
+    if puerto is None or _runner is not None:
+        return
+    aplicacion = web.Application()
+    aplicacion.router.add_get('/metrics', _responder_metricas)
+    aplicacion.router.add_get('/listo', _responder_listo)
+    _runner = web.AppRunner(aplicacion, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, puerto).start()
+    print(f'Métricas disponibles en http://{host}:{puerto}/metrics')
+
+
+async def cerrar_servidor():
+    '''
+    Detiene el servidor de métricas.
+
+    Parámetros:
+    None
+
+    Retorna:
+    None
+    '''
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
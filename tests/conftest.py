@@ -0,0 +1,52 @@
+"""
+Configuración de pytest: permite importar los módulos del bot desde la raíz del repositorio y
+entrega un entorno aislado con la WCA local de los benchmarks.
+
+Ejecutar con:
+    python -m pytest -q
+"""
+
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+from benchmarks import falsos, stub_wca  # noqa: E402
+
+
+@pytest.fixture
+def wca_local(monkeypatch, tmp_path):
+    '''
+    Retorna una función que ejecuta una prueba asíncrona contra la WCA local (benchmarks.stub_wca)
+    con la base de datos en memoria y el estado compartido de utils recién creado.
+
+    La prueba recibe el estado del servidor (peticiones, caido, cambiar) y el pool falso.
+    '''
+    monkeypatch.setattr(utils, 'pool_db', falsos.PoolFalso())
+    monkeypatch.setattr(utils, 'registro_paises', utils.RegistroPaises(ruta_snapshot=str(tmp_path / 'paises.json')))
+    monkeypatch.setattr(utils, 'espejo_torneos', utils.EspejoTorneos())
+    monkeypatch.setattr(utils, 'limitador_http', utils.LimitadorTasa(0))
+    monkeypatch.setattr(utils, 'circuitos_http', {})
+    monkeypatch.setattr(utils, '_paginas_wca', {})
+    monkeypatch.setattr(utils, 'HTTP_ESPERA_BASE', 0.001)
+
+    def ejecutar(prueba, **opciones):
+        async def principal():
+            runner, aplicacion, base = await stub_wca.iniciar(**opciones)
+            monkeypatch.setattr(utils, 'URL', utils.URL.replace(utils.WCA_URL, base))
+            monkeypatch.setattr(utils, 'API_PAISES', base + '/countries.json')
+            try:
+                return await prueba(aplicacion['estado'], utils.pool_db)
+            finally:
+                await utils.cerrar_sesion_http()
+                await runner.cleanup()
+
+        return asyncio.run(principal())
+
+    return ejecutar
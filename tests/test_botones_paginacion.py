@@ -0,0 +1,59 @@
+"""
+Pruebas de los botones de paginación de !torneos (wca_bot.BotonPagina): el custom_id debe recuperar
+la misma acción, página, idioma y consulta, y no pasar del largo que admite Discord.
+"""
+
+
+import asyncio
+from datetime import date
+
+import pytest
+
+import utils
+import wca_bot
+
+
+FILTROS = [
+    utils.FiltroTorneos(['chile']),
+    utils.FiltroTorneos(['_south america']),
+    utils.FiltroTorneos(['chile', 'argentina'], 'santiago', date(2024, 6, 1), date(2024, 6, 30), 5),
+    utils.FiltroTorneos(['peru'], None, None, date(2030, 12, 31), None),
+]
+
+
+def _botones(filtro, idioma, pagina, total_paginas):
+    async def crear():
+        return wca_bot.VistaPaginacion(filtro, idioma, pagina, total_paginas).children
+
+    return asyncio.run(crear())
+
+
+def _campos(filtro):
+    return filtro.regiones, filtro.lugar, filtro.desde, filtro.hasta, filtro.limite
+
+
+@pytest.mark.parametrize('filtro', FILTROS)
+@pytest.mark.parametrize('idioma', ['es', 'en', 'pt'])
+def test_custom_id_ida_y_vuelta(filtro, idioma):
+    for boton in _botones(filtro, idioma, 3, 7):
+        coincidencia = boton.template.fullmatch(boton.custom_id)
+        assert coincidencia is not None
+
+        recuperado = asyncio.run(wca_bot.BotonPagina.from_custom_id(None, boton.item, coincidencia))
+        assert (recuperado.accion, recuperado.pagina, recuperado.idioma) == (boton.accion, boton.pagina, idioma)
+        assert _campos(utils.FiltroTorneos.decodificar(recuperado.consulta)) == _campos(filtro)
+
+    paginas = {boton.accion: boton.pagina for boton in _botones(filtro, idioma, 3, 7)}
+    assert paginas == {'primera': 1, 'anterior': 2, 'siguiente': 4, 'ultima': 7}
+
+
+@pytest.mark.parametrize('filtro', FILTROS)
+def test_custom_id_cabe_en_el_limite(filtro):
+    assert wca_bot.VistaPaginacion.cabe(filtro, 'es')
+    for boton in _botones(filtro, 'es', 9999, 9999):
+        assert len(boton.custom_id) <= wca_bot.VistaPaginacion.LIMITE_CUSTOM_ID
+
+
+def test_consulta_demasiado_larga_no_cabe():
+    filtro = utils.FiltroTorneos(['united kingdom', 'united states', 'netherlands', 'new zealand'], 'x' * 40)
+    assert not wca_bot.VistaPaginacion.cabe(filtro, 'es')
@@ -0,0 +1,56 @@
+"""
+Pruebas de la cola de mensajes salientes (wca_bot.ColaEnvios): división de embeds según los límites
+de Discord y supervivencia del trabajador de un canal ante errores inesperados.
+"""
+
+
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+import wca_bot
+from benchmarks import falsos
+
+
+def _embed(caracteres):
+    return discord.Embed(title='x' * min(caracteres, 256), description='x' * max(caracteres - 256, 0))
+
+
+def test_dividir_respeta_el_limite_de_embeds():
+    grupos = wca_bot.ColaEnvios.dividir_embeds([_embed(10) for _ in range(25)])
+    assert [len(grupo) for grupo in grupos] == [10, 10, 5]
+
+
+def test_dividir_respeta_el_limite_de_caracteres():
+    embeds = [_embed(2500) for _ in range(7)]
+    grupos = wca_bot.ColaEnvios.dividir_embeds(embeds)
+    assert [len(grupo) for grupo in grupos] == [2, 2, 2, 1]
+    assert all(sum(len(e) for e in grupo) <= wca_bot.ColaEnvios.CARACTERES_POR_MENSAJE for grupo in grupos)
+    assert [e for grupo in grupos for e in grupo] == embeds
+
+
+def test_dividir_lista_vacia():
+    assert wca_bot.ColaEnvios.dividir_embeds([]) == []
+
+
+class CanalInestable(falsos.CanalFalso):
+    async def send(self, content=None, embed=None, embeds=None, view=None):
+        if content == 'falla':
+            raise ValueError('error inesperado')
+        return await super().send(content, embed=embed, embeds=embeds, view=view)
+
+
+def test_el_trabajador_sobrevive_a_un_error_inesperado():
+    canal = CanalInestable(1)
+    cola = wca_bot.ColaEnvios(SimpleNamespace(get_channel={1: canal}.get))
+    cola.INTERVALO_CANAL = 0
+
+    async def prueba():
+        for contenido in ('primero', 'falla', 'tercero'):
+            cola.encolar(1, contenido)
+        await cola.vaciar()
+
+    asyncio.run(prueba())
+    assert [envio[1] for envio in canal.envios] == ['primero', 'tercero']
+    assert cola.pendientes() == 0
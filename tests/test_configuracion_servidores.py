@@ -0,0 +1,57 @@
+"""
+Pruebas de la configuración por servidor (utils.ConfiguracionServidores) sobre la base de datos en
+memoria de los benchmarks.
+"""
+
+
+import asyncio
+
+import utils
+from benchmarks import falsos
+
+
+def _configuracion(monkeypatch, pool=None):
+    monkeypatch.setattr(utils, 'pool_db', pool or falsos.PoolFalso())
+    return utils.ConfiguracionServidores()
+
+
+def test_servidor_sin_configuracion_usa_la_por_defecto(monkeypatch):
+    configuracion = _configuracion(monkeypatch)
+    assert configuracion.obtener(1) == utils.CONFIGURACION_POR_DEFECTO
+    assert configuracion.obtener(None) == utils.CONFIGURACION_POR_DEFECTO
+    assert configuracion.paises() == [utils.CONFIGURACION_POR_DEFECTO['pais']]
+
+
+def test_los_servidores_no_comparten_configuracion(monkeypatch):
+    configuracion = _configuracion(monkeypatch)
+    por_defecto = dict(utils.CONFIGURACION_POR_DEFECTO)
+
+    assert asyncio.run(configuracion.guardar(1, pais='Peru'))
+    assert asyncio.run(configuracion.guardar(2, idioma='en'))
+
+    assert configuracion.obtener(1) == {'pais': 'Peru', 'idioma': por_defecto['idioma']}
+    assert configuracion.obtener(2) == {'pais': por_defecto['pais'], 'idioma': 'en'}
+    assert configuracion.obtener(3) == por_defecto
+    # Guardar un servidor no debe modificar la configuración por defecto compartida
+    assert utils.CONFIGURACION_POR_DEFECTO == por_defecto
+    assert configuracion.paises() == [por_defecto['pais'], 'Peru']
+
+
+def test_la_configuracion_se_recupera_al_cargar(monkeypatch):
+    pool = falsos.PoolFalso()
+    asyncio.run(_configuracion(monkeypatch, pool).guardar(1, pais='Peru', idioma='en'))
+
+    configuracion = _configuracion(monkeypatch, pool)
+    asyncio.run(configuracion.cargar())
+    assert configuracion.obtener(1) == {'pais': 'Peru', 'idioma': 'en'}
+    assert configuracion.obtener(2) == utils.CONFIGURACION_POR_DEFECTO
+
+
+def test_error_al_guardar_no_cambia_la_memoria(monkeypatch):
+    class PoolConError(falsos.PoolFalso):
+        def _ejecutar(self, funcion, preparar=True):
+            raise utils.psycopg2.DatabaseError('conexión perdida')
+
+    configuracion = _configuracion(monkeypatch, PoolConError())
+    assert not asyncio.run(configuracion.guardar(1, pais='Peru'))
+    assert configuracion.obtener(1) == utils.CONFIGURACION_POR_DEFECTO
@@ -0,0 +1,72 @@
+"""
+Pruebas de las consultas con filtros de !torneos: IndiceTorneos.buscar y EspejoTorneos.consultar.
+"""
+
+
+from datetime import date
+
+import utils
+
+
+def _torneos(pais, cantidad, lugar='Santiago'):
+    return [
+        utils.Torneo(f'{pais}{i}', f'https://www.worldcubeassociation.org/competitions/{pais}{i}', date(2030, 1, 1 + 2 * i), date(2030, 1, 1 + 2 * i), lugar, pais)
+        for i in range(cantidad)
+    ]
+
+
+def _indice(**paises):
+    indice = utils.IndiceTorneos()
+    for pais, torneos in paises.items():
+        indice.indexar(pais, torneos)
+    return indice
+
+
+def test_varios_paises_con_limite_mezcla_cada_pais():
+    indice = _indice(CL=_torneos('CL', 3), PE=_torneos('PE', 1))
+    assert [t.nombre for t in indice.buscar(['CL', 'PE'], limite=5)] == ['CL0', 'PE0', 'CL1', 'CL2']
+
+    indice = _indice(CL=_torneos('CL', 3), PE=_torneos('PE', 3))
+    assert [t.nombre for t in indice.buscar(['CL', 'PE'], limite=5)] == ['CL0', 'PE0', 'CL1', 'PE1', 'CL2']
+
+
+def test_varios_paises_con_limite_y_filtros():
+    indice = _indice(CL=_torneos('CL', 4), AR=_torneos('AR', 4, 'Buenos Aires'), PE=_torneos('PE', 4, 'Santiago de Surco'))
+    encontrados = indice.buscar(['CL', 'AR', 'PE'], lugar='santiago', desde=date(2030, 1, 3), limite=3)
+    assert [t.nombre for t in encontrados] == ['CL1', 'PE1', 'CL2']
+    assert indice.buscar(['CL', 'AR', 'PE'], limite=100) == indice.buscar(['CL', 'AR', 'PE'])
+
+
+def test_continente_mayor_que_la_memoria_del_espejo(wca_local):
+    async def prueba(estado, pool):
+        espejo = utils.EspejoTorneos(maximo=3)
+        filtro = await utils.FiltroTorneos.desde_texto('sudamerica desde:2000-01-01', 'Chile')
+        torneos, version, _, obsoleto = await espejo.consultar(filtro)
+        return {t.pais for t in torneos}, len(torneos), version, obsoleto, len(espejo._entradas), dict(espejo._solicitados)
+
+    paises, cantidad, version, obsoleto, en_memoria, solicitados = wca_local(prueba, torneos_por_pais=10, paises=4)
+    # Los cuatro países de Sudamérica responden aunque solo caben tres en memoria
+    assert len(paises) == 4 and cantidad == 40
+    assert version is not None and not obsoleto
+    assert en_memoria == 3
+    # Los países de un continente no quedan como solicitados para refrescar
+    assert solicitados == {}
+
+
+def test_pais_nombrado_se_refresca_y_pais_faltante_es_obsoleto(wca_local):
+    async def prueba(estado, pool):
+        espejo = utils.EspejoTorneos()
+        filtro = await utils.FiltroTorneos.desde_texto('chile, argentina limite:5', 'Chile')
+        primero = await espejo.consultar(filtro)
+        # Una copia descartada de la memoria mientras la WCA está caída y sin copia en la base de datos
+        espejo.invalidar('argentina')
+        pool.datos.espejo.pop('argentina', None)
+        estado['caido'] = True
+        segundo = await espejo.consultar(filtro)
+        return primero, segundo, set(espejo._solicitados)
+
+    primero, segundo, solicitados = wca_local(prueba, torneos_por_pais=10, paises=4)
+    assert len(primero[0]) == 5 and not primero[3]
+    assert {t.pais for t in segundo[0]} == {'chile'}
+    assert segundo[1] is None and segundo[3]
+    assert solicitados == {'chile', 'argentina'}
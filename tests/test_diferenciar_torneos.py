@@ -0,0 +1,90 @@
+"""
+Pruebas de utils.diferenciar_torneos y de cómo el verificador guarda sus cambios.
+"""
+
+
+import asyncio
+from datetime import date
+
+import pytest
+
+import utils
+from benchmarks import falsos
+
+
+def _torneo(numero, nombre=None, lugar='Santiago'):
+    return utils.Torneo(
+        nombre or f'Chile Open {numero}',
+        f'https://www.worldcubeassociation.org/competitions/ChileOpen{numero}',
+        date(2030, 1, numero), date(2030, 1, numero), lugar, 'chile',
+    )
+
+
+def test_nuevos_eliminados_y_modificados():
+    conocidos = [_torneo(1), _torneo(2), _torneo(3), _torneo(4)]
+    actuales = [_torneo(1), _torneo(2, 'Chile Open 2 renombrado'), _torneo(4, lugar='Valparaíso'), _torneo(5), _torneo(6)]
+
+    nuevos, eliminados, modificados = utils.diferenciar_torneos(actuales, conocidos)
+
+    assert [t.url for t in nuevos] == [_torneo(5).url, _torneo(6).url]
+    assert [t.url for t in eliminados] == [_torneo(3).url]
+    # Los modificados se entregan con sus datos actuales
+    assert [(t.nombre, t.lugar) for t in modificados] == [('Chile Open 2 renombrado', 'Santiago'), ('Chile Open 4', 'Valparaíso')]
+
+
+def test_sin_cambios_y_listas_vacias():
+    torneos = [_torneo(1), _torneo(2)]
+    assert utils.diferenciar_torneos(torneos, list(torneos)) == ([], [], [])
+    assert utils.diferenciar_torneos(torneos, []) == (torneos, [], [])
+    assert utils.diferenciar_torneos([], torneos) == ([], torneos, [])
+
+
+def test_guardar_y_eliminar_en_una_transaccion(monkeypatch):
+    pool = falsos.PoolFalso()
+    monkeypatch.setattr(utils, 'pool_db', pool)
+    asyncio.run(utils.guardar_torneos([_torneo(1), _torneo(2), _torneo(3)]))
+
+    transacciones = []
+    ejecutar = pool._ejecutar
+    monkeypatch.setattr(pool, '_ejecutar', lambda funcion, preparar=True: transacciones.append(funcion) or ejecutar(funcion, preparar))
+    insertados = asyncio.run(utils.guardar_torneos([_torneo(4)], [_torneo(1).url, _torneo(2).url]))
+
+    assert len(transacciones) == 1
+    assert insertados == [_torneo(4)]
+    assert sorted(pool.datos.torneos) == sorted([_torneo(3).url, _torneo(4).url])
+
+    # Solo eliminaciones
+    assert asyncio.run(utils.guardar_torneos([], [_torneo(3).url])) == []
+    assert sorted(pool.datos.torneos) == [_torneo(4).url]
+
+
+def test_error_al_leer_los_conocidos_se_propaga(monkeypatch):
+    class PoolConError(falsos.PoolFalso):
+        def _ejecutar(self, funcion, preparar=True):
+            raise utils.psycopg2.DatabaseError('conexión perdida')
+
+    monkeypatch.setattr(utils, 'pool_db', PoolConError())
+    with pytest.raises(utils.psycopg2.DatabaseError):
+        asyncio.run(utils.cargar_torneos_conocidos('chile'))
+
+
+def test_verificador_omite_el_pais_si_falla_la_base_de_datos(wca_local, monkeypatch):
+    import wca_bot
+
+    monkeypatch.setattr(wca_bot, 'hashes_procesados', {})
+
+    def cargar_con_error(pais, fecha):
+        raise utils.psycopg2.DatabaseError('conexión perdida')
+
+    async def prueba(estado, pool):
+        consultar = pool.datos.cargar_torneos
+        monkeypatch.setattr(pool.datos, 'cargar_torneos', cargar_con_error)
+        with pytest.raises(utils.psycopg2.DatabaseError):
+            await wca_bot.procesar_pais('chile')
+        sin_registrar = dict(wca_bot.hashes_procesados)
+
+        monkeypatch.setattr(pool.datos, 'cargar_torneos', consultar)
+        nuevos, _ = await wca_bot.procesar_pais('chile')
+        return sin_registrar, len(nuevos), set(wca_bot.hashes_procesados)
+
+    assert wca_local(prueba, torneos_por_pais=10) == ({}, 10, {'chile'})
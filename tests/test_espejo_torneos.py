@@ -0,0 +1,56 @@
+"""
+Pruebas del espejo de torneos (utils.EspejoTorneos) contra la WCA local: escritura de la copia en la
+base de datos al refrescar un país y límite de los países pedidos que se mantienen al día.
+"""
+
+
+import asyncio
+
+import utils
+
+
+def test_refresco_sin_cambios_solo_actualiza_la_fecha(wca_local):
+    async def prueba(estado, pool):
+        espejo = utils.EspejoTorneos()
+        escrituras = []
+        guardar_espejo = pool.datos.guardar_espejo
+
+        def contar(*parametros):
+            escrituras.append(parametros[0])
+            return guardar_espejo(*parametros)
+
+        pool.datos.guardar_espejo = contar
+
+        async def refrescar():
+            await espejo.obtener('chile', forzar=True)
+            await asyncio.gather(*espejo._escrituras)
+            return pool.datos.espejo['chile']
+
+        primera = await refrescar()
+        sin_cambios = await refrescar()
+        assert escrituras == ['chile']
+        assert sin_cambios[0] > primera[0]
+        assert sin_cambios[1:] == primera[1:]
+
+        # Sin copia en la base de datos (por ejemplo, si falló la escritura anterior) se escribe completa
+        del pool.datos.espejo['chile']
+        await refrescar()
+        assert escrituras == ['chile', 'chile']
+
+        estado['cambiar'](1)
+        con_cambios = await refrescar()
+        assert escrituras == ['chile', 'chile', 'chile']
+        assert con_cambios[1] != primera[1]
+
+    wca_local(prueba, torneos_por_pais=10)
+
+
+def test_paises_pedidos_limitados_al_maximo(wca_local):
+    async def prueba(estado, pool):
+        espejo = utils.EspejoTorneos(maximo=3)
+        for pais in ('chile', 'argentina', 'brazil', 'chile', 'peru'):
+            await espejo.obtener(pais)
+        return list(espejo._solicitados)
+
+    # Se mantienen los pedidos más recientemente
+    assert wca_local(prueba, torneos_por_pais=5) == ['brazil', 'chile', 'peru']
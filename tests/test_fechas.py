@@ -0,0 +1,113 @@
+"""
+Pruebas basadas en propiedades de utils.parsear_fechas: cada rango de fechas, mostrado en cualquiera
+de los formatos de la WCA, se interpreta como el mismo rango, y cualquier otro texto se rechaza
+con ValueError sin interrumpir el parseo de la página.
+"""
+
+
+from datetime import date, timedelta
+
+import pytest
+from hypothesis import example, given, strategies as st
+
+import utils
+
+
+MESES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+inicios = st.dates(min_value=date(2000, 1, 1), max_value=date(2099, 12, 1))
+duraciones = st.integers(min_value=0, max_value=40)
+
+
+def _mes(fecha):
+    return MESES[fecha.month - 1]
+
+
+def _formato_wca(inicio, fin):
+    # La WCA omite el año de inicio si coincide con el de término, y el mes de término si también coincide
+    if inicio == fin:
+        return f'{_mes(inicio)} {inicio.day}, {inicio.year}'
+    if inicio.year != fin.year:
+        return f'{_mes(inicio)} {inicio.day}, {inicio.year} - {_mes(fin)} {fin.day}, {fin.year}'
+    if inicio.month != fin.month:
+        return f'{_mes(inicio)} {inicio.day} - {_mes(fin)} {fin.day}, {fin.year}'
+    return f'{_mes(inicio)} {inicio.day} - {fin.day}, {fin.year}'
+
+
+def _pagina(filas):
+    # Listado de competencias con el mismo HTML que la WCA
+    items = ''.join(
+        '<li class="list-group-item not-past">'
+        f'<span class="date"> <i class="icon calendar"></i> {fecha} </span>'
+        '<span class="competition-info">'
+        f'<div class="competition-link"><i class="flag-icon"></i> <a href="{ruta}">{nombre}</a></div>'
+        f'<div class="location"><strong>Chile</strong>, {lugar}</div>'
+        '</span></li>'
+        for nombre, ruta, fecha, lugar in filas
+    )
+    return f'<html><body><div id="competitions-list"><ul class="list-group">{items}</ul></div></body></html>'
+
+
+@given(inicios, duraciones)
+@example(date(2024, 3, 30), 2)
+@example(date(2023, 12, 30), 3)
+@example(date(2024, 2, 28), 1)
+def test_formato_de_la_wca(inicio, dias):
+    fin = inicio + timedelta(days=dias)
+    assert utils.parsear_fechas(_formato_wca(inicio, fin)) == (inicio, fin)
+
+
+@given(inicios, duraciones, st.sampled_from(('-', ' - ', '–', ' — ')), st.sampled_from(('', '.')))
+def test_variantes_de_separadores(inicio, dias, guion, punto):
+    fin = inicio + timedelta(days=dias)
+    texto = f'  {_mes(inicio)}{punto} {inicio.day}, {inicio.year}{guion}{_mes(fin)}{punto} {fin.day}, {fin.year} '
+    assert utils.parsear_fechas(texto) == (inicio, fin)
+
+
+@given(st.dates(min_value=date(2000, 12, 1), max_value=date(2099, 12, 31)).filter(lambda d: d.month == 12), st.integers(1, 10))
+def test_rango_que_cruza_el_anio_sin_anio_de_inicio(inicio, dias):
+    fin = inicio + timedelta(days=dias)
+    if fin.year == inicio.year:
+        return
+    texto = f'{_mes(inicio)} {inicio.day} - {_mes(fin)} {fin.day}, {fin.year}'
+    assert utils.parsear_fechas(texto) == (inicio, fin)
+
+
+@given(st.text(max_size=40))
+@example('Mar 2')
+@example('Mar 2 - 3')
+@example('Mar 30 - Apr 1')
+@example('Foo 2, 2024')
+@example('Feb 30, 2024')
+@example('Mar 2, 0000')
+@example('')
+def test_texto_arbitrario_retorna_fechas_o_value_error(texto):
+    try:
+        inicio, fin = utils.parsear_fechas(texto)
+    except ValueError:
+        return
+    assert isinstance(inicio, date) and isinstance(fin, date)
+
+
+@pytest.mark.parametrize('texto', ['Mar 2', 'Mar 2 - 3', 'Mar 30 - Apr 1'])
+def test_fecha_sin_anio(texto):
+    with pytest.raises(ValueError):
+        utils.parsear_fechas(texto)
+
+
+@pytest.mark.parametrize('parser', sorted(utils.PARSERS_WCA))
+def test_fila_sin_anio_no_interrumpe_la_pagina(parser):
+    filas = [
+        ('Sin Año Open', '/competitions/SinAnio', 'Mar 2 - 3', 'Santiago'),
+        ('Con Año Open', '/competitions/ConAnio', 'Mar 2 - 3, 2030', 'Santiago'),
+    ]
+    torneos = utils.parsear_torneos(_pagina(filas), 'Chile', parser)
+    assert [(t.nombre, t.inicio, t.fin) for t in torneos] == [('Con Año Open', date(2030, 3, 2), date(2030, 3, 3))]
+
+
+def test_memoriza_fechas_repetidas():
+    utils.parsear_fechas.cache_clear()
+    for _ in range(3):
+        utils.parsear_fechas('Mar 30 - Apr 1, 2030')
+    informacion = utils.parsear_fechas.cache_info()
+    assert (informacion.hits, informacion.misses) == (2, 1)
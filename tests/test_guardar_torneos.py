@@ -0,0 +1,57 @@
+"""
+Pruebas de la inserción masiva de torneos (utils.guardar_torneos) sobre la base de datos en memoria
+de los benchmarks.
+"""
+
+
+import asyncio
+from datetime import date
+
+import pytest
+
+import utils
+from benchmarks import falsos
+
+
+def _torneo(numero, nombre=None):
+    return utils.Torneo(
+        nombre or f'Chile Open {numero}',
+        f'https://www.worldcubeassociation.org/competitions/ChileOpen{numero}',
+        date(2030, 1, numero), date(2030, 1, numero), 'Santiago', 'Chile',
+    )
+
+
+class PoolConError(falsos.PoolFalso):
+    def _ejecutar(self, funcion, preparar=True):
+        raise utils.psycopg2.DatabaseError('conexión perdida')
+
+
+def _guardar(pool, torneos, monkeypatch):
+    monkeypatch.setattr(utils, 'pool_db', pool)
+    return asyncio.run(utils.guardar_torneos(torneos))
+
+
+def test_retorna_solo_los_insertados(monkeypatch):
+    pool = falsos.PoolFalso()
+    assert _guardar(pool, [_torneo(1), _torneo(2)], monkeypatch) == [_torneo(1), _torneo(2)]
+    assert _guardar(pool, [_torneo(1, 'Chile Open 1 renombrado'), _torneo(3)], monkeypatch) == [_torneo(3)]
+    assert pool.datos.torneos[_torneo(1).url][0] == 'Chile Open 1 renombrado'
+
+
+def test_url_repetida_se_guarda_una_vez(monkeypatch):
+    pool = falsos.PoolFalso()
+    filas = []
+    guardar = pool.datos.guardar_torneos
+    monkeypatch.setattr(pool.datos, 'guardar_torneos', lambda f: filas.extend(f) or guardar(f))
+    insertados = _guardar(pool, [_torneo(1), _torneo(1, 'Último'), _torneo(2)], monkeypatch)
+    assert [fila[1] for fila in filas] == [_torneo(1).url, _torneo(2).url]
+    assert [t.nombre for t in insertados] == ['Último', 'Chile Open 2']
+
+
+def test_error_de_base_de_datos_se_propaga(monkeypatch):
+    with pytest.raises(utils.psycopg2.DatabaseError):
+        _guardar(PoolConError(), [_torneo(1)], monkeypatch)
+
+
+def test_lista_vacia_no_consulta(monkeypatch):
+    assert _guardar(PoolConError(), [], monkeypatch) == []
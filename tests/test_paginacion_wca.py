@@ -0,0 +1,39 @@
+"""
+Pruebas del recorrido paginado del listado de competencias contra la WCA local.
+"""
+
+
+import utils
+
+
+def test_iterar_torneos_se_detiene_con_el_limite(wca_local):
+    async def prueba(estado, pool):
+        torneos = [t async for t in utils.iterar_torneos(utils.URL, 'Chile', limite=5)]
+        return len(torneos), estado['peticiones']
+
+    # countries.json y solo la primera de las tres páginas
+    assert wca_local(prueba, torneos_por_pais=60, por_pagina=25) == (5, 2)
+
+
+def test_consultar_torneos_recorre_todas_las_paginas(wca_local):
+    async def prueba(estado, pool):
+        torneos, hash_contenido = await utils.consultar_torneos(utils.URL, 'Chile')
+        return len(torneos), len({t.url for t in torneos}), hash_contenido, dict(utils._paginas_wca)
+
+    cantidad, distintos, hash_contenido, recordados = wca_local(prueba, torneos_por_pais=60, por_pagina=25)
+    assert cantidad == distintos == 60
+    # Los listados de varias páginas no se guardan: su primera página no sirve para validarlos
+    assert recordados == {}
+
+
+def test_consultar_torneos_reutiliza_listado_de_una_pagina(wca_local):
+    async def prueba(estado, pool):
+        primera = await utils.consultar_torneos(utils.URL, 'Chile')
+        segunda = await utils.consultar_torneos(utils.URL, 'Chile')
+        return primera, segunda, utils.contador_wca.valor(resultado='no_modificada')
+
+    antes = utils.contador_wca.valor(resultado='no_modificada')
+    primera, segunda, despues = wca_local(prueba, torneos_por_pais=10, por_pagina=25)
+    assert [t.como_fila() for t in primera[0]] == [t.como_fila() for t in segunda[0]]
+    assert primera[1] == segunda[1]
+    assert despues == antes + 1
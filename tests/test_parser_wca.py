@@ -0,0 +1,69 @@
+"""
+Pruebas de los backends del parser del listado de competencias: lxml y bs4 deben entregar los
+mismos torneos y el mismo enlace a la página siguiente para la misma página.
+
+tests/fixtures contiene una página con el HTML del listado de la WCA, con filas incompletas (sin
+fecha, sin lugar o sin enlace) y una fecha inválida. Si benchmarks/grabaciones tiene páginas
+grabadas con `python -m benchmarks.stub_wca --grabar`, también se comparan.
+"""
+
+
+import glob
+import os
+from datetime import date
+
+import aiohttp
+import pytest
+
+import utils
+from benchmarks import stub_wca
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+PAGINAS = sorted(glob.glob(os.path.join(FIXTURES, '*.html')) + glob.glob(os.path.join(stub_wca.GRABACIONES, '*.html')))
+
+
+def _leer(ruta):
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        return archivo.read()
+
+
+def _parsear(html, parser):
+    # Torneo se compara solo por URL, por lo que se comparan todas sus columnas
+    torneos, siguiente = utils.parsear_pagina(html, 'Chile', parser)
+    return [torneo.como_fila() for torneo in torneos], siguiente
+
+
+@pytest.mark.parametrize('ruta', PAGINAS, ids=os.path.basename)
+def test_lxml_y_bs4_son_equivalentes(ruta):
+    html = _leer(ruta)
+    assert _parsear(html, 'lxml') == _parsear(html, 'bs4')
+    assert utils.parsear_torneos(html, 'Chile', 'lxml') == utils.parsear_torneos(html, 'Chile', 'bs4')
+
+
+@pytest.mark.parametrize('parser', sorted(utils.PARSERS_WCA))
+def test_filas_incompletas_no_desalinean(parser):
+    torneos, siguiente = _parsear(_leer(os.path.join(FIXTURES, 'competencias_chile.html')), parser)
+    base = 'https://www.worldcubeassociation.org/competitions/'
+    assert torneos == [
+        ('Santiago Open 2030', base + 'SantiagoOpen2030', date(2030, 3, 2), date(2030, 3, 2), 'Santiago', 'Chile'),
+        ('Valparaíso Cubing & Friends 2030', base + 'ValparaisoCubing2030', date(2030, 3, 30), date(2030, 4, 1), 'Valparaíso', 'Chile'),
+        ('Concepción Open 2030', base + 'ConcepcionOpen2030', date(2030, 7, 12), date(2030, 7, 14), 'Concepción', 'Chile'),
+        ('Año Nuevo Cubing 2031', base + 'AnioNuevo2031', date(2030, 12, 30), date(2031, 1, 2), 'La Serena', 'Chile'),
+    ]
+    assert siguiente == '/competitions?page=2&region=Chile&state=present'
+
+
+@pytest.mark.parametrize('semilla', range(3))
+def test_paginas_sinteticas(wca_local, semilla):
+    async def prueba(estado, pool):
+        estado['cambiar'](semilla)
+        async with aiohttp.ClientSession() as sesion:
+            async with sesion.get(utils.URL) as respuesta:
+                return await respuesta.text()
+
+    html = wca_local(prueba, torneos_por_pais=40, por_pagina=25)
+    lxml, bs4 = _parsear(html, 'lxml'), _parsear(html, 'bs4')
+    assert lxml == bs4
+    assert len(lxml[0]) == 25
+    assert lxml[1] is not None
@@ -0,0 +1,123 @@
+"""
+Pruebas de la resiliencia ante caídas de la WCA: reintentos, circuito por host y respaldo con la
+última copia marcada como obsoleta.
+"""
+
+
+import asyncio
+from datetime import timedelta
+
+import aiohttp
+import pytest
+
+import utils
+from benchmarks import falsos
+
+
+def _circuito():
+    return utils.circuito_de(utils.URL)
+
+
+def test_reintenta_y_propaga_el_error(wca_local):
+    async def prueba(estado, pool):
+        await utils.registro_paises.buscar('chile')
+        estado['caido'] = True
+        antes = estado['peticiones']
+        with pytest.raises(aiohttp.ClientResponseError):
+            await utils.consultar_torneos(utils.URL, 'Chile')
+        return estado['peticiones'] - antes
+
+    assert wca_local(prueba) == utils.HTTP_INTENTOS
+
+
+def test_circuito_abierto_no_envia_peticiones(wca_local):
+    async def prueba(estado, pool):
+        await utils.registro_paises.buscar('chile')
+        estado['caido'] = True
+        for _ in range(2):
+            with pytest.raises(aiohttp.ClientError):
+                await utils.consultar_torneos(utils.URL, 'Chile')
+        abierto = _circuito().estado
+        antes = estado['peticiones']
+        with pytest.raises(utils.CircuitoAbierto):
+            await utils.consultar_torneos(utils.URL, 'Chile')
+        rechazadas = estado['peticiones'] - antes
+
+        # Pasada la espera, una petición de prueba exitosa cierra el circuito
+        estado['caido'] = False
+        _circuito()._abierto_hasta = 0
+        torneos, _ = await utils.consultar_torneos(utils.URL, 'Chile')
+        return abierto, rechazadas, _circuito().estado, len(torneos)
+
+    assert wca_local(prueba) == ('abierto', 0, 'cerrado', 60)
+
+
+def test_prueba_fallida_vuelve_a_abrir_con_mas_espera():
+    circuito = utils.CircuitoHost('wca.test', fallos=2, espera=10, espera_maxima=25)
+    circuito.fallo()
+    circuito.fallo()
+    assert circuito.abierto
+    primera = circuito._abierto_hasta
+    circuito._abierto_hasta = 0
+    circuito.permitir()
+    # Solo una petición de prueba a la vez mientras está semiabierto
+    with pytest.raises(utils.CircuitoAbierto):
+        circuito.permitir()
+    circuito.fallo()
+    assert circuito.abierto
+    assert circuito._abierto_hasta - primera == pytest.approx(10, abs=1)
+
+
+def test_cancelar_la_prueba_libera_el_circuito(wca_local, monkeypatch):
+    class LimitadorLento(utils.LimitadorTasa):
+        async def esperar(self):
+            await asyncio.sleep(10)
+
+    async def prueba(estado, pool):
+        circuito = _circuito()
+        circuito.estado = 'abierto'
+        circuito._abierto_hasta = 0
+        monkeypatch.setattr(utils, 'limitador_http', LimitadorLento(0))
+        tarea = asyncio.create_task(utils.obtener_texto(utils.URL))
+        await asyncio.sleep(0.01)
+        tarea.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarea
+        # La petición de prueba quedó libre para la siguiente
+        circuito.permitir()
+        return circuito.estado
+
+    assert wca_local(prueba) == 'semiabierto'
+
+
+def test_espejo_entrega_la_ultima_copia_como_obsoleta(wca_local):
+    async def prueba(estado, pool):
+        espejo = utils.espejo_torneos
+        torneos, _, _, obsoleto = await espejo.obtener('chile')
+        espejo._entradas['chile']['actualizado'] -= timedelta(seconds=espejo.obsoleto + 1)
+        estado['caido'] = True
+        respaldo, _, _, respaldo_obsoleto = await espejo.obtener('chile')
+        with pytest.raises(aiohttp.ClientError):
+            await espejo.obtener('chile', forzar=True)
+        with pytest.raises(aiohttp.ClientError):
+            await espejo.obtener('argentina')
+        return len(torneos), obsoleto, len(respaldo), respaldo_obsoleto
+
+    assert wca_local(prueba) == (60, False, 60, True)
+
+
+def test_comando_test_no_informa_una_caida_como_sin_torneos(wca_local):
+    import wca_bot
+
+    async def prueba(estado, pool):
+        await utils.espejo_torneos.obtener('chile')
+        estado['caido'] = True
+        canal = falsos.CanalFalso(1)
+        await wca_bot.mostrar_torneos.callback(falsos.ContextoFalso(canal), 'chile')
+        await wca_bot.mostrar_torneos.callback(falsos.ContextoFalso(canal), 'argentina')
+        return [contenido for _, contenido, _, _ in canal.envios]
+
+    con_copia, sin_copia = wca_local(prueba)
+    assert utils.traducir('es', 'StaleData') in con_copia
+    assert 'URL:' in con_copia
+    assert sin_copia == utils.traducir('es', 'WcaUnavailable')
@@ -2,46 +2,206 @@
 Módulo con funciones que utiliza el bot de Discord.
 
 Funciones:
-    db_conn() -> psycopg2.extensions.connection
-    cargar_torneos_conocidos() -> list
-    obtener_torneos(url: str, pais: str = 'Chile') -> list
-    guardar_torneo(torneo: dict) -> None
+    iniciar_sesion_http() -> aiohttp.ClientSession (async)
+    cerrar_sesion_http() -> None (async)
+    obtener_texto(url: str) -> str (async)
+    obtener_texto_condicional(url: str, encabezados: dict) -> dict (async)
+    obtener_json(url: str) -> dict (async)
+    circuito_de(url: str) -> CircuitoHost
+    migrar_base_de_datos() -> list (async)
+    cargar_torneos_conocidos(pais: str) -> list (async)
+    normalizar_texto(texto: str) -> str
+    parsear_fechas(texto: str) -> tuple
+    parsear_pagina(html: str, pais: str, parser: str = None) -> tuple
+    parsear_torneos(html: str, pais: str, parser: str = None) -> list
+    iterar_torneos(url: str, pais: str, limite: int = None) -> AsyncIterator[Torneo]
+    consultar_torneos(url: str, pais: str) -> tuple (async)
+    guardar_torneos(torneos: list, eliminados: list = ()) -> list (async)
+    diferenciar_torneos(actuales: list, conocidos: list) -> tuple
     obtener_fecha_actual() -> datetime.date
-    eliminar_torneo(url: str) -> None
-    limpiar_base_de_datos() -> None
-    api_paises() -> dict
-    obtener_pais_para_url(pais: str) -> str
-    obtener_pais(pais: str) -> str
-    validar_pais(pais: str) -> bool
-    traducir_texto(idioma_output: str, texto: str) -> str
+    limpiar_base_de_datos() -> None (async)
+    api_paises() -> dict (async)
+    obtener_pais_para_url(pais: str) -> str (async)
+    obtener_pais(pais: str) -> str (async)
+    validar_pais(pais: str) -> bool (async)
+    cargar_traducciones() -> dict
+    traducir(idioma: str, key: str) -> str
+    cargar_idiomas() -> dict
+    validar_idioma(idioma: str) -> bool
+
+Clases:
+    Torneo: Torneo de la WCA, inmutable e identificado por su URL.
+    LimitadorTasa: Limita la cantidad de operaciones por segundo.
+    CircuitoAbierto: Error de una petición rechazada porque el circuito de su host está abierto.
+    CircuitoHost: Circuito que deja de enviar peticiones a un host mientras está fallando.
+    PoolBaseDeDatos: Pool de conexiones a la base de datos con consultas preparadas.
+    IndiceTorneos: Índice en memoria de torneos por país, fecha de inicio y palabras del lugar.
+    FiltroTorneos: Consulta de torneos por regiones, lugar, fechas y límite.
+    EspejoTorneos: Espejo local de los torneos por país, en memoria y en la base de datos.
+    RegistroPaises: Registro en memoria de los países de la WCA.
+    RegistroSuscripciones: Suscripciones de canales a países.
+    ConfiguracionServidores: País e idioma de cada servidor de Discord.
+    CatalogoTraducciones: Catálogo de traducciones en memoria con recarga en caliente.
 
 Variables:
     URL (str): URL de la WCA para obtener los torneos actuales.
-    WCA_URL (str): URL de la WCA.
+    WCA_URL (str): URL de la WCA (variable de entorno WCA_URL).
+    API_PAISES (str): URL del listado de países, countries.json (variable de entorno WCA_API_PAISES).
+    WCA_PARSER (str): Backend para parsear el listado de competencias ('lxml' o 'bs4').
+    PARSERS_WCA (dict): Backends disponibles para parsear el listado de competencias.
+    WCA_MAX_PAGINAS (int): Máximo de páginas del listado que se recorren por país.
+    PATRON_FECHAS (re.Pattern): Formatos de fecha del listado de competencias.
+    PATRON_PALABRAS (re.Pattern): Palabras de un lugar para el índice de lugares.
+    PATRON_FILTRO (re.Pattern): Claves de los filtros de !torneos.
+    MESES (dict): Número de cada mes según su abreviatura en inglés.
+    PAISES_TTL (int): Segundos que se mantiene el registro de países antes de refrescarlo.
+    PAISES_SNAPSHOT (str): Ruta de la última copia válida de countries.json.
+    ESPEJO_TTL (int): Segundos durante los que la copia de un país en el espejo se entrega sin refrescarla.
+    ESPEJO_OBSOLETO (int): Edad máxima en segundos de una copia que se entrega sin esperar a la WCA.
+    ESPEJO_REFRESCO (int): Segundos entre refrescos en segundo plano de los países pedidos.
+    ESPEJO_VIGENCIA_SOLICITUD (int): Segundos que se sigue refrescando un país desde que se pidió.
+    ESPEJO_MAX (int): Máximo de países en la memoria del espejo y de países pedidos que se mantienen al día.
+    TRADUCCIONES_ARCHIVO (str): Ruta del archivo con las traducciones.
     DB_URL (str): URL de la base de datos.
     DB_NAME (str): Nombre de la base de datos.
     DB_HOST (str): Host de la base de datos.
     DB_PASSWORD (str): Contraseña de la base de datos.
     DB_PORT (str): Puerto de la base de datos.
     DB_USER (str): Usuario de la base de datos.
+    DB_POOL_MIN (int): Conexiones mínimas del pool de base de datos.
+    DB_POOL_MAX (int): Conexiones máximas del pool de base de datos.
+    DB_PING_INTERVALO (int): Segundos de inactividad tras los cuales se verifica una conexión.
+    COLUMNAS_TORNEO (str): Columnas de la tabla torneos en el orden de Torneo.como_fila.
+    CONSULTAS_PREPARADAS (dict): Consultas fijas que se preparan en cada conexión.
+    SQL_GUARDAR_TORNEOS (str): Inserción masiva con upsert por URL.
+    SQL_ELIMINAR_TORNEOS (str): Eliminación de varios torneos por URL.
+    SQL_CREAR_MIGRACIONES (str): Creación de la tabla con las migraciones aplicadas.
+    MIGRACIONES (tuple): Migraciones del esquema como (versión, descripción, SQL).
+    MIGRACIONES_LOCK (int): Llave del advisory lock que evita migraciones simultáneas.
+    CONFIGURACION_POR_DEFECTO (dict): País e idioma de los servidores sin configuración.
+    HTTP_TIMEOUT (aiohttp.ClientTimeout): Tiempo máximo por petición HTTP.
+    HTTP_MAX_CONEXIONES (int): Máximo de conexiones abiertas en el pool HTTP.
+    HTTP_MAX_PETICIONES (int): Máximo de peticiones HTTP simultáneas.
+    HTTP_PETICIONES_POR_SEGUNDO (float): Límite global de peticiones HTTP por segundo.
+    HTTP_INTENTOS (int): Intentos por petición HTTP ante fallos del host.
+    HTTP_ESPERA_BASE (float): Espera base en segundos del backoff entre intentos.
+    HTTP_ESPERA_MAXIMA (float): Espera máxima en segundos entre intentos.
+    CIRCUITO_FALLOS (int): Fallos seguidos de un host que abren su circuito.
+    CIRCUITO_ESPERA (int): Segundos que el circuito permanece abierto la primera vez.
+    CIRCUITO_ESPERA_MAXIMA (int): Segundos máximos que el circuito permanece abierto.
+    limitador_http (LimitadorTasa): Límite global de peticiones HTTP.
+    circuitos_http (dict): Circuito de cada host.
+    contador_wca (metricas.Contador): Peticiones a la WCA y descargas o parseos evitados, por resultado.
+    latencia_http (metricas.Histograma): Duración de las peticiones HTTP salientes.
+    latencia_parseo (metricas.Histograma): Duración del parseo de cada página de la WCA.
+    latencia_consulta (metricas.Histograma): Duración de la obtención de los torneos de un país.
+    latencia_db (metricas.Histograma): Duración de las operaciones de base de datos.
+    contador_espejo (metricas.Contador): Consultas al espejo de torneos por resultado.
+    contador_reintentos (metricas.Contador): Reintentos de peticiones HTTP por destino.
+    contador_circuito (metricas.Contador): Aperturas, cierres y rechazos del circuito de cada host.
+    indicador_circuito (metricas.Indicador): Estado del circuito de cada host (1 si está abierto).
+    pool_db (PoolBaseDeDatos): Pool de conexiones compartido.
+    espejo_torneos (EspejoTorneos): Espejo de torneos compartido.
+    registro_suscripciones (RegistroSuscripciones): Suscripciones compartidas.
+    configuracion_servidores (ConfiguracionServidores): Configuración de los servidores compartida.
+    registro_paises (RegistroPaises): Registro de países compartido.
+    catalogo_traducciones (CatalogoTraducciones): Catálogo de traducciones compartido.
 """
 
 
+import asyncio
+import bisect
+import calendar
+import functools
+import hashlib
+import heapq
+import importlib.util
+import itertools
 import json
-import requests
-from bs4 import BeautifulSoup
-import psycopg2
+import aiohttp
+from urllib.parse import urljoin, urlsplit
+import metricas
 import os
+import random
+import re
+import sys
+import threading
+import time
+import unicodedata
 from dotenv import load_dotenv
-from datetime import datetime
+from collections import Counter, OrderedDict
+from datetime import date, datetime, timezone
 
 
-# URLs con torneos actuales
-URL = 'https://www.worldcubeassociation.org/competitions?region=Chile&search=&state=present&year=all+years&from_date=&to_date=&delegate=&display=list'
-WCA_URL = 'https://www.worldcubeassociation.org'
+def _importar_al_usar(nombre):
+    # Registra el módulo sin ejecutarlo: se importa recién al acceder al primero de sus atributos.
+    # psycopg2 tarda decenas de milisegundos en importarse y no se usa hasta abrir el pool.
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.find_spec(nombre)
+    cargador = importlib.util.LazyLoader(spec.loader)
+    spec.loader = cargador
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    cargador.exec_module(modulo)
+    return modulo
+
+
+# bs4 y lxml se importan dentro de sus parsers y psycopg2.pool y psycopg2.extras donde se usan
+psycopg2 = _importar_al_usar('psycopg2')
 
 load_dotenv()  # Cargar variables de entorno desde el archivo .env
 
+# URLs con torneos actuales (se pueden reemplazar, por ejemplo para apuntar a un servidor local de pruebas)
+WCA_URL = os.getenv('WCA_URL', 'https://www.worldcubeassociation.org')
+URL = WCA_URL + '/competitions?region=Chile&search=&state=present&year=all+years&from_date=&to_date=&delegate=&display=list'
+API_PAISES = os.getenv('WCA_API_PAISES', 'https://raw.githubusercontent.com/robiningelbrecht/wca-rest-api/master/api/countries.json')
+
+# Backend para parsear el listado de competencias ('lxml' o 'bs4')
+WCA_PARSER = os.getenv('WCA_PARSER', 'lxml')
+
+# Expresiones XPath de los elementos de cada fila del listado de competencias
+XPATH_COMPETENCIA = "//span[contains(concat(' ', normalize-space(@class), ' '), ' competition-info ')]"
+XPATH_FECHA = ".//span[contains(concat(' ', normalize-space(@class), ' '), ' date ')]"
+XPATH_LUGAR = ".//div[contains(concat(' ', normalize-space(@class), ' '), ' location ')]"
+XPATH_SIGUIENTE = "//a[@rel='next']/@href | //li[contains(concat(' ', normalize-space(@class), ' '), ' next ')]/a/@href"
+
+# Fechas del listado de competencias: 'Mar 2, 2024', 'Mar 2 - 3, 2024', 'Mar 30 - Apr 1, 2024',
+# 'Dec 30, 2023 - Jan 2, 2024'. El separador puede ser un guion, un guion largo o '~'.
+PATRON_FECHAS = re.compile(
+    r'\s*(?P<mes_inicio>[A-Za-z]+)\.?\s+(?P<dia_inicio>\d{1,2})(?:\s*,\s*(?P<anio_inicio>\d{4}))?'
+    r'(?:\s*[-\u2013\u2014~]\s*(?:(?P<mes_fin>[A-Za-z]+)\.?\s+)?(?P<dia_fin>\d{1,2}))?'
+    r'(?:\s*,?\s*(?P<anio_fin>\d{4}))?\s*$'
+)
+# Palabras de un lugar normalizado, para el índice de lugares de IndiceTorneos
+PATRON_PALABRAS = re.compile(r'\w+')
+
+# Filtros de !torneos: una clave seguida de dos puntos al inicio de una palabra (por ejemplo 'lugar:')
+PATRON_FILTRO = re.compile(r'(?<!\S)([^\s:,]+):')
+
+MESES = {mes: i for i, mes in enumerate(('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), start=1)}
+
+# Máximo de páginas del listado de competencias que se recorren por país
+WCA_MAX_PAGINAS = 50
+
+# Registro de países: tiempo de vida y copia local de respaldo
+PAISES_TTL = 24 * 60 * 60
+PAISES_SNAPSHOT = './json/paises_cache.json'
+
+# Espejo de torneos: vigencia de una copia, edad máxima que se entrega sin esperar a la WCA,
+# intervalo del refresco en segundo plano, tiempo que se refresca un país pedido y máximo en memoria
+ESPEJO_TTL = 10 * 60
+ESPEJO_OBSOLETO = 6 * 60 * 60
+ESPEJO_REFRESCO = 5 * 60
+ESPEJO_VIGENCIA_SOLICITUD = 7 * 24 * 60 * 60
+ESPEJO_MAX = 64
+
+# Configuración de los servidores que aún no la han cambiado
+CONFIGURACION_POR_DEFECTO = {'pais': 'Chile', 'idioma': 'es'}
+
+# Archivo con las traducciones de los mensajes del bot
+TRADUCCIONES_ARCHIVO = './json/mensajes.json'
+
 # Variables de entorno para la base de datos
 DB_URL = os.getenv('DATABASE_URL')
 DB_NAME = os.getenv('PGDATABASE')
@@ -50,189 +210,1748 @@ DB_PASSWORD = os.getenv('PGPASSWORD')
 DB_PORT = os.getenv('PGPORT')
 DB_USER = os.getenv('PGUSER')
 
+# Parámetros del pool de conexiones a la base de datos
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', 1))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', 5))
+DB_PING_INTERVALO = 60
+
+# Columnas de la tabla torneos, en el orden de Torneo.como_fila
+COLUMNAS_TORNEO = 'nombre, url, inicio, fin, lugar, pais'
+
+# Consultas fijas que se preparan en cada conexión del pool
+CONSULTAS_PREPARADAS = {
+    'cargar_torneos': f'SELECT {COLUMNAS_TORNEO} FROM torneos WHERE pais = $1 AND inicio >= $2',
+    'limpiar_torneos': 'DELETE FROM torneos WHERE fin < $1',
+    'cargar_suscripciones': 'SELECT canal_id, pais FROM suscripciones',
+    'agregar_suscripcion': 'INSERT INTO suscripciones (canal_id, pais) VALUES ($1, $2) ON CONFLICT DO NOTHING',
+    'eliminar_suscripcion': 'DELETE FROM suscripciones WHERE canal_id = $1 AND pais = $2',
+    'cargar_configuracion': 'SELECT guild_id, pais, idioma FROM configuracion_servidores',
+    'guardar_configuracion': 'INSERT INTO configuracion_servidores (guild_id, pais, idioma) VALUES ($1, $2, $3) ON CONFLICT (guild_id) DO UPDATE SET pais = EXCLUDED.pais, idioma = EXCLUDED.idioma',
+    'cargar_espejo': 'SELECT actualizado, hash, torneos FROM espejo_paises WHERE pais = $1',
+    'guardar_espejo': 'INSERT INTO espejo_paises (pais, actualizado, hash, torneos) VALUES ($1, $2, $3, $4) ON CONFLICT (pais) DO UPDATE SET actualizado = EXCLUDED.actualizado, hash = EXCLUDED.hash, torneos = EXCLUDED.torneos',
+    'tocar_espejo': 'UPDATE espejo_paises SET actualizado = $2 WHERE pais = $1 AND hash = $3',
+}
+
+SQL_CREAR_MIGRACIONES = '''
+    CREATE TABLE IF NOT EXISTS schema_migraciones (
+        version INTEGER PRIMARY KEY,
+        descripcion TEXT NOT NULL,
+        aplicada TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+'''
+
+MIGRACIONES_LOCK = 20240601
+
+# Migraciones del esquema, en orden. Una vez publicada, una migración no se modifica: los cambios
+# se agregan como una migración nueva. Todas son seguras sobre bases creadas antes de existir
+# las migraciones (las tablas y los índices pueden existir ya).
+MIGRACIONES = (
+    (1, 'Crear la tabla de torneos', '''
+        CREATE TABLE IF NOT EXISTS torneos (
+            nombre TEXT NOT NULL,
+            url TEXT NOT NULL,
+            inicio DATE NOT NULL,
+            fin DATE NOT NULL,
+            lugar TEXT NOT NULL,
+            pais TEXT NOT NULL
+        );
+    '''),
+    (2, 'URL única en torneos', '''
+        DELETE FROM torneos a USING torneos b WHERE a.url = b.url AND a.ctid < b.ctid;
+        CREATE UNIQUE INDEX IF NOT EXISTS torneos_url_unica ON torneos (url);
+    '''),
+    (3, 'Índices de torneos por país y fecha de inicio, y por fecha de término', '''
+        CREATE INDEX IF NOT EXISTS torneos_pais_inicio ON torneos (pais, inicio);
+        CREATE INDEX IF NOT EXISTS torneos_fin ON torneos (fin);
+    '''),
+    (4, 'Crear la tabla de suscripciones', '''
+        CREATE TABLE IF NOT EXISTS suscripciones (
+            canal_id BIGINT NOT NULL,
+            pais TEXT NOT NULL,
+            PRIMARY KEY (canal_id, pais)
+        );
+    '''),
+    (5, 'Crear la tabla de configuración de los servidores', '''
+        CREATE TABLE IF NOT EXISTS configuracion_servidores (
+            guild_id BIGINT PRIMARY KEY,
+            pais TEXT NOT NULL,
+            idioma TEXT NOT NULL
+        );
+    '''),
+    (6, 'Crear la tabla del espejo de torneos por país', '''
+        CREATE TABLE IF NOT EXISTS espejo_paises (
+            pais TEXT PRIMARY KEY,
+            actualizado TIMESTAMPTZ NOT NULL,
+            hash TEXT NOT NULL,
+            torneos JSONB NOT NULL
+        );
+    '''),
+)
+
+# Inserción masiva de torneos. Usa el índice único sobre torneos.url (migración 2).
+# (xmax = 0) solo es verdadero para las filas recién insertadas, no para las actualizadas.
+SQL_GUARDAR_TORNEOS = '''
+    INSERT INTO torneos (nombre, url, inicio, fin, lugar, pais) VALUES %s
+    ON CONFLICT (url) DO UPDATE SET
+        nombre = EXCLUDED.nombre,
+        inicio = EXCLUDED.inicio,
+        fin = EXCLUDED.fin,
+        pais = EXCLUDED.pais,
+        lugar = EXCLUDED.lugar
+    WHERE (torneos.nombre, torneos.inicio, torneos.fin, torneos.pais, torneos.lugar)
+        IS DISTINCT FROM (EXCLUDED.nombre, EXCLUDED.inicio, EXCLUDED.fin, EXCLUDED.pais, EXCLUDED.lugar)
+    RETURNING url, (xmax = 0) AS insertado;
+'''
+
+# Eliminación de varios torneos por URL en una sola sentencia
+SQL_ELIMINAR_TORNEOS = 'DELETE FROM torneos WHERE url = ANY(%s)'
+
+# Parámetros de la capa HTTP compartida
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5)
+HTTP_MAX_CONEXIONES = 10
+HTTP_MAX_PETICIONES = 5
+HTTP_PETICIONES_POR_SEGUNDO = float(os.getenv('HTTP_PETICIONES_POR_SEGUNDO', 2))
+
+# Reintentos de las peticiones HTTP: intentos por petición y espera base y máxima del backoff
+HTTP_INTENTOS = 3
+HTTP_ESPERA_BASE = 0.5
+HTTP_ESPERA_MAXIMA = 8
+
+# Circuito por host: fallos seguidos que lo abren y segundos que permanece abierto (se duplica en
+# cada apertura seguida, hasta el máximo)
+CIRCUITO_FALLOS = 5
+CIRCUITO_ESPERA = 30
+CIRCUITO_ESPERA_MAXIMA = 10 * 60
+
+# Sesión HTTP compartida (se crea en iniciar_sesion_http y vive mientras viva el bot)
+_sesion_http = None
+_semaforo_http = None
+
+
+class LimitadorTasa:
+    '''
+    Limita la cantidad de operaciones por segundo, espaciándolas de forma uniforme.
+    '''
+    def __init__(self, por_segundo):
+        self.intervalo = 1 / por_segundo if por_segundo > 0 else 0
+        self._siguiente = 0
+        self._lock = asyncio.Lock()
+
+    async def esperar(self):
+        '''
+        Espera hasta que se pueda realizar la siguiente operación.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        async with self._lock:
+            ahora = time.monotonic()
+            espera = self._siguiente - ahora
+            self._siguiente = max(ahora, self._siguiente) + self.intervalo
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+
+# Límite global de peticiones salientes por segundo
+limitador_http = LimitadorTasa(HTTP_PETICIONES_POR_SEGUNDO)
+
+# Validadores HTTP, hashes y torneos parseados de la última respuesta de cada listado de una página de la WCA
+_paginas_wca = {}
+
+# Métricas de la WCA, la base de datos y el espejo de torneos
+contador_wca = metricas.registro.contador('wca_peticiones_total', 'Peticiones y trabajo evitado al consultar la WCA, por resultado.')
+latencia_http = metricas.registro.histograma('http_segundos', 'Duración de las peticiones HTTP salientes por destino.')
+latencia_parseo = metricas.registro.histograma('parseo_segundos', 'Duración del parseo de una página del listado de competencias.')
+latencia_consulta = metricas.registro.histograma('consulta_torneos_segundos', 'Duración de la obtención de los torneos de un país (todas las páginas).')
+latencia_db = metricas.registro.histograma('db_segundos', 'Duración de las operaciones de base de datos, incluida la espera de una conexión.')
+contador_espejo = metricas.registro.contador('espejo_torneos_total', 'Consultas al espejo de torneos por resultado.')
+contador_reintentos = metricas.registro.contador('http_reintentos_total', 'Reintentos de peticiones HTTP por destino.')
+contador_circuito = metricas.registro.contador('circuito_eventos_total', 'Aperturas, cierres y peticiones rechazadas por el circuito de cada host.')
+indicador_circuito = metricas.registro.indicador('circuito_abierto', 'Vale 1 mientras el circuito del host está abierto.')
+
+
+async def iniciar_sesion_http():
+    '''
+    Crea la sesión HTTP compartida con un pool de conexiones keep-alive.
+    Si la sesión ya existe y está abierta, retorna la misma sesión.
 
-def db_conn():
+    Parámetros:
+    None
+
+    Retorna:
+    aiohttp.ClientSession: Sesión HTTP compartida.
     '''
-    Función para conectarse a la base de datos.
+    global _sesion_http, _semaforo_http
+    if _sesion_http is None or _sesion_http.closed:
+        conector = aiohttp.TCPConnector(limit=HTTP_MAX_CONEXIONES, keepalive_timeout=60, ttl_dns_cache=300)
+        _sesion_http = aiohttp.ClientSession(connector=conector, timeout=HTTP_TIMEOUT, raise_for_status=True)
+        _semaforo_http = asyncio.Semaphore(HTTP_MAX_PETICIONES)
+    return _sesion_http
+
+
+async def cerrar_sesion_http():
+    '''
+    Cierra la sesión HTTP compartida y libera las conexiones del pool.
 
     Parámetros:
     None
 
     Retorna:
-    psycopg2.extensions.connection: Conexión a la base de datos.
-    '''
-    return psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT
-            )
+    None
+    '''
+    global _sesion_http
+    if _sesion_http is not None and not _sesion_http.closed:
+        await _sesion_http.close()
+    _sesion_http = None
+
+
+class CircuitoAbierto(aiohttp.ClientError):
+    '''
+    Error de una petición rechazada sin enviarse porque el circuito de su host está abierto.
+    '''
+
+
+class CircuitoHost:
+    '''
+    Circuito de un host: deja de enviarle peticiones mientras está fallando.
+
+    - Cerrado: las peticiones pasan. Tras CIRCUITO_FALLOS fallos seguidos se abre.
+    - Abierto: las peticiones se rechazan con CircuitoAbierto, sin tocar la red, durante
+      CIRCUITO_ESPERA segundos (el doble cada vez que vuelve a abrirse, hasta CIRCUITO_ESPERA_MAXIMA).
+    - Semiabierto: pasado ese tiempo se deja pasar una sola petición de prueba. Si funciona el
+      circuito se cierra; si falla se vuelve a abrir.
+    '''
+    def __init__(self, host, fallos=CIRCUITO_FALLOS, espera=CIRCUITO_ESPERA, espera_maxima=CIRCUITO_ESPERA_MAXIMA):
+        self.host = host
+        self.fallos = fallos
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self.estado = 'cerrado'
+        self._fallos_seguidos = 0
+        self._aperturas = 0
+        self._abierto_hasta = 0
+        self._sondeando = False
+
+    def permitir(self):
+        '''
+        Verifica si se puede enviar una petición al host.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+
+        Excepciones:
+        CircuitoAbierto: Si el circuito está abierto o ya hay una petición de prueba en curso.
+        '''
+        if self.estado == 'abierto' and time.monotonic() >= self._abierto_hasta:
+            self.estado = 'semiabierto'
+        if self.estado == 'cerrado':
+            return
+        if self.estado == 'semiabierto' and not self._sondeando:
+            self._sondeando = True
+            return
+        contador_circuito.inc(host=self.host, evento='rechazada')
+        restante = max(0, self._abierto_hasta - time.monotonic())
+        raise CircuitoAbierto(f'{self.host} no responde; se reintentará en {restante:.0f} s')
+
+    def exito(self):
+        '''
+        Registra que el host respondió. Cierra el circuito si no lo estaba.
+        '''
+        if self.estado != 'cerrado':
+            contador_circuito.inc(host=self.host, evento='cerrado')
+            print(f'Circuito de {self.host} cerrado: el host volvió a responder.')
+        self.estado = 'cerrado'
+        self._fallos_seguidos = 0
+        self._aperturas = 0
+        self._sondeando = False
+        indicador_circuito.fijar(0, host=self.host)
+
+    def cancelar(self):
+        '''
+        Libera la petición de prueba si se canceló antes de terminar, para que la siguiente pueda probar.
+        '''
+        self._sondeando = False
+
+    def fallo(self):
+        '''
+        Registra un fallo del host. Abre el circuito si falló la petición de prueba o si se alcanzó
+        la cantidad de fallos seguidos.
+        '''
+        self._fallos_seguidos += 1
+        self._sondeando = False
+        if self.estado == 'semiabierto' or (self.estado == 'cerrado' and self._fallos_seguidos >= self.fallos):
+            espera = min(self.espera_maxima, self.espera * 2 ** self._aperturas)
+            self._aperturas += 1
+            self.estado = 'abierto'
+            self._abierto_hasta = time.monotonic() + espera
+            contador_circuito.inc(host=self.host, evento='abierto')
+            indicador_circuito.fijar(1, host=self.host)
+            print(f'Circuito de {self.host} abierto por {espera:.0f} s tras {self._fallos_seguidos} fallos seguidos.')
+
+    @property
+    def abierto(self):
+        '''
+        True si las peticiones al host se están rechazando.
+        '''
+        return self.estado == 'abierto'
+
+
+# Circuito de cada host (WCA y API de países)
+circuitos_http = {}
+
+
+def circuito_de(url):
+    '''
+    Retorna el circuito del host de una URL, creándolo si no existe.
+
+    Parámetros:
+    url (str): URL de la petición.
+
+    Retorna:
+    CircuitoHost: Circuito del host.
+    '''
+    host = urlsplit(url).netloc
+    if host not in circuitos_http:
+        circuitos_http[host] = CircuitoHost(host)
+    return circuitos_http[host]
+
+
+def _es_reintentable(error):
+    # Fallos del host (conexión, tiempo de espera, 429 y 5xx); un 404 o un JSON inválido no se reintentan
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def _espera_reintento(intento, error):
+    # Backoff exponencial con jitter completo; se respeta Retry-After si el host lo envía
+    espera = random.uniform(0, min(HTTP_ESPERA_MAXIMA, HTTP_ESPERA_BASE * 2 ** intento))
+    encabezados = getattr(error, 'headers', None) or {}
+    retry_after = encabezados.get('Retry-After', '')
+    if retry_after.isdigit():
+        espera = max(espera, min(HTTP_ESPERA_MAXIMA, int(retry_after)))
+    return espera
+
+
+async def _pedir(url, destino, leer, encabezados=None):
+    # Petición GET con la sesión compartida, el límite de tasa, reintentos y el circuito del host.
+    # leer recibe la respuesta y retorna su contenido.
+    circuito = circuito_de(url)
+    intento = 0
+    while True:
+        circuito.permitir()
+        # Desde aquí puede estar reservada la petición de prueba: toda espera va dentro del try
+        # para liberarla si la tarea se cancela
+        try:
+            sesion = await iniciar_sesion_http()
+            await limitador_http.esperar()
+            async with _semaforo_http:
+                with latencia_http.medir(destino=destino):
+                    async with sesion.get(url, headers=encabezados) as respuesta:
+                        resultado = await leer(respuesta)
+        except asyncio.CancelledError:
+            circuito.cancelar()
+            raise
+        except Exception as error:
+            if not _es_reintentable(error):
+                # El host respondió: el error es de la petición, no de su salud
+                circuito.exito()
+                raise
+            circuito.fallo()
+            intento += 1
+            if intento >= HTTP_INTENTOS or circuito.abierto:
+                raise
+            contador_reintentos.inc(destino=destino)
+            await asyncio.sleep(_espera_reintento(intento - 1, error))
+            continue
+        circuito.exito()
+        return resultado
+
+
+async def obtener_texto(url):
+    '''
+    Realiza una petición GET usando la sesión compartida y retorna el cuerpo como texto.
+
+    Parámetros:
+    url (str): URL a consultar.
+
+    Retorna:
+    str: Cuerpo de la respuesta.
+    '''
+    return await _pedir(url, 'wca', lambda respuesta: respuesta.text())
+
+
+async def obtener_texto_condicional(url, encabezados):
+    '''
+    Realiza una petición GET condicional usando la sesión compartida.
+
+    Parámetros:
+    url (str): URL a consultar.
+    encabezados (dict): Encabezados de la petición (If-None-Match, If-Modified-Since).
+
+    Retorna:
+    dict: Estado HTTP, cuerpo (None si el estado es 304), ETag y Last-Modified de la respuesta.
+    '''
+    async def leer(respuesta):
+        return {
+            'estado': respuesta.status,
+            'texto': None if respuesta.status == 304 else await respuesta.text(),
+            'etag': respuesta.headers.get('ETag'),
+            'last_modified': respuesta.headers.get('Last-Modified'),
+        }
+
+    return await _pedir(url, 'wca', leer, encabezados)
+
+
+async def obtener_json(url):
+    '''
+    Realiza una petición GET usando la sesión compartida y retorna el cuerpo como JSON.
+
+    Parámetros:
+    url (str): URL a consultar.
+
+    Retorna:
+    dict: Cuerpo de la respuesta en formato JSON.
+    '''
+    # raw.githubusercontent.com responde con text/plain, por lo que no se valida el content-type
+    return await _pedir(url, 'paises', lambda respuesta: respuesta.json(content_type=None))
 
 
-def cargar_torneos_conocidos():
+@functools.cache
+def _clase_conexion_pool():
+    # La clase hereda de psycopg2, por lo que se crea al abrir el pool y no al importar el módulo
+    class _ConexionPool(psycopg2.extensions.connection):
+        '''
+        Conexión del pool que recuerda si ya tiene las consultas preparadas y cuándo se usó por última vez.
+        '''
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.preparada = False
+            self.ultimo_uso = time.monotonic()
+
+    return _ConexionPool
+
+
+class PoolBaseDeDatos:
+    '''
+    Pool de conexiones a la base de datos.
+
+    Las conexiones se reutilizan entre llamadas, se verifican con un SELECT 1 si estuvieron
+    inactivas más de DB_PING_INTERVALO segundos y tienen preparadas las consultas fijas del bot.
+    Las operaciones se ejecutan en un hilo aparte para no bloquear el event loop de Discord.
+    '''
+    def __init__(self, minimo=DB_POOL_MIN, maximo=DB_POOL_MAX):
+        self.minimo = minimo
+        self.maximo = maximo
+        self._pool = None
+        self._lock = threading.Lock()
+        # ThreadedConnectionPool lanza un error si se agota, por lo que se limita con un semáforo
+        self._disponibles = threading.BoundedSemaphore(maximo)
+        self.en_uso = 0
+
+    def _crear_pool(self):
+        import psycopg2.pool
+        with self._lock:
+            if self._pool is None:
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    self.minimo,
+                    self.maximo,
+                    connection_factory=_clase_conexion_pool(),
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASSWORD,
+                    host=DB_HOST,
+                    port=DB_PORT
+                    )
+        return self._pool
+
+    def _preparar(self, conn):
+        with conn.cursor() as cur:
+            for nombre, consulta in CONSULTAS_PREPARADAS.items():
+                cur.execute(f'PREPARE {nombre} AS {consulta};')
+        conn.commit()
+        conn.preparada = True
+
+    def _conexion_sana(self, conn):
+        if conn.closed:
+            return False
+        if time.monotonic() - conn.ultimo_uso < DB_PING_INTERVALO:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1;')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _obtener_conexion(self, preparar=True):
+        pool = self._crear_pool()
+        conn = pool.getconn()
+        if not self._conexion_sana(conn):
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+        if preparar and not conn.preparada:
+            try:
+                self._preparar(conn)
+            except psycopg2.Error:
+                pool.putconn(conn, close=True)
+                raise
+        return conn
+
+    def _ejecutar(self, funcion, preparar=True):
+        with self._disponibles:
+            conn = self._obtener_conexion(preparar)
+            cerrar = False
+            with self._lock:
+                self.en_uso += 1
+            try:
+                with conn.cursor() as cur:
+                    resultado = funcion(cur)
+                conn.commit()
+                return resultado
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                # La conexión quedó inutilizable, se descarta en vez de devolverla al pool
+                cerrar = True
+                raise
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.ultimo_uso = time.monotonic()
+                self._pool.putconn(conn, close=cerrar)
+                with self._lock:
+                    self.en_uso -= 1
+
+    async def iniciar(self):
+        '''
+        Abre las conexiones mínimas del pool.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        await asyncio.to_thread(self._crear_pool)
+
+    async def ejecutar(self, funcion, preparar=True, operacion=None):
+        '''
+        Ejecuta una función con un cursor del pool dentro de una transacción.
+
+        Parámetros:
+        funcion (callable): Función que recibe un cursor y retorna el resultado.
+        preparar (bool): Si es False no se preparan las consultas fijas (necesario para crear tablas).
+        operacion (str): Nombre de la operación en las métricas. Por defecto, el nombre de la función.
+
+        Retorna:
+        object: Resultado de la función.
+        '''
+        with latencia_db.medir(operacion=operacion or funcion.__name__.lstrip('_')):
+            return await asyncio.to_thread(self._ejecutar, funcion, preparar)
+
+    async def consultar(self, nombre, parametros=()):
+        '''
+        Ejecuta una consulta preparada y retorna las filas obtenidas.
+
+        Parámetros:
+        nombre (str): Nombre de la consulta en CONSULTAS_PREPARADAS.
+        parametros (tuple): Parámetros de la consulta.
+
+        Retorna:
+        list: Filas obtenidas.
+        '''
+        def _consultar(cur):
+            cur.execute(_sql_execute(nombre, parametros), parametros)
+            return cur.fetchall()
+        return await self.ejecutar(_consultar, operacion=nombre)
+
+    async def modificar(self, nombre, parametros=()):
+        '''
+        Ejecuta una consulta preparada que modifica datos y retorna la cantidad de filas afectadas.
+
+        Parámetros:
+        nombre (str): Nombre de la consulta en CONSULTAS_PREPARADAS.
+        parametros (tuple): Parámetros de la consulta.
+
+        Retorna:
+        int: Cantidad de filas afectadas.
+        '''
+        def _modificar(cur):
+            cur.execute(_sql_execute(nombre, parametros), parametros)
+            return cur.rowcount
+        return await self.ejecutar(_modificar, operacion=nombre)
+
+    async def cerrar(self):
+        '''
+        Cierra todas las conexiones del pool.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.closeall)
+            self._pool = None
+
+
+def _sql_execute(nombre, parametros):
+    if not parametros:
+        return f'EXECUTE {nombre};'
+    return f'EXECUTE {nombre} ({", ".join(["%s"] * len(parametros))});'
+
+
+# Pool de conexiones compartido por el bot
+pool_db = PoolBaseDeDatos()
+
+metricas.registro.indicador('db_conexiones_en_uso', 'Conexiones del pool de base de datos en uso.', lambda: pool_db.en_uso)
+metricas.registro.indicador('db_conexiones_maximo', 'Conexiones máximas del pool de base de datos.', lambda: pool_db.maximo)
+
+
+async def migrar_base_de_datos():
     '''
-    Carga los torneos guardados en la base de datos y los retorna en una lista de diccionarios con los torneos.
+    Aplica las migraciones de MIGRACIONES que aún no están en la tabla schema_migraciones.
+    Todas se aplican en una sola transacción, por lo que si una falla no se aplica ninguna.
+    Debe ejecutarse antes de cualquier otra consulta, ya que las consultas preparadas
+    necesitan que las tablas existan.
 
     Parámetros:
     None
 
     Retorna:
-    list: Lista de diccionarios con los torneos guardados en la base de datos.
+    list: Versiones de las migraciones aplicadas.
     '''
+    def _migrar(cur):
+        # Evita que dos instancias del bot migren a la vez; se libera al terminar la transacción
+        cur.execute('SELECT pg_advisory_xact_lock(%s);', (MIGRACIONES_LOCK,))
+        cur.execute(SQL_CREAR_MIGRACIONES)
+        cur.execute('SELECT version FROM schema_migraciones;')
+        aplicadas = {fila[0] for fila in cur.fetchall()}
+
+        nuevas = []
+        for version, descripcion, sql in MIGRACIONES:
+            if version in aplicadas:
+                continue
+            cur.execute(sql)
+            cur.execute('INSERT INTO schema_migraciones (version, descripcion) VALUES (%s, %s);', (version, descripcion))
+            nuevas.append(version)
+        return nuevas
+
     try:
-        conn = db_conn()
-        cur = conn.cursor()
-        # Obtener los torneos con fecha mayor o igual a la fecha actual
-        cur.execute('SELECT * FROM torneos WHERE inicio >= %s;', (obtener_fecha_actual(),))
-        resultados = cur.fetchall()
-        cur.close()
-        conn.close()
-
-        torneos_conocidos = []
-        for resultado in resultados:
-            torneo = {
-                "Nombre torneo": resultado[1],
-                "URL": resultado[6],
-                "Fecha inicio": resultado[2],
-                "Fecha fin": resultado[3],
-                "Lugar": resultado[5],
-                "Pais": resultado[4]
-            }
-            torneos_conocidos.append(torneo)
-
-        return torneos_conocidos
+        nuevas = await pool_db.ejecutar(_migrar, preparar=False, operacion='migrar')
     except (Exception, psycopg2.DatabaseError) as error:
-        print(error)
+        print('Error al migrar la base de datos:', error)
+        return []
 
+    descripciones = {version: descripcion for version, descripcion, _ in MIGRACIONES}
+    for version in nuevas:
+        print(f'Migración {version} aplicada: {descripciones[version]}')
+    return nuevas
 
-def obtener_torneos(url, pais):
+
+async def cargar_torneos_conocidos(pais):
     '''
-    Obtiene los torneos desde la URL ingresada y retorna una lista de diccionarios con los torneos encontrados.
+    Carga los torneos vigentes de un país guardados en la base de datos.
 
     Parámetros:
-    url (str): URL de la WCA.
-    pais (str): Nombre o código de país.
+    pais (str): País con formato de URL.
 
     Retorna:
-    list: Lista de diccionarios con los torneos encontrados.
+    list: Lista de torneos guardados en la base de datos.
+
+    Excepciones:
+    psycopg2.DatabaseError: Si no se pudieron leer; una falla no se confunde con que no haya torneos.
+    '''
+    # Obtener los torneos del país con fecha mayor o igual a la fecha actual (índice (pais, inicio))
+    resultados = await pool_db.consultar('cargar_torneos', (pais, obtener_fecha_actual()))
+    return [Torneo.desde_fila(resultado) for resultado in resultados]
+
+
+class Torneo:
+    '''
+    Torneo de la WCA.
+
+    Es inmutable, usa __slots__ para ocupar poca memoria y se identifica por su URL. El país y el
+    lugar se internan porque se repiten en muchos torneos. Se construye desde el HTML de la WCA
+    con Torneo.desde_html o desde la base de datos con Torneo.desde_fila.
+    '''
+    __slots__ = ('nombre', 'url', 'inicio', 'fin', 'lugar', 'pais', '_hash_contenido')
+
+    def __init__(self, nombre, url, inicio, fin, lugar, pais):
+        asignar = object.__setattr__
+        asignar(self, 'nombre', nombre)
+        asignar(self, 'url', url)
+        asignar(self, 'inicio', inicio)
+        asignar(self, 'fin', fin)
+        asignar(self, 'lugar', sys.intern(lugar))
+        asignar(self, 'pais', sys.intern(pais))
+        asignar(self, '_hash_contenido', None)
+
+    @classmethod
+    def desde_html(cls, nombre, enlace, inicio, fin, lugar, pais):
+        '''
+        Crea un torneo desde los datos de una fila del listado de competencias de la WCA.
+
+        Parámetros:
+        nombre (str): Nombre del torneo.
+        enlace (str): Ruta del torneo en la WCA (por ejemplo '/competitions/ChileOpen2024').
+        inicio (datetime.date): Fecha de inicio.
+        fin (datetime.date): Fecha de término.
+        lugar (str): Lugar tal como lo muestra la WCA.
+        pais (str): País con formato de URL.
+
+        Retorna:
+        Torneo: Torneo creado.
+        '''
+        return cls(nombre, WCA_URL + enlace, inicio, fin, lugar.replace(pais + ', ', ''), pais)
+
+    @classmethod
+    def desde_fila(cls, fila):
+        '''
+        Crea un torneo desde una fila de la base de datos con las columnas de COLUMNAS_TORNEO.
+
+        Parámetros:
+        fila (tuple): Fila de la tabla torneos.
+
+        Retorna:
+        Torneo: Torneo creado.
+        '''
+        return cls(*fila)
+
+    def como_fila(self):
+        '''
+        Retorna los datos del torneo en el orden de COLUMNAS_TORNEO.
+        '''
+        return (self.nombre, self.url, self.inicio, self.fin, self.lugar, self.pais)
+
+    @property
+    def clave(self):
+        '''
+        Identificador estable del torneo (su URL).
+        '''
+        return self.url
+
+    @property
+    def hash_contenido(self):
+        '''
+        Hash del contenido del torneo. Los espacios del nombre y del lugar se normalizan para que
+        un cambio de formato en la página de la WCA no se confunda con un cambio real.
+        Se calcula una sola vez por torneo.
+        '''
+        if self._hash_contenido is None:
+            contenido = '\x1f'.join((
+                ' '.join(self.nombre.split()),
+                self.inicio.isoformat(),
+                self.fin.isoformat(),
+                ' '.join(self.lugar.split()).casefold(),
+            ))
+            object.__setattr__(self, '_hash_contenido', hashlib.blake2b(contenido.encode('utf-8'), digest_size=16).hexdigest())
+        return self._hash_contenido
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError('Torneo es inmutable')
+
+    def __delattr__(self, nombre):
+        raise AttributeError('Torneo es inmutable')
+
+    def __eq__(self, otro):
+        if not isinstance(otro, Torneo):
+            return NotImplemented
+        return self.como_fila() == otro.como_fila()
+
+    def __hash__(self):
+        return hash(self.url)
+
+    def __repr__(self):
+        return f'Torneo({self.nombre!r}, {self.url!r}, {self.inicio!r}, {self.fin!r}, {self.lugar!r}, {self.pais!r})'
+
+
+def _texto(elemento):
+    # Equivalente a get_text(strip=True) de BeautifulSoup para elementos de lxml
+    return ''.join(parte.strip() for parte in elemento.itertext())
+
+
+def _pagina_lxml(html):
+    import lxml.html
+    documento = lxml.html.fromstring(html)
+    siguiente = next(iter(documento.xpath(XPATH_SIGUIENTE)), None)
+
+    def filas():
+        for info in documento.xpath(XPATH_COMPETENCIA):
+            # La fila es el <li> que contiene la competencia; fecha, lugar y enlace se buscan solo dentro de ella
+            fila = next(iter(info.xpath('ancestor::li[1]')), info.getparent())
+            enlace = next(iter(info.xpath('.//a[@href]')), None)
+            fecha = next(iter(fila.xpath(XPATH_FECHA)), None)
+            lugar = next(iter(fila.xpath(XPATH_LUGAR)), None)
+            if enlace is None or fecha is None or lugar is None:
+                print('Se omitió una fila de competencia incompleta.')
+                continue
+            yield enlace.text_content().strip(), enlace.get('href'), _texto(fecha), _texto(lugar)
+
+    return filas(), siguiente
+
+
+def _pagina_bs4(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    enlace_siguiente = soup.find('a', rel='next') or soup.select_one('li.next a')
+    siguiente = enlace_siguiente.get('href') if enlace_siguiente else None
+
+    def filas():
+        for info in soup.find_all('span', class_='competition-info'):
+            fila = info.find_parent('li') or info.parent
+            enlace = info.find('a', href=True)
+            fecha = fila.find('span', class_='date')
+            lugar = fila.find('div', class_='location')
+            if enlace is None or fecha is None or lugar is None:
+                print('Se omitió una fila de competencia incompleta.')
+                continue
+            yield enlace.text.strip(), enlace['href'], fecha.get_text(strip=True), lugar.get_text(strip=True)
+
+    return filas(), siguiente
+
+
+# Backends disponibles para recorrer las filas del listado de competencias.
+# Cada uno retorna un generador de filas y el enlace a la página siguiente (o None).
+PARSERS_WCA = {
+    'lxml': _pagina_lxml,
+    'bs4': _pagina_bs4,
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def parsear_fechas(texto):
+    '''
+    Obtiene la fecha de inicio y de término desde el texto de fecha de la WCA.
+    Acepta todos los formatos que muestra la WCA:
+        'Mar 2, 2024', 'Mar 2 - 3, 2024', 'Mar 30 - Apr 1, 2024' y 'Dec 30, 2023 - Jan 2, 2024'.
+    Los resultados se memorizan, ya que las mismas fechas se repiten entre páginas y consultas.
+
+    Parámetros:
+    texto (str): Fecha mostrada por la WCA.
+
+    Retorna:
+    tuple: (fecha de inicio, fecha de término) como datetime.date.
+
+    Excepciones:
+    ValueError: Si el texto no es una fecha de la WCA (formato, mes, día o año inválido, o sin año).
     '''
+    coincidencia = PATRON_FECHAS.match(texto)
+    if coincidencia is None:
+        raise ValueError(f'Formato de fecha desconocido: {texto!r}')
+
+    mes_inicio, dia_inicio, anio_inicio, mes_fin, dia_fin, anio_fin = coincidencia.groups()
     try:
-        pais = obtener_pais_para_url(pais)
-        url = url.replace('Chile', pais)
-        respuesta = requests.get(url)
-        respuesta.raise_for_status() # Genera una excepción si la solicitud no es exitosa
-        soup = BeautifulSoup(respuesta.text, 'html.parser')
-
-        elementos_competencia = soup.find_all('span', class_='competition-info')
-        elementos_fecha = soup.find_all('span', class_='date')
-        elementos_lugar = soup.find_all('div', class_='location')
-
-        # Verificar si existen torneos
-        if not elementos_competencia or not elementos_fecha or not elementos_lugar:
-            print('No se encontraron torneos.')
-            return []
+        mes_inicio = MESES[mes_inicio[:3].lower()]
+        mes_fin = MESES[mes_fin[:3].lower()] if mes_fin else mes_inicio
+    except KeyError:
+        raise ValueError(f'Mes desconocido en la fecha: {texto!r}') from None
+    if not (anio_inicio or anio_fin):
+        raise ValueError(f'Fecha sin año: {texto!r}')
 
-        torneos = []
+    anio_fin = int(anio_fin or anio_inicio)
+    anio_inicio = int(anio_inicio) if anio_inicio else anio_fin
+    fecha_inicio = date(anio_inicio, mes_inicio, int(dia_inicio))
+    fecha_fin = date(anio_fin, mes_fin, int(dia_fin)) if dia_fin else fecha_inicio
 
-        for competencia, fecha, lugar in zip(elementos_competencia, elementos_fecha, elementos_lugar):
-            enlace = competencia.find('a')
-            nombre_torneo = enlace.text.strip()
-            url = WCA_URL + enlace['href']
+    # Rango que cruza el año sin indicar el año de inicio (por ejemplo 'Dec 30 - Jan 2, 2024')
+    if fecha_fin < fecha_inicio and not coincidencia.group('anio_inicio'):
+        fecha_inicio = fecha_inicio.replace(year=anio_fin - 1)
 
-            _fecha = fecha.get_text(strip=True).replace(',', '')
-            mes = _fecha.split(' ')[0].strip()
+    return fecha_inicio, fecha_fin
 
-            if '-' in _fecha:
-                anio = _fecha.split(' ')[4]
 
-                _fecha_inicio = mes + ' ' + _fecha.split(' ')[1] + ' ' + anio
-                fecha_inicio = datetime.strptime(_fecha_inicio, "%b %d %Y").date()
-                
-                _fecha_fin = mes + ' ' + _fecha.split(' ')[3] + ' ' + anio
-                fecha_fin = datetime.strptime(_fecha_fin, "%b %d %Y").date()
-                
-            else:
-                fecha_inicio = datetime.strptime(_fecha, "%b %d %Y").date()
-                fecha_fin = fecha_inicio
+def parsear_pagina(html, pais, parser=None):
+    '''
+    Parsea una página del listado de competencias de la WCA.
+    Cada fila se recorre una sola vez y el nombre, URL, fecha y lugar se toman de la misma fila,
+    por lo que una fila incompleta se omite sin desalinear las siguientes.
 
-            lugar = lugar.get_text(strip=True).replace(pais + ', ', '')
+    Parámetros:
+    html (str): HTML de la página de competencias.
+    pais (str): País con formato de URL.
+    parser (str): Backend a usar ('lxml' o 'bs4'). Por defecto WCA_PARSER.
 
-            torneo = {
-                "Nombre torneo": nombre_torneo,
-                "URL": url,
-                "Fecha inicio": fecha_inicio,
-                "Fecha fin": fecha_fin,
-                "Lugar": lugar,
-                "Pais": pais
-            }
+    Retorna:
+    tuple: (generador de torneos de la página, enlace a la página siguiente o None).
+    '''
+    filas, siguiente = PARSERS_WCA[parser or WCA_PARSER](html)
 
-            torneos.append(torneo)
+    def torneos():
+        for nombre_torneo, enlace, fecha, lugar in filas:
+            try:
+                fecha_inicio, fecha_fin = parsear_fechas(fecha)
+            except (ValueError, IndexError):
+                print(f'No se pudo interpretar la fecha {fecha!r} del torneo {nombre_torneo}.')
+                continue
 
-        return torneos
+            yield Torneo.desde_html(nombre_torneo, enlace, fecha_inicio, fecha_fin, lugar, pais)
 
-    except requests.exceptions.RequestException as e:
-        print('Error con la petición HTTP:', e)
-        return []
+    return torneos(), siguiente
 
 
-def guardar_torneo(torneo: dict):
+def parsear_torneos(html, pais, parser=None):
     '''
-    Guarda el torneo ingresado en la base de datos.
+    Extrae los torneos de una página del listado de competencias de la WCA.
 
     Parámetros:
-    torneo (dict): Torneo a guardar.
+    html (str): HTML de la página de competencias.
+    pais (str): País con formato de URL.
+    parser (str): Backend a usar ('lxml' o 'bs4'). Por defecto WCA_PARSER.
 
     Retorna:
-    None
+    list: Lista de torneos encontrados.
     '''
-    try:
-        conn = db_conn()
-        cur = conn.cursor()
-        cur.execute('INSERT INTO torneos (nombre, inicio, fin, pais, lugar, url) VALUES (%s, %s, %s, %s, %s, %s);', (torneo['Nombre torneo'], torneo['Fecha inicio'], torneo['Fecha fin'], torneo['Pais'], torneo['Lugar'], torneo['URL']))
-        conn.commit()
-        cur.close()
-        conn.close()
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(error)
+    torneos = list(parsear_pagina(html, pais, parser)[0])
+
+    if not torneos:
+        print('No se encontraron torneos.')
+
+    return torneos
+
+
+async def _recorrer_paginas(url, pais, html=None, estado=None):
+    # Recorre el listado siguiendo la paginación. Solo se mantiene en memoria una página a la vez.
+    # Si se entrega html, se usa como cuerpo de la primera página en vez de descargarla.
+    # Si se entrega estado, se guarda en él la cantidad de páginas recorridas.
+    visitadas = set()
+    while url and url not in visitadas and len(visitadas) < WCA_MAX_PAGINAS:
+        visitadas.add(url)
+        if estado is not None:
+            estado['paginas'] = len(visitadas)
+        if html is None:
+            html = await obtener_texto(url)
+            contador_wca.inc(resultado='descargada')
+        contador_wca.inc(resultado='parseada')
+        # La página se parsea completa de una vez para medir su costo real en el event loop
+        with latencia_parseo.medir(backend=WCA_PARSER):
+            torneos, siguiente = parsear_pagina(html, pais)
+            torneos = list(torneos)
+        html = None
+        for torneo in torneos:
+            yield torneo
+        url = urljoin(url, siguiente) if siguiente else None
+
+
+async def iterar_torneos(url, pais, limite=None):
+    '''
+    Recorre los torneos de un país página por página, entregando cada torneo apenas se parsea.
+    Permite detenerse antes de descargar todas las páginas.
 
+    Parámetros:
+    url (str): URL de la WCA.
+    pais (str): Nombre o código de país.
+    limite (int): Cantidad máxima de torneos a entregar. Por defecto, todos.
 
-def obtener_fecha_actual():
+    Retorna:
+    AsyncIterator[Torneo]: Torneos encontrados.
     '''
-    Retorna la fecha actual.
+    pais = await obtener_pais_para_url(pais)
+    url = url.replace('Chile', pais)
+    entregados = 0
+    async for torneo in _recorrer_paginas(url, pais):
+        yield torneo
+        entregados += 1
+        if limite is not None and entregados >= limite:
+            return
+
+
+async def consultar_torneos(url, pais):
+    '''
+    Obtiene todos los torneos de un país usando una petición condicional (ETag / Last-Modified)
+    para la primera página. Si la WCA responde 304 o el HTML es idéntico al de la última consulta,
+    se reutilizan los torneos ya parseados sin volver a parsear la página. Solo se recuerdan los
+    listados de una página: con más de una, que la primera no cambie no garantiza que las demás
+    tampoco, así que no se guarda una segunda copia de los torneos de los países grandes.
 
     Parámetros:
-    None
+    url (str): URL de la WCA.
+    pais (str): Nombre o código de país.
 
     Retorna:
-    datetime.date: Fecha actual.
+    tuple: (lista de torneos, hash del contenido de los torneos). Si el hash es igual al de una
+    consulta anterior, los torneos no cambiaron.
     '''
-    return datetime.now().date()
+    pais = await obtener_pais_para_url(pais)
+    url = url.replace('Chile', pais)
+    anterior = _paginas_wca.get(url)
+
+    encabezados = {}
+    if anterior is not None:
+        if anterior['etag']:
+            encabezados['If-None-Match'] = anterior['etag']
+        if anterior['last_modified']:
+            encabezados['If-Modified-Since'] = anterior['last_modified']
+
+    respuesta = await obtener_texto_condicional(url, encabezados)
+    contador_wca.inc(resultado='descargada')
+
+    if respuesta['estado'] == 304 and anterior is not None:
+        contador_wca.inc(resultado='no_modificada')
+        return list(anterior['torneos']), anterior['hash_contenido']
+
+    html = respuesta['texto']
+    hash_html = hashlib.blake2b(html.encode('utf-8'), digest_size=16).hexdigest()
+    if anterior is not None and anterior['hash_html'] == hash_html:
+        # HTML idéntico: no se vuelve a parsear
+        contador_wca.inc(resultado='html_igual')
+        anterior['etag'] = respuesta['etag']
+        anterior['last_modified'] = respuesta['last_modified']
+        return list(anterior['torneos']), anterior['hash_contenido']
+
+    torneos = []
+    estado = {'paginas': 1}
+    hash_contenido = hashlib.blake2b(digest_size=16)
+    async for torneo in _recorrer_paginas(url, pais, html, estado):
+        torneos.append(torneo)
+        hash_contenido.update((torneo.url + torneo.hash_contenido).encode('utf-8'))
+    hash_contenido = hash_contenido.hexdigest()
+    if anterior is not None and anterior['hash_contenido'] == hash_contenido:
+        # El HTML cambió pero los torneos no (por ejemplo, tokens o contenido dinámico de la página)
+        contador_wca.inc(resultado='contenido_igual')
+
+    if estado['paginas'] > 1:
+        _paginas_wca.pop(url, None)
+        return torneos, hash_contenido
+    _paginas_wca[url] = {
+        'etag': respuesta['etag'],
+        'last_modified': respuesta['last_modified'],
+        'hash_html': hash_html,
+        'hash_contenido': hash_contenido,
+        'torneos': torneos,
+    }
+    return list(torneos), hash_contenido
+
+
+def normalizar_texto(texto):
+    '''
+    Normaliza un texto para compararlo: minúsculas, sin tildes y con los espacios simplificados.
+
+    Parámetros:
+    texto (str): Texto a normalizar.
+
+    Retorna:
+    str: Texto normalizado.
+
+    Ejemplo:
+    >>> normalizar_texto('  San José ')
+    'san jose'
+    '''
+    descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+    return ' '.join(''.join(c for c in descompuesto if not unicodedata.combining(c)).split())
+
+
+class IndiceTorneos:
+    '''
+    Índice en memoria de los torneos del espejo para responder consultas con filtros.
+
+    Por cada país guarda sus torneos ordenados por fecha de inicio, de modo que un rango de fechas
+    se acota con bisect, y un índice invertido de las palabras del lugar. Una consulta sobre varios
+    países mezcla listas ya ordenadas y se detiene al alcanzar el límite.
+    '''
+    def __init__(self):
+        self._paises = {}
+
+    def indexar(self, pais, torneos):
+        '''
+        Reemplaza los torneos indexados de un país.
+
+        Parámetros:
+        pais (str): País con formato de URL.
+        torneos (list): Torneos del país.
+
+        Retorna:
+        None
+        '''
+        ordenados = sorted(torneos, key=lambda t: (t.inicio, t.nombre))
+        lugares = [normalizar_texto(t.lugar) for t in ordenados]
+        palabras = {}
+        for posicion, lugar in enumerate(lugares):
+            for palabra in set(PATRON_PALABRAS.findall(lugar)):
+                palabras.setdefault(palabra, []).append(posicion)
+        self._paises[pais] = {
+            'torneos': ordenados,
+            'inicios': [t.inicio for t in ordenados],
+            'lugares': lugares,
+            'palabras': palabras,
+        }
+
+    def eliminar(self, pais=None):
+        '''
+        Elimina del índice un país (con formato de URL), o todos si no se indica.
+
+        Parámetros:
+        pais (str): País con formato de URL.
+
+        Retorna:
+        None
+        '''
+        if pais is None:
+            self._paises.clear()
+        else:
+            self._paises.pop(pais, None)
+
+    def _posiciones_lugar(self, indice, lugar):
+        # Cada palabra buscada debe estar contenida en alguna palabra del lugar (así 'sant' encuentra
+        # 'santiago'); se recorren las palabras distintas del país, que son pocas, y no los torneos
+        candidatas = None
+        for buscada in PATRON_PALABRAS.findall(lugar):
+            posiciones = set()
+            for palabra, lista in indice['palabras'].items():
+                if buscada in palabra:
+                    posiciones.update(lista)
+            candidatas = posiciones if candidatas is None else candidatas & posiciones
+            if not candidatas:
+                return []
+        # El texto completo debe aparecer tal cual (por ejemplo 'san jose' y no 'jose ... san')
+        return sorted(p for p in candidatas or () if lugar in indice['lugares'][p])
+
+    def buscar(self, paises, lugar=None, desde=None, hasta=None, limite=None):
+        '''
+        Busca torneos en el índice.
+
+        Parámetros:
+        paises (list): Países con formato de URL. Los que no están indexados se ignoran.
+        lugar (str): Texto que debe contener el lugar del torneo (sin importar tildes ni mayúsculas).
+        desde (datetime.date): Fecha de inicio mínima.
+        hasta (datetime.date): Fecha de inicio máxima.
+        limite (int): Cantidad máxima de torneos.
+
+        Retorna:
+        list: Torneos encontrados, ordenados por fecha de inicio.
+        '''
+        lugar = normalizar_texto(lugar) if lugar else None
+        listas = []
+        for pais in paises:
+            indice = self._paises.get(pais)
+            if indice is None:
+                continue
+            primero = bisect.bisect_left(indice['inicios'], desde) if desde else 0
+            ultimo = bisect.bisect_right(indice['inicios'], hasta) if hasta else len(indice['inicios'])
+            if lugar:
+                posiciones = [p for p in self._posiciones_lugar(indice, lugar) if primero <= p < ultimo]
+            else:
+                posiciones = range(primero, ultimo)
+            # Con límite la lista se recorre solo hasta completarlo; map fija la lista de este país
+            listas.append(list(map(indice['torneos'].__getitem__, posiciones)) if limite is None else map(indice['torneos'].__getitem__, posiciones))
+
+        if len(listas) == 1 and limite is None:
+            return listas[0]
+        mezcla = heapq.merge(*listas, key=lambda t: (t.inicio, t.nombre))
+        return list(itertools.islice(mezcla, limite))
+
+
+class FiltroTorneos:
+    '''
+    Consulta de torneos: regiones (países o continentes), lugar, rango de fechas de inicio y límite.
+
+    Se construye desde el texto de !torneos con FiltroTorneos.desde_texto, por ejemplo
+    'chile, argentina lugar:santiago mes:2024-06 limite:5', y se guarda en pocos caracteres con
+    codificar para que los botones de paginación puedan repetir la consulta.
+    '''
+    __slots__ = ('regiones', 'lugar', 'desde', 'hasta', 'limite')
+
+    # Nombre de cada filtro en los idiomas del bot
+    CLAVES = {
+        'lugar': 'lugar', 'ciudad': 'lugar', 'city': 'lugar', 'location': 'lugar', 'cidade': 'lugar', 'local': 'lugar',
+        'desde': 'desde', 'from': 'desde',
+        'hasta': 'hasta', 'to': 'hasta', 'ate': 'hasta', 'até': 'hasta',
+        'mes': 'mes', 'month': 'mes', 'mês': 'mes',
+        'limite': 'limite', 'límite': 'limite', 'limit': 'limite',
+    }
+    # Valores de mes: para el mes actual
+    MES_ACTUAL = ('actual', 'current', 'atual')
+
+    def __init__(self, regiones, lugar=None, desde=None, hasta=None, limite=None):
+        self.regiones = tuple(regiones)
+        self.lugar = lugar
+        self.desde = desde
+        self.hasta = hasta
+        self.limite = limite
+
+    @property
+    def es_simple(self):
+        '''
+        True si la consulta es la de siempre: todos los torneos de un solo país.
+        '''
+        return (
+            len(self.regiones) == 1 and not self.regiones[0].startswith('_')
+            and self.lugar is None and self.desde is None and self.hasta is None and self.limite is None
+        )
+
+    @staticmethod
+    def _fecha(texto, final=False):
+        # 'AAAA-MM-DD', 'DD/MM/AAAA' (como la muestran los embeds) o 'AAAA-MM' (primer o último día)
+        for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+            try:
+                return datetime.strptime(texto, formato).date()
+            except ValueError:
+                pass
+        if texto.lower() in FiltroTorneos.MES_ACTUAL:
+            fecha = obtener_fecha_actual()
+        else:
+            fecha = datetime.strptime(texto, '%Y-%m').date()
+        if final:
+            return fecha.replace(day=calendar.monthrange(fecha.year, fecha.month)[1])
+        return fecha.replace(day=1)
+
+    @classmethod
+    async def desde_texto(cls, texto, pais_por_defecto):
+        '''
+        Crea una consulta desde el texto de !torneos. Las regiones van primero, separadas por comas, y
+        luego los filtros como clave:valor.
+
+        Parámetros:
+        texto (str): Texto del comando, por ejemplo 'sudamerica limite:5' o 'cl lugar:santiago mes:actual'.
+        pais_por_defecto (str): País que se usa si no se indica ninguna región.
+
+        Retorna:
+        FiltroTorneos: Consulta creada.
+
+        Excepciones:
+        ValueError: Si un filtro, una fecha, un límite o una de varias regiones no es válido.
+        '''
+        claves = list(PATRON_FILTRO.finditer(texto))
+        filtros = {}
+        for i, clave in enumerate(claves):
+            nombre = cls.CLAVES.get(clave.group(1).lower())
+            if nombre is None:
+                raise ValueError(f'Filtro desconocido: {clave.group(1)}')
+            fin = claves[i + 1].start() if i + 1 < len(claves) else len(texto)
+            filtros[nombre] = texto[clave.end():fin].strip()
+
+        try:
+            desde = hasta = None
+            if 'mes' in filtros:
+                desde, hasta = cls._fecha(filtros['mes']), cls._fecha(filtros['mes'], final=True)
+            if 'desde' in filtros:
+                desde = cls._fecha(filtros['desde'])
+            if 'hasta' in filtros:
+                hasta = cls._fecha(filtros['hasta'], final=True)
+            limite = int(filtros['limite']) if 'limite' in filtros else None
+        except ValueError:
+            raise ValueError('Fecha o límite no válido')
+        if limite is not None and limite < 1:
+            raise ValueError('El límite debe ser mayor que cero')
+
+        # ';' separa los campos de la consulta codificada
+        lugar = filtros.get('lugar', '').replace(';', ' ').strip() or None
+
+        partes = [parte.strip() for parte in texto[:claves[0].start() if claves else len(texto)].split(',')]
+        partes = [parte for parte in partes if parte] or [pais_por_defecto]
+        regiones = []
+        for parte in partes:
+            continente = await registro_paises.buscar_continente(parte)
+            if continente is not None:
+                regiones.append('_' + continente.replace(' ', '+'))
+            elif len(partes) == 1 or await registro_paises.buscar(parte) is not None:
+                # Con un solo país se mantiene el comportamiento de siempre (Chile si no existe)
+                regiones.append(await obtener_pais_para_url(parte))
+            else:
+                raise ValueError(f'País o continente desconocido: {parte}')
+
+        return cls(dict.fromkeys(regiones), lugar, desde, hasta, limite)
+
+    def codificar(self):
+        '''
+        Codifica la consulta en un texto corto, por ejemplo 'chile,_south+america;santiago;20240601;;5'.
+        Una consulta simple se codifica solo con el país.
+
+        Retorna:
+        str: Consulta codificada.
+        '''
+        regiones = ','.join(self.regiones)
+        if self.es_simple:
+            return regiones
+        fechas = [fecha.strftime('%Y%m%d') if fecha else '' for fecha in (self.desde, self.hasta)]
+        return ';'.join([regiones, self.lugar or '', *fechas, str(self.limite or '')])
+
+    @classmethod
+    def decodificar(cls, texto):
+        '''
+        Crea una consulta desde el texto retornado por codificar.
+
+        Parámetros:
+        texto (str): Consulta codificada.
+
+        Retorna:
+        FiltroTorneos: Consulta decodificada.
+        '''
+        regiones, lugar, desde, hasta, limite = (texto.split(';') + [''] * 4)[:5]
+        return cls(
+            regiones.split(','),
+            lugar or None,
+            datetime.strptime(desde, '%Y%m%d').date() if desde else None,
+            datetime.strptime(hasta, '%Y%m%d').date() if hasta else None,
+            int(limite) if limite else None,
+        )
+
+    async def obtener_paises(self):
+        '''
+        Retorna los países de la consulta con formato de URL, expandiendo los continentes.
+
+        Retorna:
+        list: Países sin repetir, en el orden de las regiones.
+        '''
+        paises = []
+        for region in self.regiones:
+            if region.startswith('_'):
+                items = await registro_paises.paises_de_continente(region[1:].replace('+', ' '))
+                paises.extend(registro_paises.nombre_url(item) for item in items)
+            else:
+                paises.append(region)
+        return list(dict.fromkeys(paises))
+
+    async def titulo(self):
+        '''
+        Retorna los nombres de las regiones de la consulta para mostrarlos, separados por comas.
+
+        Retorna:
+        str: Nombres de los países y continentes.
+        '''
+        nombres = []
+        for region in self.regiones:
+            if region.startswith('_'):
+                nombres.append(region[1:].replace('+', ' ').title())
+            else:
+                nombres.append(await obtener_pais(region))
+        return ', '.join(nombres)
+
+
+class EspejoTorneos:
+    '''
+    Espejo local de los torneos de cada país, en memoria y en la tabla espejo_paises.
+
+    - !torneos se responde desde el espejo. Una copia con menos de ESPEJO_TTL segundos se entrega
+      tal cual; una con menos de ESPEJO_OBSOLETO segundos se entrega y se refresca en segundo plano.
+    - Solo se consulta la WCA mientras el usuario espera cuando el país no está en el espejo (ni en
+      memoria ni en la base de datos) o cuando su copia superó ESPEJO_OBSOLETO.
+    - Si la WCA falla se entrega la última copia disponible aunque esté obsoleta y, si no hay
+      ninguna, los torneos que guardó el verificador de torneos nuevos.
+    - refrescar_solicitados mantiene al día los países pedidos en los últimos
+      ESPEJO_VIGENCIA_SOLICITUD segundos, de modo que normalmente nadie espera a la WCA. Se
+      recuerdan como máximo ESPEJO_MAX países pedidos, descartando los pedidos hace más tiempo.
+    - Si al refrescar un país sus torneos no cambiaron, en la base de datos solo se actualiza la
+      fecha de su copia.
+    - Las consultas simultáneas de un mismo país comparten una sola petición a la WCA y en memoria
+      se mantienen como máximo ESPEJO_MAX países, descartando el menos usado. Los países de una
+      consulta en curso no se descartan hasta que termina, aunque superen el máximo.
+    - Los países en memoria se mantienen en un IndiceTorneos para responder consultas con filtros
+      (consultar) sin recorrer todos los torneos.
+    '''
+    def __init__(self, ttl=ESPEJO_TTL, obsoleto=ESPEJO_OBSOLETO, maximo=ESPEJO_MAX):
+        self.ttl = ttl
+        self.obsoleto = obsoleto
+        self.maximo = maximo
+        self._entradas = OrderedDict()
+        self._en_vuelo = {}
+        self._cargando = {}
+        self._solicitados = OrderedDict()
+        self._escrituras = set()
+        self._indice = IndiceTorneos()
+        self._fijados = Counter()
+
+    def _recordar(self, pais, torneos, hash_contenido, actualizado):
+        entrada = {'torneos': torneos, 'hash': hash_contenido, 'actualizado': actualizado}
+        if self._entradas.get(pais, {}).get('hash') != hash_contenido:
+            self._indice.indexar(pais, torneos)
+        self._entradas[pais] = entrada
+        self._entradas.move_to_end(pais)
+        self._recortar()
+        return entrada
+
+    def _solicitar(self, pais, momento):
+        # Recuerda el país como pedido, descartando los pedidos hace más tiempo que superen el máximo
+        self._solicitados[pais] = momento
+        self._solicitados.move_to_end(pais)
+        while len(self._solicitados) > self.maximo:
+            self._solicitados.popitem(last=False)
+
+    def _recortar(self):
+        # Descarta los países menos usados que superen el máximo, salvo los de consultas en curso
+        sobrantes = len(self._entradas) - self.maximo
+        if sobrantes <= 0:
+            return
+        descartados = [pais for pais in self._entradas if pais not in self._fijados][:sobrantes]
+        for pais in descartados:
+            del self._entradas[pais]
+            self._indice.eliminar(pais)
+
+    def _edad(self, entrada):
+        return (datetime.now(timezone.utc) - entrada['actualizado']).total_seconds()
+
+    async def _consultar(self, pais):
+        with latencia_consulta.medir(origen='espejo'):
+            torneos, hash_contenido = await consultar_torneos(URL, pais)
+        anterior = self._entradas.get(pais)
+        sin_cambios = anterior is not None and anterior['hash'] == hash_contenido
+        entrada = self._recordar(pais, torneos, hash_contenido, datetime.now(timezone.utc))
+        # La copia de la base de datos se escribe en segundo plano para no retrasar la respuesta
+        escritura = asyncio.create_task(self._guardar(pais, entrada, sin_cambios))
+        self._escrituras.add(escritura)
+        escritura.add_done_callback(self._escrituras.discard)
+        return entrada
+
+    async def _guardar(self, pais, entrada, sin_cambios=False):
+        try:
+            # tocar_espejo solo cambia la fecha si la copia guardada tiene el mismo hash; si no hay
+            # copia o tiene otro hash (por ejemplo, si falló una escritura anterior) se escribe completa
+            if sin_cambios and await pool_db.modificar('tocar_espejo', (pais, entrada['actualizado'], entrada['hash'])):
+                return
+            torneos = json.dumps([
+                [t.nombre, t.url, t.inicio.isoformat(), t.fin.isoformat(), t.lugar, t.pais]
+                for t in entrada['torneos']
+            ], ensure_ascii=False)
+            await pool_db.modificar('guardar_espejo', (pais, entrada['actualizado'], entrada['hash'], torneos))
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(f'Error al guardar el espejo de {pais}:', error)
+
+    async def _cargar(self, pais):
+        try:
+            filas = await pool_db.consultar('cargar_espejo', (pais,))
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(f'Error al cargar el espejo de {pais}:', error)
+            return None
+        if not filas:
+            return None
+        if pais in self._entradas:
+            # Una consulta a la WCA terminó mientras se leía la base de datos y es más reciente
+            return self._entradas[pais]
+        actualizado, hash_contenido, datos = filas[0]
+        torneos = [
+            Torneo.desde_fila((nombre, url, date.fromisoformat(inicio), date.fromisoformat(fin), lugar, pais_torneo))
+            for nombre, url, inicio, fin, lugar, pais_torneo in datos
+        ]
+        contador_espejo.inc(resultado='base_de_datos')
+        return self._recordar(pais, torneos, hash_contenido, actualizado)
+
+    def _iniciar_carga(self, pais):
+        tarea = self._cargando.get(pais)
+        if tarea is None:
+            tarea = asyncio.create_task(self._cargar(pais))
+            self._cargando[pais] = tarea
+            tarea.add_done_callback(lambda t: self._cargando.pop(pais, None))
+        return tarea
+
+    def _iniciar_consulta(self, pais):
+        tarea = self._en_vuelo.get(pais)
+        if tarea is None:
+            tarea = asyncio.create_task(self._consultar(pais))
+            self._en_vuelo[pais] = tarea
+            tarea.add_done_callback(lambda t: self._terminar_consulta(pais, t))
+        return tarea
+
+    def _terminar_consulta(self, pais, tarea):
+        self._en_vuelo.pop(pais, None)
+        if not tarea.cancelled() and tarea.exception() is not None:
+            print(f'Error al obtener los torneos de {pais}:', tarea.exception())
+
+    async def obtener(self, pais, forzar=False, solicitar=True):
+        '''
+        Retorna los torneos de un país desde el espejo o, si hace falta, desde la WCA.
+
+        Parámetros:
+        pais (str): Nombre o código de país.
+        forzar (bool): Si es True, se consulta la WCA (pero se comparte una consulta en curso) y
+        los errores se propagan en vez de responder con una copia anterior.
+        solicitar (bool): Si es True, el país se mantiene al día con refrescar_solicitados.
+
+        Retorna:
+        tuple: (lista de torneos, hash del contenido de los torneos, fecha de actualización,
+        obsoleto). La fecha es un datetime en UTC de la última consulta a la WCA, o None si los
+        torneos vienen del verificador de torneos nuevos (en ese caso el hash también es None).
+        obsoleto es True si la WCA no respondió y se entrega la última copia disponible.
+
+        Excepciones:
+        aiohttp.ClientError, asyncio.TimeoutError: Si la WCA no responde y forzar es True, o si no
+        hay ninguna copia del país.
+        '''
+        pais = await obtener_pais_para_url(pais)
+
+        if not forzar:
+            if solicitar:
+                self._solicitar(pais, time.time())
+            entrada = self._entradas.get(pais)
+            if entrada is None:
+                entrada = await asyncio.shield(self._iniciar_carga(pais))
+            if entrada is not None:
+                self._entradas.move_to_end(pais)
+                edad = self._edad(entrada)
+                if edad < self.ttl:
+                    contador_espejo.inc(resultado='fresco')
+                    return list(entrada['torneos']), entrada['hash'], entrada['actualizado'], False
+                if edad < self.obsoleto:
+                    # Se responde de inmediato con la copia anterior y se refresca en segundo plano
+                    contador_espejo.inc(resultado='obsoleto')
+                    self._iniciar_consulta(pais)
+                    return list(entrada['torneos']), entrada['hash'], entrada['actualizado'], False
+
+        contador_espejo.inc(resultado='forzado' if forzar else 'fallo')
+        try:
+            # shield evita que cancelar a quien espera cancele la consulta compartida con otros
+            entrada = await asyncio.shield(self._iniciar_consulta(pais))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if forzar:
+                raise
+            return await self._respaldo(pais)
+        return list(entrada['torneos']), entrada['hash'], entrada['actualizado'], False
+
+    async def ultima_copia(self, pais):
+        '''
+        Retorna la última copia disponible de un país sin consultar la WCA, para cuando no responde.
+
+        Parámetros:
+        pais (str): Nombre o código de país.
+
+        Retorna:
+        tuple: (lista de torneos, hash, fecha de actualización, obsoleto) como obtener, con obsoleto True.
+
+        Excepciones:
+        aiohttp.ClientError: Si no hay ninguna copia del país.
+        '''
+        return await self._respaldo(await obtener_pais_para_url(pais))
+
+    async def _respaldo(self, pais):
+        # La WCA no respondió: última copia del espejo, aunque esté obsoleta, o los torneos del verificador
+        entrada = self._entradas.get(pais)
+        if entrada is None:
+            entrada = await asyncio.shield(self._iniciar_carga(pais))
+        if entrada is not None:
+            contador_espejo.inc(resultado='respaldo')
+            return list(entrada['torneos']), entrada['hash'], entrada['actualizado'], True
+        try:
+            conocidos = await cargar_torneos_conocidos(pais)
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(f'Error al cargar los torneos conocidos de {pais}:', error)
+            conocidos = None
+        if conocidos:
+            contador_espejo.inc(resultado='respaldo')
+            return conocidos, None, None, True
+        raise aiohttp.ClientError(f'No hay torneos de {pais} en el espejo y la WCA no respondió')
+
+    async def consultar(self, filtro):
+        '''
+        Retorna los torneos que cumplen una consulta. Los países que ya están al día en memoria se
+        responden desde el índice sin consultar la WCA ni la base de datos; el resto se obtiene
+        primero con obtener (y queda en el espejo para las siguientes consultas). Solo los países
+        nombrados en la consulta se mantienen al día con refrescar_solicitados; los de un continente
+        no, ya que podrían ser más de los que caben en memoria.
+
+        Parámetros:
+        filtro (FiltroTorneos): Consulta.
+
+        Retorna:
+        tuple: (lista de torneos, versión de los datos, fecha de actualización, obsoleto). La versión
+        cambia si cambian la consulta o los torneos de alguno de sus países, y es None si alguno no
+        está en el espejo. La fecha es la de la copia más antigua de los países consultados, o None.
+        obsoleto es True si la WCA no respondió para alguno de los países o si alguno no está en el
+        espejo.
+
+        Excepciones:
+        aiohttp.ClientError, asyncio.TimeoutError: Si la WCA no responde y no hay copia de ninguno
+        de los países.
+        '''
+        if filtro.es_simple:
+            return await self.obtener(filtro.regiones[0])
+
+        paises = await filtro.obtener_paises()
+        nombrados = {region for region in filtro.regiones if not region.startswith('_')}
+        # Los países de la consulta no se descartan de la memoria mientras se responde
+        self._fijados.update(paises)
+        try:
+            return await self._consultar_fijados(filtro, paises, nombrados)
+        finally:
+            for pais in paises:
+                self._fijados[pais] -= 1
+                if not self._fijados[pais]:
+                    del self._fijados[pais]
+            self._recortar()
+
+    async def _consultar_fijados(self, filtro, paises, nombrados):
+        ahora = time.time()
+        pendientes = []
+        fallos = []
+        obsoleto = False
+        for pais in paises:
+            entrada = self._entradas.get(pais)
+            if entrada is None or self._edad(entrada) >= self.ttl:
+                pendientes.append(pais)
+            elif pais in nombrados:
+                self._solicitar(pais, ahora)
+        if pendientes:
+            resultados = await asyncio.gather(
+                *(self.obtener(pais, solicitar=pais in nombrados) for pais in pendientes),
+                return_exceptions=True,
+            )
+            for pais, resultado in zip(pendientes, resultados):
+                if isinstance(resultado, Exception):
+                    print(f'Error al obtener los torneos de {pais}:', resultado)
+                    fallos.append(resultado)
+                elif resultado[3]:
+                    obsoleto = True
+
+        entradas = [self._entradas[pais] for pais in paises if pais in self._entradas]
+        if fallos and not entradas:
+            # Sin ninguna copia, una lista vacía se confundiría con que no hay torneos
+            raise fallos[0]
+        if len(entradas) < len(paises):
+            # Un país sin copia en el espejo no aparece en el resultado
+            obsoleto = True
+        torneos = self._indice.buscar(paises, filtro.lugar, filtro.desde, filtro.hasta, filtro.limite)
+        version = None
+        if len(entradas) == len(paises):
+            version = hashlib.blake2b(filtro.codificar().encode('utf-8'), digest_size=16)
+            for entrada in entradas:
+                version.update(entrada['hash'].encode('utf-8'))
+            version = version.hexdigest()
+        actualizado = min((entrada['actualizado'] for entrada in entradas), default=None)
+        return torneos, version, actualizado, obsoleto
+
+    async def refrescar_solicitados(self):
+        '''
+        Refresca desde la WCA los países pedidos en los últimos ESPEJO_VIGENCIA_SOLICITUD segundos
+        cuya copia tenga más de ESPEJO_REFRESCO segundos. Los países que ya nadie pide se olvidan.
+
+        Parámetros:
+        None
+
+        Retorna:
+        int: Cantidad de países refrescados.
+        '''
+        limite = time.time() - ESPEJO_VIGENCIA_SOLICITUD
+        for pais, solicitado in list(self._solicitados.items()):
+            if solicitado < limite:
+                del self._solicitados[pais]
+
+        paises = [
+            pais for pais in self._solicitados
+            if pais not in self._entradas or self._edad(self._entradas[pais]) >= ESPEJO_REFRESCO
+        ]
+        resultados = await asyncio.gather(
+            *(asyncio.shield(self._iniciar_consulta(pais)) for pais in paises),
+            return_exceptions=True,
+        )
+        # Los errores ya se informan en _terminar_consulta
+        return sum(1 for resultado in resultados if not isinstance(resultado, BaseException))
+
+    def invalidar(self, pais=None):
+        '''
+        Elimina de la memoria un país (con formato de URL), o todos si no se indica. La copia de la
+        base de datos se mantiene.
+
+        Parámetros:
+        pais (str): País con formato de URL.
+
+        Retorna:
+        None
+        '''
+        if pais is None:
+            self._entradas.clear()
+        else:
+            self._entradas.pop(pais, None)
+        self._indice.eliminar(pais)
+
+
+# Espejo de torneos compartido por el bot
+espejo_torneos = EspejoTorneos()
+
+metricas.registro.indicador('espejo_torneos_paises', 'Países con torneos en la memoria del espejo.', lambda: len(espejo_torneos._entradas))
+
+
+async def guardar_torneos(torneos, eliminados=()):
+    '''
+    Guarda una lista de torneos en la base de datos en una sola transacción y una sola consulta.
+    Si un torneo ya existe (misma URL), se actualizan sus datos. Si la lista repite una URL se
+    guarda la última aparición. En la misma transacción se eliminan los torneos indicados, con
+    una sola sentencia.
+
+    Parámetros:
+    torneos (list): Torneos a guardar.
+    eliminados (list): URLs de los torneos a eliminar.
+
+    Retorna:
+    list: Torneos que no existían en la base de datos y fueron insertados.
+
+    Excepciones:
+    psycopg2.DatabaseError: Si no se pudieron guardar; una falla no se confunde con que no haya
+    torneos nuevos.
+    '''
+    # Postgres rechaza todo el INSERT si ON CONFLICT DO UPDATE afecta dos veces la misma fila
+    torneos = list({t.url: t for t in torneos}.values())
+    urls_eliminadas = list(dict.fromkeys(eliminados))
+    if not torneos and not urls_eliminadas:
+        return []
+
+    filas = [t.como_fila() for t in torneos]
 
+    import psycopg2.extras
+
+    def _guardar(cur):
+        if urls_eliminadas:
+            cur.execute(SQL_ELIMINAR_TORNEOS, (urls_eliminadas,))
+        if not filas:
+            return []
+        # page_size igual al total para que todas las filas viajen en un único INSERT
+        return psycopg2.extras.execute_values(cur, SQL_GUARDAR_TORNEOS, filas, page_size=len(filas), fetch=True)
 
-def eliminar_torneo(url: str):
+    resultados = await pool_db.ejecutar(_guardar, operacion='guardar_torneos')
+    insertados = {url for url, insertado in resultados if insertado}
+    return [t for t in torneos if t.url in insertados]
+
+
+def diferenciar_torneos(actuales, conocidos):
     '''
-    Función para eliminar un torneo de la base de datos.
+    Compara los torneos actuales con los conocidos usando la URL como identificador.
 
     Parámetros:
-    url (str): URL del torneo a eliminar.
+    actuales (list): Torneos obtenidos de la WCA.
+    conocidos (list): Torneos guardados en la base de datos.
 
     Retorna:
+    tuple: (nuevos, eliminados, modificados), cada uno una lista de torneos. Los modificados
+    se retornan con sus datos actuales.
+    '''
+    hashes_conocidos = {t.url: t.hash_contenido for t in conocidos}
+    urls_actuales = set()
+
+    nuevos = []
+    modificados = []
+    for torneo in actuales:
+        url = torneo.url
+        urls_actuales.add(url)
+        hash_conocido = hashes_conocidos.get(url)
+        if hash_conocido is None:
+            nuevos.append(torneo)
+        elif hash_conocido != torneo.hash_contenido:
+            modificados.append(torneo)
+
+    eliminados = [t for t in conocidos if t.url not in urls_actuales]
+
+    return nuevos, eliminados, modificados
+
+
+def obtener_fecha_actual():
+    '''
+    Retorna la fecha actual.
+
+    Parámetros:
     None
+
+    Retorna:
+    datetime.date: Fecha actual.
     '''
-    try:
-        conn = db_conn()
-        cur = conn.cursor()
-        cur.execute('DELETE FROM torneos WHERE url = %s;', (url,))
-        conn.commit()
-        cur.close()
-        conn.close()
-        print(f'Se ha eliminado el torneo con URL: {url}')
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(error)
+    return datetime.now().date()
 
 
-def limpiar_base_de_datos():
+async def limpiar_base_de_datos():
     '''
     Función para eliminar torneos antiguos de la base de datos.
 
@@ -243,18 +1962,13 @@ def limpiar_base_de_datos():
     None
     '''
     try:
-        conn = db_conn()
-        cur = conn.cursor()
-        cur.execute('DELETE FROM torneos WHERE fin < %s;', (obtener_fecha_actual(),))
-        conn.commit()
-        cur.close()
-        conn.close()
+        await pool_db.modificar('limpiar_torneos', (obtener_fecha_actual(),))
         print(f'Se han eliminado los torneos con fecha menor a {obtener_fecha_actual()} de la base de datos.')
     except (Exception, psycopg2.DatabaseError) as error:
         print(error)
 
 
-def api_paises():
+async def api_paises():
     '''
     Obtiene los países desde la API de la WCA y los retorna en formato JSON.
 
@@ -264,15 +1978,176 @@ def api_paises():
     Retorna:
     dict: Países en formato JSON.
     '''
-    API = 'https://raw.githubusercontent.com/robiningelbrecht/wca-rest-api/master/api/countries.json'
-    respuesta = requests.get(API)
-    respuesta.raise_for_status() # Genera una excepción si la solicitud no es exitosa
-    paises = respuesta.json()
+    paises = await obtener_json(API_PAISES)
 
     return paises
 
 
-def obtener_pais_para_url(pais):
+class RegistroPaises:
+    '''
+    Registro en memoria de los países de la WCA.
+
+    Descarga countries.json una sola vez, lo vuelve a descargar cuando pasa el TTL y guarda
+    en disco la última copia válida para usarla si la API no responde. Las búsquedas por nombre,
+    código ISO2 o alias se hacen en O(1) sobre un diccionario indexado en minúsculas.
+    '''
+    # Alias adicionales (en minúsculas) que apuntan al nombre oficial de un país
+    ALIAS = {
+        'us': 'United States',
+        'usa': 'United States',
+        'estados unidos': 'United States',
+    }
+
+    # Alias adicionales (normalizados) de los continentes de countries.json
+    ALIAS_CONTINENTES = {
+        'sudamerica': 'south america',
+        'suramerica': 'south america',
+        'america del sur': 'south america',
+        'america do sul': 'south america',
+        'norteamerica': 'north america',
+        'america del norte': 'north america',
+        'america do norte': 'north america',
+        'europa': 'europe',
+        'africa': 'africa',
+        'oceania': 'oceania',
+        'asia': 'asia',
+    }
+
+    # Países cuyo nombre en la URL de la WCA no se deriva de su nombre oficial
+    NOMBRES_URL = {
+        'United States': 'USA',
+    }
+
+    # Tiempo de espera antes de reintentar una descarga fallida (en segundos)
+    REINTENTO = 5 * 60
+
+    def __init__(self, ttl=PAISES_TTL, ruta_snapshot=PAISES_SNAPSHOT):
+        self.ttl = ttl
+        self.ruta_snapshot = ruta_snapshot
+        self._indice = {}
+        self._continentes = {}
+        self._expira = 0
+        self._lock = asyncio.Lock()
+
+    def _indexar(self, paises):
+        indice = {}
+        continentes = {}
+        for p in paises['items']:
+            indice[p['name'].lower()] = p
+            indice[p['iso2Code'].lower()] = p
+            continentes.setdefault(normalizar_texto(p['continentId'].lstrip('_')), []).append(p)
+        for alias, nombre in self.ALIAS.items():
+            if nombre.lower() in indice:
+                indice[alias] = indice[nombre.lower()]
+        self._indice = indice
+        self._continentes = continentes
+
+    def _cargar_snapshot(self):
+        try:
+            with open(self.ruta_snapshot, 'r', encoding='utf-8') as archivo:
+                self._indexar(json.load(archivo))
+            print('Países cargados desde la copia local.')
+        except (OSError, ValueError, KeyError) as error:
+            print(f'No se pudo cargar la copia local de países: {error}')
+
+    def _guardar_snapshot(self, paises):
+        try:
+            with open(self.ruta_snapshot, 'w', encoding='utf-8') as archivo:
+                json.dump(paises, archivo, ensure_ascii=False)
+        except OSError as error:
+            print(f'No se pudo guardar la copia local de países: {error}')
+
+    async def asegurar_cargado(self):
+        '''
+        Carga o refresca el registro si no existe o si ya pasó el TTL.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        if self._indice and time.monotonic() < self._expira:
+            return
+
+        async with self._lock:
+            # Otra tarea pudo haber refrescado el registro mientras se esperaba el lock
+            if self._indice and time.monotonic() < self._expira:
+                return
+            try:
+                paises = await api_paises()
+                self._indexar(paises)
+                self._guardar_snapshot(paises)
+                self._expira = time.monotonic() + self.ttl
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as error:
+                print('Error al obtener los países:', error)
+                if not self._indice:
+                    self._cargar_snapshot()
+                self._expira = time.monotonic() + self.REINTENTO
+
+    async def buscar(self, pais):
+        '''
+        Busca un país por nombre, código ISO2 o alias.
+
+        Parámetros:
+        pais (str): Nombre, código o alias del país.
+
+        Retorna:
+        dict: País encontrado, o None si no existe.
+        '''
+        await self.asegurar_cargado()
+        # Se aceptan también nombres con formato de URL (por ejemplo 'united+kingdom')
+        return self._indice.get(pais.strip().lower().replace('+', ' '))
+
+    async def buscar_continente(self, continente):
+        '''
+        Busca un continente por su nombre en inglés o un alias (sin importar tildes).
+
+        Parámetros:
+        continente (str): Nombre o alias del continente, también con formato de URL.
+
+        Retorna:
+        str: Nombre normalizado del continente (por ejemplo 'south america'), o None si no existe.
+        '''
+        await self.asegurar_cargado()
+        nombre = normalizar_texto(continente.replace('+', ' '))
+        nombre = self.ALIAS_CONTINENTES.get(nombre, nombre)
+        return nombre if nombre in self._continentes else None
+
+    async def paises_de_continente(self, continente):
+        '''
+        Retorna los países de un continente.
+
+        Parámetros:
+        continente (str): Nombre normalizado del continente, retornado por buscar_continente.
+
+        Retorna:
+        list: Países del continente (como los retorna buscar).
+        '''
+        await self.asegurar_cargado()
+        return list(self._continentes.get(continente, []))
+
+    def nombre_url(self, item):
+        '''
+        Retorna el nombre del país con formato de URL para la WCA.
+
+        Parámetros:
+        item (dict): País retornado por buscar.
+
+        Retorna:
+        str: Nombre del país con formato de URL.
+        '''
+        nombre = item['name']
+        if nombre in self.NOMBRES_URL:
+            return self.NOMBRES_URL[nombre]
+        return nombre.lower().replace(' ', '+')
+
+
+# Registro de países compartido por el bot
+registro_paises = RegistroPaises()
+
+
+async def obtener_pais_para_url(pais):
     '''
     Retorna el país entregado con formato de URL para reemplazar en la URL de la WCA.
 
@@ -282,60 +2157,40 @@ def obtener_pais_para_url(pais):
     Retorna:
     str: Nombre del país con formato de URL.
     '''
-    paises = api_paises()
-
-    # Listas con los nombres y códigos de los países
-    nombres_paises = [p['name'].lower() for p in paises['items']]
-    codigos_paises = [p['iso2Code'].lower() for p in paises['items']]
-
-    pais = pais.lower()
-
-    # Caso especial para Estados Unidos
-    usa = ['united states', 'us', 'usa', 'estados unidos']
-    if pais in usa:
-        return 'USA'
-
-    # Si se proporciona el nombre completo del país, retornar el mismo nombre
-    if pais in nombres_paises:
-        # Se retorna el nombre del país con formato de URL
-        return pais.replace(' ', '+')
+    item = await registro_paises.buscar(pais)
+    if item is not None:
+        return registro_paises.nombre_url(item)
 
-    # Si el argumento es un código de dos letras, retornar el nombre del país
-    if pais in codigos_paises:
-        # Se obtiene el índice del código de país
-        indice = codigos_paises.index(pais)
-        # Se retorna el nombre del país con formato de URL
-        return nombres_paises[indice].replace(' ', '+')
-    
     # Si no se encuentra una sugerencia, retornar Chile
     print('No se han encontrado coincidencias. Retornando Chile...')
     return 'Chile'
 
 
-def obtener_pais(pais):
+async def obtener_pais(pais):
     '''
-    Retorna el nombre del país con formato de título.
+    Retorna el nombre oficial del país.
 
     Parámetros:
     pais (str): Nombre o código de país.
 
     Retorna:
-    str: Nombre del país con formato de título.
+    str: Nombre oficial del país.
 
     Ejemplo:
-    >>> obtener_pais('chile')
+    >>> await obtener_pais('chile')
     'Chile'
 
-    >>> obtener_pais('cl')
+    >>> await obtener_pais('cl')
     'Chile'
     '''
-    if obtener_pais_para_url(pais) == 'USA':
-        return 'United States'
-    
-    return obtener_pais_para_url(pais).title().replace('+', ' ')
+    item = await registro_paises.buscar(pais)
+    if item is not None:
+        return item['name']
+
+    return 'Chile'
 
 
-def validar_pais(pais):
+async def validar_pais(pais):
     '''
     Verifica si el país ingresado existe en la API de la WCA.
 
@@ -345,40 +2200,297 @@ def validar_pais(pais):
     Retorna:
     bool: True si el país existe, False en caso contrario.
     '''
-    paises = api_paises()
-    nombres_paises = [p['name'].lower() for p in paises['items']]
-    codigos_paises = [p['iso2Code'].lower() for p in paises['items']]
-    pais = obtener_pais(pais).lower()
-    es_valido = False
+    return await registro_paises.buscar(pais) is not None
 
-    # Caso especial para Estados Unidos
-    usa = ['united states', 'us', 'usa', 'estados unidos']
-    if pais in usa:
-        es_valido = True
 
-    if pais in nombres_paises or pais in codigos_paises:
-        es_valido = True
+class RegistroSuscripciones:
+    '''
+    Suscripciones de canales de Discord a países, guardadas en la base de datos.
 
-    return es_valido
+    Se cargan una vez al iniciar el bot y se mantienen en memoria; cada cambio se escribe
+    primero en la base de datos y luego en memoria.
+    '''
+    def __init__(self):
+        self._por_canal = {}
+
+    async def cargar(self):
+        '''
+        Carga las suscripciones en memoria.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        try:
+            filas = await pool_db.consultar('cargar_suscripciones')
+        except (Exception, psycopg2.DatabaseError) as error:
+            print('Error al cargar las suscripciones:', error)
+            return
+
+        por_canal = {}
+        for canal_id, pais in filas:
+            por_canal.setdefault(canal_id, set()).add(pais)
+        self._por_canal = por_canal
+
+    def paises(self, canal_id):
+        '''
+        Retorna los países a los que está suscrito un canal.
+
+        Parámetros:
+        canal_id (int): ID del canal de Discord.
+
+        Retorna:
+        set: Nombres de los países.
+        '''
+        return set(self._por_canal.get(canal_id, ()))
+
+    def canales_por_pais(self):
+        '''
+        Retorna los canales suscritos agrupados por país.
+
+        Parámetros:
+        None
+
+        Retorna:
+        dict: Nombre del país -> conjunto de IDs de canales.
+        '''
+        por_pais = {}
+        for canal_id, paises in self._por_canal.items():
+            for pais in paises:
+                por_pais.setdefault(pais, set()).add(canal_id)
+        return por_pais
+
+    async def agregar(self, canal_id, pais):
+        '''
+        Suscribe un canal a un país.
+
+        Parámetros:
+        canal_id (int): ID del canal de Discord.
+        pais (str): Nombre oficial del país.
+
+        Retorna:
+        bool: True si se guardó la suscripción, False en caso de error.
+        '''
+        try:
+            await pool_db.modificar('agregar_suscripcion', (canal_id, pais))
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(error)
+            return False
+        self._por_canal.setdefault(canal_id, set()).add(pais)
+        return True
+
+    async def eliminar(self, canal_id, pais):
+        '''
+        Elimina la suscripción de un canal a un país.
+
+        Parámetros:
+        canal_id (int): ID del canal de Discord.
+        pais (str): Nombre oficial del país.
+
+        Retorna:
+        bool: True si se eliminó la suscripción, False en caso de error.
+        '''
+        try:
+            await pool_db.modificar('eliminar_suscripcion', (canal_id, pais))
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(error)
+            return False
+        self._por_canal.get(canal_id, set()).discard(pais)
+        return True
+
+
+# Suscripciones compartidas por el bot
+registro_suscripciones = RegistroSuscripciones()
+
+
+class ConfiguracionServidores:
+    '''
+    Configuración (país e idioma) de cada servidor de Discord, guardada en la base de datos.
+
+    Se carga completa al iniciar el bot y las lecturas se responden desde memoria; cada cambio
+    se escribe primero en la base de datos y luego en memoria.
+    '''
+    def __init__(self):
+        self._por_servidor = {}
+
+    async def cargar(self):
+        '''
+        Carga la configuración en memoria.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        try:
+            filas = await pool_db.consultar('cargar_configuracion')
+        except (Exception, psycopg2.DatabaseError) as error:
+            print('Error al cargar la configuración de los servidores:', error)
+            return
+
+        self._por_servidor = {guild_id: {'pais': pais, 'idioma': idioma} for guild_id, pais, idioma in filas}
+
+    def obtener(self, guild_id):
+        '''
+        Retorna la configuración de un servidor, o la configuración por defecto si no tiene.
+
+        Parámetros:
+        guild_id (int): ID del servidor de Discord (None para mensajes directos).
+
+        Retorna:
+        dict: Configuración con las llaves 'pais' e 'idioma'.
+        '''
+        return self._por_servidor.get(guild_id, CONFIGURACION_POR_DEFECTO)
+
+    def paises(self):
+        '''
+        Retorna los países por defecto en uso: el de la configuración por defecto y el de cada servidor.
+
+        Parámetros:
+        None
+
+        Retorna:
+        list: Países sin repetir, empezando por el de la configuración por defecto.
+        '''
+        paises = [CONFIGURACION_POR_DEFECTO['pais']]
+        paises.extend(configuracion['pais'] for configuracion in self._por_servidor.values())
+        return list(dict.fromkeys(paises))
+
+    async def guardar(self, guild_id, pais=None, idioma=None):
+        '''
+        Cambia el país y/o el idioma de un servidor.
+
+        Parámetros:
+        guild_id (int): ID del servidor de Discord.
+        pais (str): Nombre oficial del país. Si es None se mantiene el actual.
+        idioma (str): Código del idioma. Si es None se mantiene el actual.
+
+        Retorna:
+        bool: True si se guardó la configuración, False en caso de error.
+        '''
+        configuracion = dict(self.obtener(guild_id))
+        if pais is not None:
+            configuracion['pais'] = pais
+        if idioma is not None:
+            configuracion['idioma'] = idioma
+
+        try:
+            await pool_db.modificar('guardar_configuracion', (guild_id, configuracion['pais'], configuracion['idioma']))
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(error)
+            return False
+        self._por_servidor[guild_id] = configuracion
+        return True
+
+
+# Configuración de los servidores compartida por el bot
+configuracion_servidores = ConfiguracionServidores()
+
+
+class CatalogoTraducciones:
+    '''
+    Catálogo de traducciones cargado en memoria desde mensajes.json.
+
+    El archivo se parsea una sola vez en tablas por idioma y solo se vuelve a leer cuando cambia
+    su fecha de modificación. Las llaves o idiomas faltantes se informan una sola vez.
+    '''
+    # Segundos entre revisiones de la fecha de modificación del archivo
+    INTERVALO_REVISION = 2
+
+    def __init__(self, ruta=TRADUCCIONES_ARCHIVO):
+        self.ruta = ruta
+        self.tablas = {}
+        self.idiomas = {}
+        self._mtime = None
+        self._ultima_revision = 0
+        self._reportadas = set()
+
+    def _cargar(self):
+        try:
+            mtime = os.stat(self.ruta).st_mtime
+        except OSError:
+            if self._mtime is not False:
+                print('No se ha encontrado el archivo mensajes.json')
+            self._mtime = False
+            return
+
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as archivo:
+                traducciones = json.load(archivo)
+        except ValueError as error:
+            # Se mantienen las tablas anteriores si el archivo quedó inválido
+            print(f'No se pudo leer mensajes.json: {error}')
+            self._mtime = mtime
+            return
+
+        tablas = {}
+        for key, textos in traducciones.items():
+            for idioma, texto in textos.items():
+                tablas.setdefault(idioma, {})[key] = texto
+        self.tablas = tablas
+        self.idiomas = traducciones.get('Languages', {})
+        self._mtime = mtime
+        self._reportadas.clear()
+
+    def revisar(self):
+        '''
+        Recarga el archivo si su fecha de modificación cambió desde la última carga.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        ahora = time.monotonic()
+        if self._mtime is None or ahora - self._ultima_revision >= self.INTERVALO_REVISION:
+            self._ultima_revision = ahora
+            self._cargar()
+
+    def traducir(self, idioma, key):
+        '''
+        Retorna el texto traducido. Si no existe, retorna la llave.
+
+        Parámetros:
+        idioma (str): Idioma de las traducciones.
+        key (str): Llave del texto a traducir.
+
+        Retorna:
+        str: Texto traducido.
+        '''
+        self.revisar()
+        texto = self.tablas.get(idioma, {}).get(key)
+        if texto is not None:
+            return texto
+
+        if (idioma, key) not in self._reportadas:
+            self._reportadas.add((idioma, key))
+            print(f'No se ha encontrado la traducción para la llave {key} en el idioma {idioma}.')
+        return key
+
+
+# Catálogo de traducciones compartido por el bot
+catalogo_traducciones = CatalogoTraducciones()
 
 
 def cargar_traducciones():
     '''
-    Carga las traducciones desde el archivo JSON.
+    Retorna las traducciones cargadas, indexadas por idioma.
 
     Parámetros:
-    idioma (str): Idioma de las traducciones.
+    None
 
     Retorna:
-    dict: Traducciones en formato JSON.
+    dict: Tablas de traducciones por idioma.
     '''
-    try:
-        with open(f'./json/mensajes.json', 'r', encoding='utf-8') as archivo:
-            traducciones = json.load(archivo)
-            return traducciones
-    except FileNotFoundError:
-        print(f'No se ha encontrado el archivo mensajes.json')
-        return {}
+    catalogo_traducciones.revisar()
+    return catalogo_traducciones.tablas
 
 
 def traducir(idioma, key):
@@ -392,12 +2504,7 @@ def traducir(idioma, key):
     Retorna:
     str: Texto traducido.
     '''
-    traducciones = cargar_traducciones()
-    # print(traducciones)
-    if traducciones and key in traducciones:
-        return traducciones[key][idioma]
-    else:
-        return f'No se ha encontrado la traducción para la llave {key}.'
+    return catalogo_traducciones.traducir(idioma, key)
     
 
 def cargar_idiomas():
@@ -410,14 +2517,8 @@ def cargar_idiomas():
     Retorna:
     dict: Idiomas en formato JSON.
     '''
-    try:
-        with open(f'./json/mensajes.json', 'r', encoding='utf-8') as archivo:
-            traducciones = json.load(archivo)
-            return traducciones['Languages']
-
-    except FileNotFoundError:
-        print(f'No se ha encontrado el archivo mensajes.json')
-        return []
+    catalogo_traducciones.revisar()
+    return catalogo_traducciones.idiomas
 
 
 def validar_idioma(idioma):
@@ -430,8 +2531,4 @@ def validar_idioma(idioma):
     Retorna:
     bool: True si el idioma existe, False en caso contrario.
     '''
-    es_valido = False
-    idiomas = cargar_idiomas()
-    if idioma in idiomas.keys():
-        es_valido = True
-    return es_valido
\ No newline at end of file
+    return idioma in cargar_idiomas()
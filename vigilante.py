@@ -0,0 +1,232 @@
+"""
+Módulo con el vigilante del event loop.
+
+Un latido en el event loop (metricas.medir_lag_loop) marca cada cuánto despierta el loop y un
+hilo aparte revisa ese latido. Si el loop lleva más de VIGILANTE_UMBRAL segundos sin despertar,
+el hilo captura la pila del hilo del loop (sys._current_frames), identifica el comando o tarea
+responsable a partir de las funciones registradas y emite un reporte en JSON. Cuando el loop se
+recupera se emite un segundo reporte con la duración total del bloqueo.
+
+Con ASYNCIO_DEBUG=1 además se activa el modo debug de asyncio, que registra en el logger 'asyncio'
+cada callback que tarde más que el umbral (pensado para staging, ya que tiene costo).
+
+Clases:
+    VigilanteLoop: Detecta bloqueos del event loop e informa qué los causó.
+
+Variables:
+    VIGILANTE_UMBRAL (float): Segundos de bloqueo a partir de los cuales se emite un reporte.
+    VIGILANTE_INTERVALO (float): Segundos entre latidos del event loop.
+    VIGILANTE_ARCHIVO (str): Archivo donde se agregan los reportes (JSON por línea), o None.
+    ASYNCIO_DEBUG (bool): Si se activa el modo debug de asyncio.
+    vigilante_loop (VigilanteLoop): Vigilante compartido.
+"""
+
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+import metricas
+
+
+load_dotenv()  # Cargar variables de entorno desde el archivo .env
+
+VIGILANTE_UMBRAL = float(os.getenv('VIGILANTE_UMBRAL', 0.5))
+VIGILANTE_INTERVALO = 0.1
+VIGILANTE_ARCHIVO = os.getenv('VIGILANTE_ARCHIVO')
+ASYNCIO_DEBUG = os.getenv('ASYNCIO_DEBUG', '').lower() in ('1', 'true', 'si', 'sí')
+
+# Máximo de cuadros de la pila incluidos en cada reporte (los más internos)
+PROFUNDIDAD_PILA = 25
+
+
+class VigilanteLoop:
+    '''
+    Detecta bloqueos del event loop e informa qué los causó.
+
+    Las funciones registradas con registrar (callbacks de comandos, tareas periódicas, etc.) se
+    buscan en la pila del hilo del loop para nombrar el origen del bloqueo; si ninguna aparece,
+    se informa el nombre de la tarea de asyncio en ejecución.
+    '''
+    # Cantidad de reportes recientes que se mantienen en memoria
+    MAXIMO_REPORTES = 50
+
+    def __init__(self, umbral=VIGILANTE_UMBRAL, intervalo=VIGILANTE_INTERVALO, archivo=VIGILANTE_ARCHIVO):
+        self.umbral = umbral
+        self.intervalo = intervalo
+        self.archivo = archivo
+        self.reportes = deque(maxlen=self.MAXIMO_REPORTES)
+        self._nombres = {}
+        self._loop = None
+        self._hilo_loop = None
+        self._hilo = None
+        self._latido_tarea = None
+        self._detener = threading.Event()
+        self._latido = time.monotonic()
+        self._bloqueo = None
+        # Protege _latido y _bloqueo, que comparten el event loop y el hilo vigilante
+        self._candado = threading.Lock()
+        self._bloqueos = metricas.registro.contador('bloqueos_loop_total', 'Bloqueos del event loop sobre el umbral, por origen.')
+        self._duracion = metricas.registro.histograma('bloqueo_loop_segundos', 'Duración de los bloqueos del event loop sobre el umbral.')
+
+    def registrar(self, funcion, nombre):
+        '''
+        Asocia una función (o corrutina) a un nombre para identificarla en la pila de un bloqueo.
+
+        Parámetros:
+        funcion (callable): Función o método.
+        nombre (str): Nombre a informar (por ejemplo el nombre del comando).
+
+        Retorna:
+        None
+        '''
+        funcion = getattr(funcion, '__func__', funcion)
+        codigo = getattr(funcion, '__code__', None)
+        if codigo is not None:
+            self._nombres[codigo] = nombre
+
+    def registrar_comandos(self, bot):
+        '''
+        Registra el callback de cada comando del bot con su nombre.
+
+        Parámetros:
+        bot (commands.Bot): Bot con los comandos.
+
+        Retorna:
+        None
+        '''
+        for comando in bot.walk_commands():
+            self.registrar(comando.callback, comando.qualified_name)
+
+    def iniciar(self):
+        '''
+        Inicia el latido en el event loop actual y el hilo que lo vigila. Debe llamarse desde el loop.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        if self._hilo is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._hilo_loop = threading.get_ident()
+        if ASYNCIO_DEBUG:
+            # asyncio registra en el logger 'asyncio' los callbacks que superen slow_callback_duration
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.umbral
+        self._latido = time.monotonic()
+        self._detener.clear()
+        self._latido_tarea = asyncio.create_task(metricas.medir_lag_loop(self.intervalo, self._al_latir))
+        self._hilo = threading.Thread(target=self._vigilar, name='vigilante-loop', daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        '''
+        Detiene el latido y el hilo vigilante.
+
+        Parámetros:
+        None
+
+        Retorna:
+        None
+        '''
+        self._detener.set()
+        if self._latido_tarea is not None:
+            self._latido_tarea.cancel()
+            self._latido_tarea = None
+        self._hilo = None
+
+    def _al_latir(self, retraso):
+        # Se ejecuta en el event loop: las métricas solo se modifican desde aquí
+        with self._candado:
+            self._latido = time.monotonic()
+            bloqueo, self._bloqueo = self._bloqueo, None
+        if bloqueo is not None:
+            self._duracion.observar(retraso, origen=bloqueo['origen'])
+            self._emitir({
+                'evento': 'fin_bloqueo',
+                'fecha': datetime.now().isoformat(timespec='milliseconds'),
+                'origen': bloqueo['origen'],
+                'tarea': bloqueo['tarea'],
+                'duracion': round(retraso, 3),
+            })
+        elif retraso > self.umbral:
+            # Bloqueo que terminó antes de que el hilo alcanzara a capturarlo
+            bloqueo = {'origen': 'desconocido'}
+            self._duracion.observar(retraso, origen='desconocido')
+        else:
+            return
+        self._bloqueos.inc(origen=bloqueo['origen'])
+
+    def _vigilar(self):
+        revision = max(0.01, self.umbral / 4)
+        while not self._detener.wait(revision):
+            with self._candado:
+                if self._bloqueo is not None:
+                    continue
+                latido = self._latido
+            bloqueado = time.monotonic() - latido - self.intervalo
+            if bloqueado > self.umbral:
+                reporte = self._capturar(bloqueado)
+                if reporte is None:
+                    continue
+                with self._candado:
+                    # Si el loop despertó durante la captura, la pila ya no corresponde al bloqueo
+                    if self._latido != latido:
+                        continue
+                    self._bloqueo = reporte
+                    # Se emite con el candado tomado para que el fin del bloqueo no se informe antes
+                    self._emitir(reporte)
+
+    def _capturar(self, bloqueado):
+        cuadro = sys._current_frames().get(self._hilo_loop)
+        if cuadro is None:
+            return None
+
+        origen = None
+        actual = cuadro
+        while actual is not None and origen is None:
+            origen = self._nombres.get(actual.f_code)
+            actual = actual.f_back
+
+        tarea = None
+        try:
+            tarea = asyncio.current_task(self._loop)
+        except RuntimeError:
+            pass
+
+        pila = traceback.extract_stack(cuadro)[-PROFUNDIDAD_PILA:]
+        return {
+            'evento': 'bloqueo_loop',
+            'fecha': datetime.now().isoformat(timespec='milliseconds'),
+            'origen': origen or (tarea.get_name() if tarea is not None else 'callback'),
+            'tarea': tarea.get_name() if tarea is not None else None,
+            'bloqueado': round(bloqueado, 3),
+            'umbral': self.umbral,
+            'pila': [f'{c.filename}:{c.lineno} en {c.name}: {c.line}' for c in pila],
+        }
+
+    def _emitir(self, reporte):
+        self.reportes.append(reporte)
+        linea = json.dumps(reporte, ensure_ascii=False)
+        print(linea)
+        if self.archivo:
+            try:
+                with open(self.archivo, 'a', encoding='utf-8') as archivo:
+                    archivo.write(linea + '\n')
+            except OSError as error:
+                print('No se pudo guardar el reporte del vigilante:', error)
+
+
+# Vigilante del event loop compartido por el bot
+vigilante_loop = VigilanteLoop()
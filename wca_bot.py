@@ -1,19 +1,29 @@
 """
 Este módulo contiene el código principal del bot de Discord.
 Posee los siguientes comandos y funciones:
-    - verificar_torneos_nuevos: Verifica si hay torneos nuevos cada 2 horas y envía una notificación al canal #torneos en caso de encontrar nuevos torneos.
-    - !torneos [pais]: Envía un mensaje embed con los torneos actuales del país dado, en caso de no especificar un país, se muestran los torneos de Chile.
+    - verificar_torneos_nuevos: Verifica si hay torneos nuevos cada 2 horas y envía una notificación a los canales suscritos a cada país en caso de encontrar nuevos torneos.
+    - !suscribir / !desuscribir [pais]: Suscribe o desuscribe el canal a las notificaciones de un país.
+    - !suscripciones: Muestra los países a los que está suscrito el canal.
+    - !estadisticas: Muestra las métricas del bot (solo para el dueño del bot).
+    - !torneos [pais]: Envía un mensaje embed con los torneos actuales del país dado, en caso de no especificar un país, se muestran los torneos de Chile. Acepta varios países o continentes y filtros por lugar, fechas y cantidad.
     - !logo: Envía una imagen con el logo del bot.
 """
 
 
+import aiohttp
+import asyncio
 import json
 import discord
 from discord.ext import commands, tasks
 import os
+import random
+import time
+from collections import OrderedDict
 from datetime import datetime
 from dotenv import load_dotenv
+import metricas
 import utils as utils
+from vigilante import vigilante_loop
 
 
 load_dotenv()  # Cargar variables de entorno
@@ -22,7 +32,21 @@ load_dotenv()  # Cargar variables de entorno
 TOKEN = os.getenv('TOKEN') # Token del bot
 GUILD_ID = os.getenv('GUILD_ID')  # ID del servidor de Discord
 CHANNEL_ID = os.getenv('CHANNEL_ID')  # ID del canal de Discord
-ALIASES = json.load(open('./json/command_aliases.json', 'r', encoding='utf-8')) # Aliases de los comandos
+with open('./json/command_aliases.json', 'r', encoding='utf-8') as archivo:
+    ALIASES = json.load(archivo)  # Aliases de los comandos
+LIMITE_TEST = 5  # Cantidad máxima de torneos que muestra el comando !test
+LIMITE_MENSAJE = 2000  # Caracteres máximos de un mensaje de Discord
+INICIO_TIMEOUT = 15  # Segundos que setup_hook espera el precalentamiento antes de conectarse a Discord
+
+
+# Métricas de Discord, de los comandos y del verificador de torneos
+latencia_discord = metricas.registro.histograma('discord_segundos', 'Duración de las llamadas a la API de Discord por operación.')
+contador_envios = metricas.registro.contador('discord_envios_total', 'Mensajes de la cola de envíos por resultado.')
+latencia_comandos = metricas.registro.histograma('comando_segundos', 'Duración de los comandos por nombre.')
+latencia_render = metricas.registro.histograma('render_segundos', 'Duración de la construcción de embeds por tipo.')
+contador_render = metricas.registro.contador('render_cache_total', 'Consultas al caché de embeds por tipo y resultado.')
+contador_torneos = metricas.registro.contador('torneos_detectados_total', 'Torneos nuevos y modificados detectados por el verificador.')
+duracion_inicio = metricas.registro.indicador('inicio_segundos', 'Duración del precalentamiento de cada componente al iniciar el bot.')
 
 
 # Definir los intents requeridos
@@ -31,27 +55,307 @@ intents.messages = True
 intents.message_content = True
 
 
-class WCABot(commands.Bot):
+class ColaEnvios:
+    '''
+    Cola de mensajes salientes hacia los canales de Discord.
+
+    Cada canal tiene su propia cola y su propio trabajador, por lo que los mensajes de un canal
+    se entregan en orden y un canal lento no retrasa a los demás ni a quien encola. Los embeds se
+    dividen en mensajes válidos para Discord, los envíos se espacian por canal y globalmente, y
+    los errores temporales (429 o 5xx) se reintentan con backoff exponencial.
+    '''
+    # Límites de Discord por mensaje
+    EMBEDS_POR_MENSAJE = 10
+    CARACTERES_POR_MENSAJE = 6000
+    # Segundos mínimos entre mensajes de un mismo canal
+    INTERVALO_CANAL = 1.0
+    # Mensajes por segundo entre todos los canales
+    MENSAJES_POR_SEGUNDO = 20
+    REINTENTOS = 5
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self._colas = {}
+        self._trabajadores = {}
+        self._limitador = utils.LimitadorTasa(self.MENSAJES_POR_SEGUNDO)
+
+    @classmethod
+    def dividir_embeds(cls, embeds):
+        '''
+        Divide una lista de embeds en grupos que caben en un mensaje de Discord.
+
+        Parámetros:
+            - embeds: Lista de embeds.
+
+        Retorna:
+            - list: Lista de grupos de embeds.
+        '''
+        grupos = []
+        grupo = []
+        caracteres = 0
+        for embed in embeds:
+            largo = len(embed)
+            if grupo and (len(grupo) == cls.EMBEDS_POR_MENSAJE or caracteres + largo > cls.CARACTERES_POR_MENSAJE):
+                grupos.append(grupo)
+                grupo = []
+                caracteres = 0
+            grupo.append(embed)
+            caracteres += largo
+        if grupo:
+            grupos.append(grupo)
+        return grupos
+
+    def encolar(self, canal_id, contenido=None, embeds=()):
+        '''
+        Agrega un mensaje a la cola del canal. Si tiene más embeds de los que admite Discord,
+        se divide en varios mensajes y el contenido solo se envía con el primero.
+
+        Parámetros:
+            - canal_id: ID del canal de Discord.
+            - contenido: Texto del mensaje.
+            - embeds: Embeds del mensaje.
+
+        Retorna:
+            - None
+        '''
+        cola = self._colas.setdefault(canal_id, asyncio.Queue())
+        grupos = self.dividir_embeds(list(embeds)) or [[]]
+        for i, grupo in enumerate(grupos):
+            cola.put_nowait((contenido if i == 0 else None, grupo))
+
+        trabajador = self._trabajadores.get(canal_id)
+        if trabajador is None or trabajador.done():
+            self._trabajadores[canal_id] = asyncio.create_task(self._trabajar(canal_id, cola))
+
+    async def _trabajar(self, canal_id, cola):
+        while not cola.empty():
+            contenido, embeds = cola.get_nowait()
+            try:
+                await self._enviar(canal_id, contenido, embeds)
+            except Exception as error:
+                # Un error inesperado descarta solo este mensaje; el resto de la cola se sigue enviando
+                print(f'Error inesperado al enviar un mensaje al canal {canal_id}:', repr(error))
+                contador_envios.inc(resultado='error')
+            await asyncio.sleep(self.INTERVALO_CANAL)
+        self._colas.pop(canal_id, None)
+        self._trabajadores.pop(canal_id, None)
+
+    async def _enviar(self, canal_id, contenido, embeds):
+        canal = self.cliente.get_channel(canal_id)
+        if canal is None:
+            print(f'No se encontró el canal {canal_id}.')
+            return
+
+        for intento in range(self.REINTENTOS):
+            await self._limitador.esperar()
+            try:
+                with latencia_discord.medir(operacion='enviar_cola'):
+                    await canal.send(contenido, embeds=embeds)
+                contador_envios.inc(resultado='enviado')
+                return
+            except (discord.Forbidden, discord.NotFound) as error:
+                print(f'No se puede enviar mensajes al canal {canal_id}:', error)
+                contador_envios.inc(resultado='prohibido')
+                return
+            except discord.HTTPException as error:
+                if error.status != 429 and error.status < 500:
+                    print(f'Error al enviar un mensaje al canal {canal_id}:', error)
+                    contador_envios.inc(resultado='error')
+                    return
+                espera = 2 ** intento + random.random()
+                print(f'Error temporal al enviar al canal {canal_id}, reintentando en {espera:.1f} s:', error)
+                contador_envios.inc(resultado='reintento')
+                await asyncio.sleep(espera)
+        print(f'Se descartó un mensaje para el canal {canal_id} tras {self.REINTENTOS} intentos.')
+        contador_envios.inc(resultado='descartado')
+
+    def pendientes(self):
+        '''
+        Retorna la cantidad de mensajes que esperan en las colas de todos los canales.
+
+        Retorna:
+            - int: Mensajes pendientes.
+        '''
+        return sum(cola.qsize() for cola in self._colas.values())
+
+    async def vaciar(self):
+        '''
+        Espera a que se envíen todos los mensajes encolados.
+
+        Retorna:
+            - None
+        '''
+        # Mientras se espera pueden crearse trabajadores nuevos para otros canales
+        pendientes = [t for t in self._trabajadores.values() if not t.done()]
+        while pendientes:
+            await asyncio.gather(*pendientes, return_exceptions=True)
+            pendientes = [t for t in self._trabajadores.values() if not t.done()]
+
+    async def cerrar(self):
+        '''
+        Detiene los trabajadores de la cola.
+
+        Retorna:
+            - None
+        '''
+        for trabajador in self._trabajadores.values():
+            trabajador.cancel()
+        self._trabajadores.clear()
+        self._colas.clear()
+
+
+class WCABot(commands.AutoShardedBot):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.pais_por_defecto = 'Chile'
-        self.idioma = 'es'
+        self.cola_envios = ColaEnvios(self)
+        # Se activa cuando termina el precalentamiento de setup_hook
+        self.listo = asyncio.Event()
+        self.tiempos_inicio = {}
+        self._precalentamiento = None
+        metricas.registro.indicador('cola_envios_pendientes', 'Mensajes que esperan en la cola de envíos.', self.cola_envios.pendientes)
+
+    async def setup_hook(self):
+        # El vigilante mide el retraso del event loop e informa qué comando o tarea lo bloquea
+        vigilante_loop.registrar_comandos(self)
+        vigilante_loop.registrar(verificar_torneos_nuevos.coro, 'verificar_torneos_nuevos')
+        vigilante_loop.registrar(procesar_pais, 'verificar_torneos_nuevos')
+        vigilante_loop.registrar(ColaEnvios._trabajar, 'cola_envios')
+        vigilante_loop.registrar(refrescar_espejo.coro, 'refrescar_espejo')
+        vigilante_loop.registrar(BotonPagina.callback, 'torneos (paginación)')
+        vigilante_loop.registrar(VistaPaginacion.mostrar, 'torneos (paginación)')
+        # Los botones de !torneos se atienden por su custom_id, también los de mensajes anteriores al reinicio
+        self.add_dynamic_items(BotonPagina)
+        vigilante_loop.iniciar()
+        try:
+            await metricas.iniciar_servidor()
+        except OSError as error:
+            print('No se pudo iniciar el servidor de métricas:', error)
+        # La sesión HTTP y el pool de base de datos viven mientras viva el bot
+        await utils.iniciar_sesion_http()
+        self._precalentamiento = asyncio.create_task(self.precalentar())
+        _, pendientes = await asyncio.wait([self._precalentamiento], timeout=INICIO_TIMEOUT)
+        if pendientes:
+            faltantes = ', '.join(sorted({'paises', 'traducciones', 'base_de_datos', 'torneos'} - set(self.tiempos_inicio)))
+            print(f'El precalentamiento superó {INICIO_TIMEOUT} s; continúa en segundo plano: {faltantes}')
+
+    async def _componente(self, nombre, corrutina):
+        # Ejecuta un paso del precalentamiento y registra su duración; un error no detiene a los demás
+        inicio = time.perf_counter()
+        try:
+            await corrutina
+            estado = 'listo'
+        except Exception as error:
+            estado = f'error ({error})'
+        duracion = time.perf_counter() - inicio
+        self.tiempos_inicio[nombre] = duracion
+        duracion_inicio.fijar(duracion, componente=nombre)
+        print(f'Inicio: {nombre} {estado} en {duracion:.3f} s')
+
+    async def _preparar_base_de_datos(self):
+        try:
+            await utils.pool_db.iniciar()
+        except Exception as error:
+            print('No se pudo iniciar el pool de base de datos:', error)
+        # Las migraciones crean las tablas que necesitan las consultas preparadas
+        await utils.migrar_base_de_datos()
+        await asyncio.gather(utils.registro_suscripciones.cargar(), utils.configuracion_servidores.cargar())
+
+    async def _precalentar_torneos(self, base_de_datos):
+        # El espejo lee y escribe en la base de datos y se precalientan los países de cada servidor
+        await base_de_datos
+        paises = utils.configuracion_servidores.paises()[:utils.ESPEJO_MAX]
+        await self._componente('torneos', asyncio.gather(*(utils.espejo_torneos.obtener(pais) for pais in paises)))
+
+    async def precalentar(self):
+        '''
+        Prepara de forma concurrente lo que necesita el primer comando después de un reinicio: el
+        registro de países, las traducciones, la base de datos (pool, migraciones, suscripciones y
+        configuración de los servidores) y el espejo de torneos de los países por defecto.
+
+        Al terminar activa self.listo y metricas.listo; self.tiempos_inicio y la métrica
+        inicio_segundos guardan la duración de cada componente.
+        '''
+        inicio = time.perf_counter()
+        metricas.listo.fijar(0)
+        base_de_datos = asyncio.create_task(self._componente('base_de_datos', self._preparar_base_de_datos()))
+        await asyncio.gather(
+            self._componente('paises', utils.registro_paises.asegurar_cargado()),
+            self._componente('traducciones', asyncio.to_thread(utils.catalogo_traducciones.revisar)),
+            base_de_datos,
+            self._precalentar_torneos(base_de_datos),
+        )
+        self.tiempos_inicio['total'] = time.perf_counter() - inicio
+        duracion_inicio.fijar(self.tiempos_inicio['total'], componente='total')
+        metricas.listo.fijar(1)
+        self.listo.set()
+        print(f'Bot listo en {self.tiempos_inicio["total"]:.3f} s')
+
+    async def close(self):
+        if self._precalentamiento is not None:
+            self._precalentamiento.cancel()
+        vigilante_loop.detener()
+        await metricas.cerrar_servidor()
+        await self.cola_envios.cerrar()
+        await utils.cerrar_sesion_http()
+        await utils.pool_db.cerrar()
+        await super().close()
 
 
 # Crear una instancia del bot con el prefijo ! para comandos y los intents definidos
 bot = WCABot(command_prefix='!', intents=intents)
 
 
+def configuracion_de(guild):
+    '''
+    Retorna la configuración (país e idioma) de un servidor, o la por defecto si es None.
+    '''
+    return utils.configuracion_servidores.obtener(guild.id if guild else None)
+
+
+def idioma_de(ctx):
+    '''
+    Retorna el idioma configurado en el servidor del contexto.
+    '''
+    return configuracion_de(ctx.guild)['idioma']
+
+
+def pais_de(ctx):
+    '''
+    Retorna el país por defecto configurado en el servidor del contexto.
+    '''
+    return configuracion_de(ctx.guild)['pais']
+
+
+@bot.before_invoke
+async def iniciar_medicion_comando(ctx):
+    ctx.inicio_comando = time.perf_counter()
+
+
+@bot.after_invoke
+async def terminar_medicion_comando(ctx):
+    # after_invoke se llama también cuando el comando falla
+    inicio = getattr(ctx, 'inicio_comando', None)
+    if inicio is not None:
+        latencia_comandos.observar(time.perf_counter() - inicio, comando=ctx.command.qualified_name)
+    if ctx.command_failed:
+        metricas.errores.inc(origen='comando', tipo=ctx.command.qualified_name)
+
+
 @bot.event
 async def on_ready():
     print(f'Bot iniciado correctamente. Conectado como {bot.user.name}')
-    verificar_torneos_nuevos.start()  # Iniciar la tarea de verificación de torneos nuevos después de iniciar el bot
+    # on_ready se repite en cada reconexión, pero las tareas periódicas solo se inician una vez
+    if not verificar_torneos_nuevos.is_running():
+        verificar_torneos_nuevos.start()  # Iniciar la tarea de verificación de torneos nuevos después de iniciar el bot
+    if not refrescar_espejo.is_running():
+        refrescar_espejo.start()
 
 
 @bot.command(name='cambiar-pais', help='Settea el país por defecto. Ejemplo: !cambiar-pais Chile', aliases=ALIASES["cambiar-pais"])
+@commands.guild_only()
 async def set_country(ctx, *args):
     '''
-    Comando para settear el país por defecto para uso del bot.
+    Comando para settear el país por defecto del servidor.
 
     Parámetros:
         - ctx: Contexto del comando.
@@ -61,19 +365,22 @@ async def set_country(ctx, *args):
         - None
     '''
     pais = ' '.join(args)
-    if not utils.validar_pais(pais) or not pais:
-        await ctx.send(f'{utils.traducir(bot.idioma, "InvalidCountry")}')
+    if not pais or not await utils.validar_pais(pais):
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "InvalidCountry")}')
         return
-    pais = utils.obtener_pais(pais)
-    bot.pais_por_defecto = pais
-    print(f'País por defecto setteado a {pais}.')
-    await ctx.send(f'{utils.traducir(bot.idioma, "SetCountry")} {pais}.')
+    pais = await utils.obtener_pais(pais)
+    if not await utils.configuracion_servidores.guardar(ctx.guild.id, pais=pais):
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "SettingsError")}')
+        return
+    print(f'País por defecto del servidor {ctx.guild.id} setteado a {pais}.')
+    await ctx.send(f'{utils.traducir(idioma_de(ctx), "SetCountry")} {pais}.')
 
 
 @bot.command(name='cambiar-idioma', help='Settea el idioma del bot. Ejemplo: !cambiar-idioma en', aliases=ALIASES["cambiar-idioma"])
+@commands.guild_only()
 async def set_language(ctx, idioma):
     '''
-    Comando para settear el idioma del bot.
+    Comando para settear el idioma del bot en el servidor.
 
     Parámetros:
         - ctx: Contexto del comando.
@@ -85,8 +392,10 @@ async def set_language(ctx, idioma):
     if not utils.validar_idioma(idioma):
         await ctx.send('El idioma ingresado no es válido.')
         return
-    bot.idioma = idioma
-    await ctx.send(f'{utils.traducir(bot.idioma, "SetLanguage")}')
+    if not await utils.configuracion_servidores.guardar(ctx.guild.id, idioma=idioma):
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "SettingsError")}')
+        return
+    await ctx.send(f'{utils.traducir(idioma, "SetLanguage")}')
 
 
 @bot.command(name='idiomas', help='Muestra los idiomas disponibles.', aliases=ALIASES["idiomas"])
@@ -101,7 +410,7 @@ async def languages(ctx):
         - None
     '''
     # Crear el mensaje embed
-    embed = discord.Embed(title=f'{utils.traducir(bot.idioma, "AvailableLanguages")}', color=discord.Color.random())
+    embed = discord.Embed(title=f'{utils.traducir(idioma_de(ctx), "AvailableLanguages")}', color=discord.Color.random())
     embed.set_footer(text='WCA Notifier Bot', icon_url='https://i.imgur.com/yscsmKO.jpeg')
     
     # Cargar los idiomas disponibles
@@ -116,80 +425,296 @@ async def languages(ctx):
     await ctx.send(embed=embed)
 
 
+@bot.command(name='suscribir', help='Suscribe el canal a las notificaciones de un país. Ejemplo: !suscribir Chile', aliases=ALIASES["suscribir"])
+@commands.has_permissions(manage_channels=True)
+async def suscribir(ctx, *args):
+    '''
+    Comando para suscribir el canal actual a las notificaciones de torneos nuevos de un país.
+
+    Parámetros:
+        - ctx: Contexto del comando.
+        - pais: País al que se suscribe el canal.
+
+    Retorna:
+        - None
+    '''
+    pais = ' '.join(args)
+    if not pais or not await utils.validar_pais(pais):
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "InvalidCountry")}')
+        return
+    pais = await utils.obtener_pais(pais)
+    if not await utils.registro_suscripciones.agregar(ctx.channel.id, pais):
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "SubscriptionError")}')
+        return
+    await ctx.send(f'{utils.traducir(idioma_de(ctx), "Subscribed")} {pais}.')
+
+
+@bot.command(name='desuscribir', help='Elimina la suscripción del canal a un país. Ejemplo: !desuscribir Chile', aliases=ALIASES["desuscribir"])
+@commands.has_permissions(manage_channels=True)
+async def desuscribir(ctx, *args):
+    '''
+    Comando para eliminar la suscripción del canal actual a un país.
+
+    Parámetros:
+        - ctx: Contexto del comando.
+        - pais: País del que se elimina la suscripción.
+
+    Retorna:
+        - None
+    '''
+    pais = ' '.join(args)
+    if not pais or not await utils.validar_pais(pais):
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "InvalidCountry")}')
+        return
+    pais = await utils.obtener_pais(pais)
+    if not await utils.registro_suscripciones.eliminar(ctx.channel.id, pais):
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "SubscriptionError")}')
+        return
+    await ctx.send(f'{utils.traducir(idioma_de(ctx), "Unsubscribed")} {pais}.')
+
+
+@bot.command(name='suscripciones', help='Muestra los países a los que está suscrito el canal.', aliases=ALIASES["suscripciones"])
+async def suscripciones(ctx):
+    '''
+    Comando para mostrar los países a los que está suscrito el canal actual.
+
+    Parámetros:
+        - ctx: Contexto del comando.
+
+    Retorna:
+        - None
+    '''
+    paises = utils.registro_suscripciones.paises(ctx.channel.id)
+    if not paises:
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "NoSubscriptions")}')
+        return
+    lista = '\n'.join(f'- **{pais}**' for pais in sorted(paises))
+    await ctx.send(f'{utils.traducir(idioma_de(ctx), "Subscriptions")}\n{lista}')
+
+
+async def obtener_canales_por_pais():
+    '''
+    Agrupa los canales suscritos por país, con el país en formato de URL.
+    El canal CHANNEL_ID, si está definido, sigue el país por defecto de su servidor.
+
+    Retorna:
+        - dict: País con formato de URL -> conjunto de IDs de canales.
+    '''
+    canales_por_pais = {}
+    for pais, canales in utils.registro_suscripciones.canales_por_pais().items():
+        pais_url = await utils.obtener_pais_para_url(pais)
+        canales_por_pais.setdefault(pais_url, set()).update(canales)
+
+    if CHANNEL_ID:
+        pais_url = await utils.obtener_pais_para_url(configuracion_de(getattr(bot.get_channel(int(CHANNEL_ID)), 'guild', None))['pais'])
+        canales_por_pais.setdefault(pais_url, set()).add(int(CHANNEL_ID))
+
+    return canales_por_pais
+
+
+# Hash del contenido de los últimos torneos procesados por el verificador, por país
+hashes_procesados = {}
+
+
+async def procesar_pais(pais):
+    '''
+    Obtiene los torneos actuales de un país, los compara con los conocidos y guarda los cambios.
+
+    Parámetros:
+        - pais: País con formato de URL.
+
+    Retorna:
+        - tuple: (torneos nuevos, torneos modificados).
+    '''
+    torneos_actuales, hash_contenido, _, _ = await utils.espejo_torneos.obtener(pais, forzar=True)
+
+    # Si los torneos no cambiaron desde el último ciclo no hay nada que comparar ni guardar
+    if hashes_procesados.get(pais) == hash_contenido:
+        return [], []
+
+    # Solo se leen de la base de datos los torneos de este país. Si la lectura falla, el error se
+    # propaga y el país se omite en este ciclo
+    torneos_conocidos = await utils.cargar_torneos_conocidos(pais)
+
+    # Comparar los torneos actuales con los conocidos usando la URL como identificador
+    nuevos, eliminados, modificados = utils.diferenciar_torneos(torneos_actuales, torneos_conocidos)
+
+    # Si la WCA no retornó torneos no se elimina nada, puede tratarse de un error de la petición
+    urls_eliminadas = [t.url for t in eliminados] if torneos_actuales else []
+
+    # Guardar y eliminar en una sola transacción; solo se notifican los que realmente eran nuevos.
+    # Si falla, el error se propaga sin registrar el hash y el país se vuelve a procesar en el
+    # próximo ciclo
+    insertados = await utils.guardar_torneos(nuevos + modificados, urls_eliminadas)
+    urls_insertadas = {t.url for t in insertados}
+    torneos_nuevos = [t for t in nuevos if t.url in urls_insertadas]
+    torneos_modificados = [t for t in modificados if t.url not in urls_insertadas]
+    if urls_eliminadas:
+        print(f'Se han eliminado {len(urls_eliminadas)} torneos de {pais}.')
+
+    hashes_procesados[pais] = hash_contenido
+    contador_torneos.inc(len(torneos_nuevos), tipo='nuevo')
+    contador_torneos.inc(len(torneos_modificados), tipo='modificado')
+    return torneos_nuevos, torneos_modificados
+
+
+def notificar_canal(canal_id, torneos_nuevos, torneos_modificados):
+    '''
+    Encola para el canal las notificaciones de torneos nuevos y modificados.
+
+    Parámetros:
+        - canal_id: ID del canal de Discord.
+        - torneos_nuevos: Torneos nuevos.
+        - torneos_modificados: Torneos modificados.
+
+    Retorna:
+        - None
+    '''
+    idioma = configuracion_de(getattr(bot.get_channel(canal_id), 'guild', None))['idioma']
+
+    if len(torneos_nuevos) > 0:
+        mencion = f':tada: **¡@everyone, {utils.traducir(idioma, "NewCompetitions")}** :tada:\n\n'
+        bot.cola_envios.encolar(canal_id, mencion, renderizador.notificaciones(torneos_nuevos, idioma))
+
+    if len(torneos_modificados) > 0:
+        mencion = f':pencil: **{utils.traducir(idioma, "UpdatedCompetitions")}**\n\n'
+        bot.cola_envios.encolar(canal_id, mencion, renderizador.notificaciones(torneos_modificados, idioma))
+
+
 @tasks.loop(hours=2)
 async def verificar_torneos_nuevos():
     '''
     Función para verificar si hay torneos nuevos cada 2 horas.
+    Cada país se consulta una sola vez por ciclo, sin importar cuántos canales lo sigan,
+    y los países se consultan de forma concurrente.
     '''
-    # Obtener el canal de Discord
-    canal = bot.get_channel(int(CHANNEL_ID))
-    utils.limpiar_base_de_datos()
+    await utils.limpiar_base_de_datos()
 
-    if canal:
-        print("Verificando torneos nuevos...")
-        # Obtener los torneos actuales
-        torneos_actuales = utils.obtener_torneos(utils.URL, bot.pais_por_defecto)
+    canales_por_pais = await obtener_canales_por_pais()
+    if not canales_por_pais:
+        return
 
-        # Cargar los torneos ya guardados
-        torneos_conocidos = utils.cargar_torneos_conocidos()
+    print("Verificando torneos nuevos...")
+    paises = list(canales_por_pais)
+    resultados = await asyncio.gather(
+        *(procesar_pais(pais) for pais in paises),
+        return_exceptions=True
+    )
 
-        # Comparar los torneos actuales con los conocidos
-        torneos_nuevos = [torneo for torneo in torneos_actuales if torneo not in torneos_conocidos]
+    for pais, resultado in zip(paises, resultados):
+        if isinstance(resultado, Exception):
+            print(f'Error al verificar los torneos de {pais}:', resultado)
+            continue
 
-        if len(torneos_nuevos) > 0:
-            print('Se han encontrado torneos nuevos.')
-            # Enviar mensaje al canal de Discord
-            vista = VistaPaginacion()
-            vista.torneos = torneos_nuevos
-            mencion = f':tada: **¡@everyone, {utils.traducir(bot.idioma, "NewCompetitions")}** :tada:\n\n'
-            embeds_nuevos_torneos = vista.crear_embed_notificacion(torneos_nuevos)
-            await canal.send(mencion, embeds=embeds_nuevos_torneos)
+        torneos_nuevos, torneos_modificados = resultado
+        if not torneos_nuevos and not torneos_modificados:
+            print(f'No hay torneos nuevos en {pais}.')
+            continue
 
-            # Actualizar la base de datos con los nuevos torneos
-            for torneo in torneos_nuevos:
-                utils.guardar_torneo(torneo)
+        print(f'Se han encontrado torneos nuevos o modificados en {pais}.')
+        for canal_id in canales_por_pais[pais]:
+            notificar_canal(canal_id, torneos_nuevos, torneos_modificados)
 
-        else:
-            print('No hay torneos nuevos.')
-            return
+
+@tasks.loop(seconds=utils.ESPEJO_REFRESCO)
+async def refrescar_espejo():
+    '''
+    Función para mantener al día el espejo de torneos de los países pedidos con !torneos, de modo
+    que el comando no tenga que esperar a la WCA.
+    '''
+    await utils.espejo_torneos.refrescar_solicitados()
+
+
+@bot.command(name='estadisticas', help='Muestra las métricas del bot.', aliases=ALIASES["estadisticas"])
+@commands.is_owner()
+async def estadisticas(ctx):
+    '''
+    Comando !estadisticas para mostrar un resumen de las métricas del bot: latencias (promedio y
+    percentiles) de la WCA, el parseo, la base de datos, los embeds y Discord, junto con los
+    contadores e indicadores.
+
+    Parámetros:
+        - ctx: Contexto del comando.
+
+    Retorna:
+        - None
+    '''
+    lineas = metricas.registro.resumen()
+    if not lineas:
+        await ctx.send(f'{utils.traducir(idioma_de(ctx), "NoStats")}')
+        return
+
+    # Dividir el resumen en bloques de código que quepan en un mensaje de Discord
+    bloques = []
+    bloque = []
+    largo = 0
+    for linea in lineas:
+        linea = linea[:LIMITE_MENSAJE - 10]
+        if bloque and largo + len(linea) + 1 > LIMITE_MENSAJE - 10:
+            bloques.append(bloque)
+            bloque = []
+            largo = 0
+        bloque.append(linea)
+        largo += len(linea) + 1
+    bloques.append(bloque)
+
+    for bloque in bloques:
+        await ctx.send('```\n' + '\n'.join(bloque) + '\n```')
 
 
 # Comando !test
 @bot.command(name='test', help='Muestra los torneos actuales.')
-async def mostrar_torneos(ctx, pais=bot.pais_por_defecto):
+async def mostrar_torneos(ctx, pais=None):
     '''
     Función para mostrar los torneos actuales usando el comando !test.
 
     Parámetros:
         - ctx: Contexto del comando.
-        - pais: País del que se quieren mostrar los torneos. Por defecto es el país default del bot.
+        - pais: País del que se quieren mostrar los torneos. Por defecto es el país default del servidor.
 
     Retorna:
         - None
     '''
-
-    # Obtener los torneos actuales de la página de la WCA
-    torneos = utils.obtener_torneos(utils.URL, pais)
+    pais = pais or pais_de(ctx)
+    idioma = idioma_de(ctx)
+
+    # Obtener los primeros torneos actuales de la página de la WCA (el mensaje no admite más)
+    aviso = None
+    try:
+        torneos = [torneo async for torneo in utils.iterar_torneos(utils.URL, pais, limite=LIMITE_TEST)]
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        print('Error con la petición HTTP:', error)
+        # Si la WCA no responde se usa la última copia del espejo; sin copia no se informa que no hay torneos
+        try:
+            torneos, _, _, _ = await utils.espejo_torneos.ultima_copia(pais)
+        except aiohttp.ClientError:
+            await ctx.send(utils.traducir(idioma, 'WcaUnavailable'))
+            return
+        torneos = torneos[:LIMITE_TEST]
+        aviso = utils.traducir(idioma, 'StaleData')
 
     # Si hay torneos existentes, enviar mensaje con los torneos
     if len(torneos) > 0:
-        _pais = utils.obtener_pais(pais)
-        mensaje = f'**{ctx.author.mention}, {utils.traducir(bot.idioma, "CurrentCompetitions")} {_pais} :eyes: :trophy::**\n\n'
-        for torneo in torneos:
-            mensaje += f'**{torneos.index(torneo) + 1}.**\n'
-            mensaje += f'**{utils.traducir(bot.idioma, "Name")}** {torneo["Nombre torneo"]}\n'
-            if torneo["Fecha inicio"] == torneo["Fecha fin"]:
-                mensaje += f'**{utils.traducir(bot.idioma, "Date")}** {torneo["Fecha inicio"]}\n'
+        _pais = await utils.obtener_pais(pais)
+        etiquetas = {key: utils.traducir(idioma, key) for key in ('Name', 'Date', 'StartDate', 'EndDate', 'Location')}
+        partes = [f'**{ctx.author.mention}, {utils.traducir(idioma, "CurrentCompetitions")} {_pais} :eyes: :trophy::**\n\n']
+        if aviso:
+            partes.append(f'{aviso}\n\n')
+        for i, torneo in enumerate(torneos, start=1):
+            partes.append(f'**{i}.**\n')
+            partes.append(f'**{etiquetas["Name"]}** {torneo.nombre}\n')
+            if torneo.inicio == torneo.fin:
+                partes.append(f'**{etiquetas["Date"]}** {torneo.inicio}\n')
             else:
-                mensaje += f'**{utils.traducir(bot.idioma, "StartDate")}** {torneo["Fecha inicio"]}\n'
-                mensaje += f'**{utils.traducir(bot.idioma, "EndDate")}** {torneo["Fecha fin"]}\n'
-            mensaje += f'**{utils.traducir(bot.idioma, "Location")}** {torneo["Lugar"]}\n'
-            mensaje += f'**URL:** {torneo["URL"]}\n\n'
+                partes.append(f'**{etiquetas["StartDate"]}** {torneo.inicio}\n')
+                partes.append(f'**{etiquetas["EndDate"]}** {torneo.fin}\n')
+            partes.append(f'**{etiquetas["Location"]}** {torneo.lugar}\n')
+            partes.append(f'**URL:** {torneo.url}\n\n')
 
         # Enviar mensaje al canal de Discord
-        await ctx.send(mensaje)
+        await ctx.send(''.join(partes))
     else:
-        await ctx.send(f'{utils.traducir(bot.idioma, "NoCompetitionFound")}')
+        await ctx.send(f'{utils.traducir(idioma, "NoCompetitionFound")}')
 
 
 @bot.command(name='logo', help='Envía una imagen con el logo del bot.', aliases=ALIASES["logo"])
@@ -201,184 +726,315 @@ async def enviar_logo(ctx):
     await ctx.send(embed=embed.set_image(url='https://i.imgur.com/yscsmKO.jpeg'))
 
 
-@bot.command(name='torneos', help='Muestra un mensaje con los torneos actuales del país dado.', aliases=ALIASES["torneos"])
+@bot.command(name='torneos', help='Muestra los torneos actuales de uno o más países o continentes. Filtros: lugar:, desde:, hasta:, mes:, limite:. Ejemplo: !torneos sudamerica limite:5', aliases=ALIASES["torneos"])
 async def torneos(ctx, *args):
     '''
-    Comando !torneos [pais] para enviar un mensaje embed con los torneos actuales del país dado.
+    Comando !torneos [regiones] [filtros] para enviar un mensaje embed con los torneos actuales de
+    los países o continentes dados (separados por comas), opcionalmente filtrados.
 
     Parámetros:
         - ctx: Contexto del comando.
-        - pais: País del que se quieren mostrar los torneos. Por defecto es el país default del bot.
+        - regiones: Países o continentes. Por defecto es el país default del servidor.
+        - filtros: lugar:texto, desde:fecha, hasta:fecha, mes:AAAA-MM (o mes:actual) y limite:n. Las
+          fechas pueden ser AAAA-MM-DD, DD/MM/AAAA o AAAA-MM.
 
     Ejemplo:
         - !torneos Chile
         - !torneos cl
         - !torneos (cuando no se especifica un país, se muestran los torneos de Chile)
+        - !torneos cl lugar:santiago mes:actual
+        - !torneos chile, argentina desde:2024-06-01 hasta:2024-08
+        - !torneos sudamerica limite:5
     '''
-    pais = ' '.join(args)
-    if not pais:
-        pais = bot.pais_por_defecto
-    torneos = utils.obtener_torneos(utils.URL, pais)
-    pais = utils.obtener_pais(pais)
-    vista = VistaPaginacion()
-    vista.torneos = torneos
-    vista.pais = pais
-    vista.traducir_botones()
-    await vista.enviar(ctx)
+    idioma = idioma_de(ctx)
+    try:
+        filtro = await utils.FiltroTorneos.desde_texto(' '.join(args), pais_de(ctx))
+    except ValueError as error:
+        print('Consulta de torneos no válida:', error)
+        await ctx.send(utils.traducir(idioma, 'InvalidFilter'))
+        return
+    if not VistaPaginacion.cabe(filtro, idioma):
+        await ctx.send(utils.traducir(idioma, 'FilterTooLong'))
+        return
+    await VistaPaginacion.enviar(ctx, filtro, idioma)
 
 
-class VistaPaginacion(discord.ui.View):
-    # Empezar en la primera pagina
-    pagina_actual = 1
+class RenderizadorEmbeds:
+    '''
+    Convierte listas de torneos en embeds y los guarda en caché.
+
+    Las páginas de !torneos se generan una sola vez por (país, idioma, versión de los datos) y los
+    embeds de notificación una sola vez por (torneo, contenido, idioma), de modo que cambiar de
+    página o notificar a varios canales solo consulta embeds ya construidos.
+    '''
     # Cada página tendrá 3 torneos visibles
-    separador = 3
-
-    def traducir_botones(self):
-        # Traduce las etiquetas de los botones
-        self.primera_pagina.label = utils.traducir(bot.idioma, "First")
-        self.anterior.label = utils.traducir(bot.idioma, "Previous")
-        self.siguiente.label = utils.traducir(bot.idioma, "Next")
-        self.ultima_pagina.label = utils.traducir(bot.idioma, "Last")
-
-    # Función para enviar el mensaje embed con los torneos cuando se usa el comando !torneos
-    async def enviar(self, ctx):
-        self.message = await ctx.send(view=self)
-        await self.actualizar_msg_torneos(self.torneos[:self.separador])
-
-    # Función para enviar una notificación cuando se encuentran nuevos torneos
-    async def enviar_notificacion(self, ctx):
-        self.message = await ctx.send(view=self)
-
-    # Función para habilitar/deshabilitar botones en casos bordes de paginación
-    def actualizar_botones(self):
-        if self.pagina_actual == 1:
-            self.primera_pagina.disabled = True
-            self.anterior.disabled = True
-        else:
-            self.primera_pagina.disabled = False
-            self.anterior.disabled = False
-        if self.pagina_actual == (self.separador + len(self.torneos) - 1) // self.separador:
-            self.ultima_pagina.disabled = True
-            self.siguiente.disabled = True
+    TORNEOS_POR_PAGINA = 3
+    # Cantidad máxima de listas de páginas y de embeds de notificación en caché
+    MAXIMO = 256
+
+    def __init__(self):
+        self._paginas = OrderedDict()
+        self._notificaciones = OrderedDict()
+
+    def _guardar(self, cache, clave, valor):
+        cache[clave] = valor
+        if len(cache) > self.MAXIMO:
+            cache.popitem(last=False)
+
+    def _etiquetas(self, idioma):
+        return {key: utils.traducir(idioma, key) for key in ('CurrentCompetitions', 'NoCompetitionFound', 'Location', 'Date', 'StartDate', 'EndDate')}
+
+    def _agregar_torneo(self, embed, torneo, etiquetas):
+        # Formatear las fechas para que sean mas legibles
+        _fecha_inicio = torneo.inicio.strftime('%d/%m/%Y')
+
+        embed.add_field(name=torneo.nombre, value=torneo.url, inline=False)
+        embed.add_field(name=':world_map: ' + etiquetas['Location'], value=torneo.lugar, inline=True)
+
+        # Si la fecha de inicio y fin son iguales, el torneo dura solo un día
+        if torneo.inicio == torneo.fin:
+            embed.add_field(name=':calendar: ' + etiquetas['Date'], value=_fecha_inicio, inline=True)
+
+        # En otro caso, el torneo dura más de un día y se agrega al mensaje la fecha de inicio y fecha de término
         else:
-            self.ultima_pagina.disabled = False
-            self.siguiente.disabled = False
-        if (len(self.torneos) <= 3):
-            self.primera_pagina.disabled = True
-            self.anterior.disabled = True
-            self.ultima_pagina.disabled = True
-            self.siguiente.disabled = True
-
-    # Función para crear el mensaje embed con los torneos
-    def crear_embed_torneo(self, torneos):
+            _fecha_fin = torneo.fin.strftime('%d/%m/%Y')
+            embed.add_field(name=':calendar: ' + etiquetas['StartDate'], value=_fecha_inicio, inline=True)
+            embed.add_field(name=':calendar: ' + etiquetas['EndDate'], value=_fecha_fin, inline=True)
+
+    def _crear_pagina(self, torneos, pais, etiquetas, pagina, total_paginas):
         # Crear el mensaje embed
-        embed = discord.Embed(title=f':trophy: {utils.traducir(bot.idioma, "CurrentCompetitions")} {self.pais} :trophy:', color=discord.Color.blue())
+        embed = discord.Embed(title=f':trophy: {etiquetas["CurrentCompetitions"]} {pais} :trophy:', color=discord.Color.blue())
         # Agregar el footer
         embed.set_footer(text='WCA Notifier Bot', icon_url='https://i.imgur.com/yscsmKO.jpeg')
 
         # Caso en el que no se encuentren torneos
         if not torneos:
-            embed.add_field(name=f'{utils.traducir(bot.idioma, "NoCompetitionFound")}', value='\u200b', inline=False)
+            embed.add_field(name=etiquetas['NoCompetitionFound'], value='\u200b', inline=False)
             return embed
 
         # Caso en el que sí hay torneos
-        for torneo in torneos:
-            # Formatear las fechas para que sean mas legibles
-            _fecha_inicio = torneo['Fecha inicio'].strftime('%d/%m/%Y')
-            _fecha_fin = torneo['Fecha fin'].strftime('%d/%m/%Y')
-
-            embed.add_field(name=torneo['Nombre torneo'], value=torneo['URL'], inline=False)
-            embed.add_field(name=':world_map: ' + f'{utils.traducir(bot.idioma, "Location")}', value=torneo['Lugar'], inline=True)
-            
-            # Si la fecha de inicio y fin son iguales, el torneo dura solo un día
-            if torneo['Fecha inicio'] == torneo['Fecha fin']:
-                embed.add_field(name=':calendar: ' + f'{utils.traducir(bot.idioma, "Date")}', value=_fecha_inicio, inline=True)
-
-            # En otro caso, el torneo dura más de un día y se agrega al mensaje la fecha de inicio y fecha de término
-            else:
-                embed.add_field(name=':calendar: ' + f'{utils.traducir(bot.idioma, "StartDate")}', value=_fecha_inicio, inline=True)
-                embed.add_field(name=':calendar: ' + f'{utils.traducir(bot.idioma, "EndDate")}', value=_fecha_fin, inline=True)
-            
+        for i, torneo in enumerate(torneos):
+            self._agregar_torneo(embed, torneo, etiquetas)
+
             # Si no es el ultimo torneo, agregar un separador
-            if torneos.index(torneo) != len(torneos) - 1:
+            if i != len(torneos) - 1:
                 embed.add_field(name='', value='\u200b', inline=False)
-        
-        # En caso de tener menos de 3 torneos, actualizar el total de páginas
-        if (len(self.torneos) <= 3):
-            total_paginas = 1
-        else:
-            total_paginas = (self.separador + len(self.torneos) - 1) // self.separador
-        
+
         # Número de página actual de un total de páginas
-        embed.add_field(name='\u200b', value=f'**Página {self.pagina_actual} de {total_paginas}**', inline=False)
-        
+        embed.add_field(name='\u200b', value=f'**Página {pagina} de {total_paginas}**', inline=False)
+
         return embed
-    
-    # Función para actualizar el mensaje embed una vez se interactúa con un botón
-    async def actualizar_msg_torneos(self, torneos):
-        self.actualizar_botones()
-        await self.message.edit(embed=self.crear_embed_torneo(torneos), view=self)
-
-    # Función para crear un array con los nuevos torneos encontrados en formato embed
-    def crear_embed_notificacion(self, torneos):
-        embed_torneos = []        
+
+    def paginas(self, torneos, pais, idioma, version=None):
+        '''
+        Retorna los embeds de todas las páginas de una lista de torneos.
+
+        Parámetros:
+            - torneos: Lista de torneos.
+            - pais: Nombre del país.
+            - idioma: Idioma de los embeds.
+            - version: Versión de los datos (hash del contenido). Si es None no se usa el caché.
+
+        Retorna:
+            - list: Un embed por página.
+        '''
+        clave = (pais, idioma, version)
+        if version is not None and clave in self._paginas:
+            contador_render.inc(tipo='paginas', resultado='acierto')
+            self._paginas.move_to_end(clave)
+            return self._paginas[clave]
+
+        contador_render.inc(tipo='paginas', resultado='fallo')
+        with latencia_render.medir(tipo='paginas'):
+            etiquetas = self._etiquetas(idioma)
+            n = self.TORNEOS_POR_PAGINA
+            total_paginas = max(1, (len(torneos) + n - 1) // n)
+            embeds = [
+                self._crear_pagina(torneos[i * n:(i + 1) * n], pais, etiquetas, i + 1, total_paginas)
+                for i in range(total_paginas)
+            ]
+
+        if version is not None:
+            self._guardar(self._paginas, clave, embeds)
+        return embeds
+
+    def notificaciones(self, torneos, idioma):
+        '''
+        Retorna un embed de notificación por cada torneo.
+
+        Parámetros:
+            - torneos: Lista de torneos.
+            - idioma: Idioma de los embeds.
+
+        Retorna:
+            - list: Un embed por torneo.
+        '''
+        etiquetas = None
+        embeds = []
         for torneo in torneos:
-            # Crear el mensaje embed
-            embed = discord.Embed(color=discord.Color.blue())
-            embed.set_thumbnail(url='https://i.imgur.com/yscsmKO.jpeg')
-            embed.set_footer(text='WCA Notifier Bot', icon_url='https://i.imgur.com/yscsmKO.jpeg')
-
-            # Formatear las fechas para que sean mas legibles
-            _fecha_inicio = torneo['Fecha inicio'].strftime('%d/%m/%Y')
-            _fecha_fin = torneo['Fecha fin'].strftime('%d/%m/%Y')
-
-            # Agregar los datos del torneo al mensaje embed
-            embed.add_field(name=torneo['Nombre torneo'], value=torneo['URL'], inline=False)
-            embed.add_field(name=':world_map: ' + f'{utils.traducir(bot.idioma, "Location")}', value=torneo['Lugar'], inline=True)
-            if torneo['Fecha inicio'] == torneo['Fecha fin']:
-                embed.add_field(name=':calendar: ' + f'{utils.traducir(bot.idioma, "Date")}', value=_fecha_inicio, inline=True)
+            clave = (torneo.url, torneo.hash_contenido, idioma)
+            embed = self._notificaciones.get(clave)
+            if embed is None:
+                contador_render.inc(tipo='notificacion', resultado='fallo')
+                with latencia_render.medir(tipo='notificacion'):
+                    etiquetas = etiquetas or self._etiquetas(idioma)
+                    embed = discord.Embed(color=discord.Color.blue())
+                    embed.set_thumbnail(url='https://i.imgur.com/yscsmKO.jpeg')
+                    embed.set_footer(text='WCA Notifier Bot', icon_url='https://i.imgur.com/yscsmKO.jpeg')
+                    self._agregar_torneo(embed, torneo, etiquetas)
+                self._guardar(self._notificaciones, clave, embed)
             else:
-                embed.add_field(name=':calendar: ' + f'{utils.traducir(bot.idioma, "StartDate")}', value=_fecha_inicio, inline=True)
-                embed.add_field(name=':calendar: ' + f'{utils.traducir(bot.idioma, "EndDate")}', value=_fecha_fin, inline=True)
-            
-            # Agregarlo al arreglo
-            embed_torneos.append(embed)
+                contador_render.inc(tipo='notificacion', resultado='acierto')
+            embeds.append(embed)
+        return embeds
 
-        return embed_torneos
-    
-    # Botón que te lleva a la primera página
-    @discord.ui.button(label='Primera', style=discord.ButtonStyle.primary, emoji='⏮️')
-    async def primera_pagina(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        self.pagina_actual = 1
-        await self.actualizar_msg_torneos(self.torneos[:self.separador])
 
-    # Botón que te lleva a la página anterior
-    @discord.ui.button(label='Anterior', style=discord.ButtonStyle.green, emoji='⬅️')
-    async def anterior(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        self.pagina_actual -= 1
-        hasta = self.pagina_actual * self.separador
-        desde = hasta - self.separador
-        await self.actualizar_msg_torneos(self.torneos[desde:hasta])
-
-    # Botón que te lleva a la página siguiente
-    @discord.ui.button(label='Siguiente', style=discord.ButtonStyle.green, emoji='➡️')
-    async def siguiente(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer()
-        self.pagina_actual += 1
-        hasta = self.pagina_actual * self.separador
-        desde = hasta - self.separador
-        await self.actualizar_msg_torneos(self.torneos[desde:hasta])
-
-    # Botón que te lleva a la última página
-    @discord.ui.button(label='Última', style=discord.ButtonStyle.primary, emoji='⏭️')
-    async def ultima_pagina(self, interaction: discord.Interaction, button: discord.ui.Button):
+# Renderizador de embeds compartido por los comandos y el verificador
+renderizador = RenderizadorEmbeds()
+
+
+class BotonPagina(discord.ui.DynamicItem[discord.ui.Button], template=r'torneos:(?P<accion>primera|anterior|siguiente|ultima):(?P<pagina>\d+):(?P<idioma>[\w-]+):(?P<consulta>.+)'):
+    '''
+    Botón de paginación de !torneos. Todo su estado (acción, página de destino, idioma y consulta
+    codificada con utils.FiltroTorneos.codificar) va en el custom_id, por lo que funciona aunque el
+    bot se haya reiniciado desde que se envió.
+    '''
+    # Llave de la etiqueta, estilo y emoji de cada acción
+    ACCIONES = {
+        'primera': ('First', discord.ButtonStyle.primary, '⏮️'),
+        'anterior': ('Previous', discord.ButtonStyle.green, '⬅️'),
+        'siguiente': ('Next', discord.ButtonStyle.green, '➡️'),
+        'ultima': ('Last', discord.ButtonStyle.primary, '⏭️'),
+    }
+
+    def __init__(self, accion, pagina, idioma, consulta, deshabilitado=False):
+        etiqueta, estilo, emoji = self.ACCIONES[accion]
+        super().__init__(discord.ui.Button(
+            label=utils.traducir(idioma, etiqueta),
+            style=estilo,
+            emoji=emoji,
+            disabled=deshabilitado,
+            custom_id=f'torneos:{accion}:{pagina}:{idioma}:{consulta}',
+        ))
+        self.accion = accion
+        self.pagina = pagina
+        self.idioma = idioma
+        self.consulta = consulta
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match['accion'], int(match['pagina']), match['idioma'], match['consulta'])
+
+    async def callback(self, interaction):
         await interaction.response.defer()
-        self.pagina_actual = (self.separador + len(self.torneos) - 1) // self.separador
-        hasta = self.pagina_actual * self.separador
-        desde = hasta - self.separador
-        await self.actualizar_msg_torneos(self.torneos[desde:])
+        await VistaPaginacion.mostrar(interaction, utils.FiltroTorneos.decodificar(self.consulta), self.idioma, self.pagina)
+
+
+class VistaPaginacion(discord.ui.View):
+    '''
+    Botones de paginación de un mensaje de !torneos en una página dada.
+
+    La vista no guarda los torneos: al presionar un botón la consulta se repite sobre el espejo de
+    torneos y el caché de embeds. Como todos sus botones son BotonPagina, discord.py no guarda la
+    vista después de enviarla, así que la memoria no crece con la cantidad de mensajes enviados.
+    '''
+    # Largo máximo de un custom_id de Discord
+    LIMITE_CUSTOM_ID = 100
+
+    def __init__(self, filtro, idioma, pagina, total_paginas):
+        # Sin timeout: los botones siguen funcionando mientras exista el mensaje
+        super().__init__(timeout=None)
+        self.filtro = filtro
+        self.idioma = idioma
+        self.pagina = pagina
+        self.total_paginas = total_paginas
+        consulta = filtro.codificar()
+        es_primera = pagina == 1
+        es_ultima = pagina == total_paginas
+        self.add_item(BotonPagina('primera', 1, idioma, consulta, es_primera))
+        self.add_item(BotonPagina('anterior', max(1, pagina - 1), idioma, consulta, es_primera))
+        self.add_item(BotonPagina('siguiente', min(total_paginas, pagina + 1), idioma, consulta, es_ultima))
+        self.add_item(BotonPagina('ultima', total_paginas, idioma, consulta, es_ultima))
+
+    @classmethod
+    def cabe(cls, filtro, idioma):
+        '''
+        Retorna True si la consulta cabe en el custom_id de los botones (con el más largo de ellos).
+        '''
+        return len(f'torneos:siguiente:9999:{idioma}:{filtro.codificar()}') <= cls.LIMITE_CUSTOM_ID
+
+    @staticmethod
+    async def paginas(filtro, idioma):
+        '''
+        Retorna los embeds de las páginas de una consulta y el aviso con la antigüedad de los torneos.
+        Si la WCA no responde se usa la última copia con un aviso de que puede estar desactualizada;
+        si no hay ninguna copia no hay embeds, para no mostrar la falla como una consulta sin torneos.
+
+        Parámetros:
+            - filtro: Consulta de torneos (utils.FiltroTorneos).
+            - idioma: Idioma de los embeds.
+
+        Retorna:
+            - tuple: (lista de embeds o None, texto del aviso o None).
+        '''
+        try:
+            torneos, version, actualizado, obsoleto = await utils.espejo_torneos.consultar(filtro)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            print('Error con la petición HTTP:', error)
+            return None, utils.traducir(idioma, 'WcaUnavailable')
+        embeds = renderizador.paginas(torneos, await filtro.titulo(), idioma, version)
+        aviso = None
+        if actualizado is not None:
+            # Marca de tiempo relativa de Discord (por ejemplo 'hace 3 minutos') en el idioma del usuario
+            aviso = f'{utils.traducir(idioma, "UpdatedAt")} <t:{int(actualizado.timestamp())}:R>'
+        if obsoleto:
+            aviso = ' '.join(filter(None, (utils.traducir(idioma, 'StaleData'), aviso)))
+        return embeds, aviso
+
+    @classmethod
+    async def enviar(cls, ctx, filtro, idioma):
+        '''
+        Envía la primera página de una consulta de torneos con sus botones.
+
+        Parámetros:
+            - ctx: Contexto del comando.
+            - filtro: Consulta de torneos (utils.FiltroTorneos).
+            - idioma: Idioma de los embeds.
+
+        Retorna:
+            - None
+        '''
+        embeds, aviso = await cls.paginas(filtro, idioma)
+        with latencia_discord.medir(operacion='enviar'):
+            if embeds is None:
+                await ctx.send(aviso)
+            else:
+                await ctx.send(aviso, embed=embeds[0], view=cls(filtro, idioma, 1, len(embeds)))
+
+    @classmethod
+    async def mostrar(cls, interaction, filtro, idioma, pagina):
+        '''
+        Reemplaza el mensaje de una interacción ya diferida por la página indicada. Si la cantidad de
+        páginas cambió desde que se envió el mensaje, se muestra la última disponible. Si la WCA no
+        responde y no hay copia de los torneos, se conserva la página actual y solo se cambia el aviso.
+
+        Parámetros:
+            - interaction: Interacción del botón presionado.
+            - filtro: Consulta de torneos (utils.FiltroTorneos).
+            - idioma: Idioma de los embeds.
+            - pagina: Página a mostrar, desde 1.
+
+        Retorna:
+            - None
+        '''
+        embeds, aviso = await cls.paginas(filtro, idioma)
+        if embeds is None:
+            with latencia_discord.medir(operacion='editar'):
+                await interaction.edit_original_response(content=aviso)
+            return
+        pagina = min(max(1, pagina), len(embeds))
+        with latencia_discord.medir(operacion='editar'):
+            await interaction.edit_original_response(content=aviso, embed=embeds[pagina - 1], view=cls(filtro, idioma, pagina, len(embeds)))
 
 
 if __name__ == '__main__':